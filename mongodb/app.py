@@ -1,6 +1,13 @@
 import streamlit as st
+import time
 from database.connection import get_db
 from database.models import get_collections
+from database import perfil, metricas
+
+inicio_render = time.perf_counter()
+# O /metrics sobe antes de qualquer acesso ao banco: é justamente com o banco fora
+# do ar que as métricas mais fazem falta (sem HABILITADAS, não faz nada)
+metricas.iniciar_servidor()
 
 st.set_page_config(
     page_title="⚽ CBF Manager",
@@ -25,6 +32,11 @@ if "logado" not in st.session_state:
 if "pessoa" not in st.session_state:
     st.session_state.pessoa = None
 
+def abrir_aba(pagina, abas, *args):
+    """Como st.tabs, mas só a função da aba escolhida roda; as demais não vão ao banco"""
+    aba = st.radio("Aba", list(abas), horizontal=True, label_visibility="collapsed", key=f"aba_{pagina}")
+    abas[aba](*args)
+
 if not st.session_state.logado:
     st.title("🔐 Login - CBF Manager")
     
@@ -67,9 +79,12 @@ else:
                 "👟 Jogadores",
                 "🏆 Equipes",
                 "⚽ Jogos",
-                "📊 Estatísticas"
+                "📊 Estatísticas",
+                "📤 Exportar Dados",
+                "⚙️ Sistema"
             ]
             page = st.selectbox("Selecione uma opção:", menu_opcoes)
+            perfilar = st.toggle("🔬 Perfil de consultas", key="perfil_consultas")
         else:
             st.subheader("📋 Menu do Usuário")
             menu_opcoes = [
@@ -77,58 +92,69 @@ else:
                 "👟 Visualizar Jogadores",
                 "🏆 Visualizar Equipes",
                 "⚽ Visualizar Jogos",
-                "📊 Visualizar Estatísticas"
+                "📊 Visualizar Estatísticas",
+                "🥇 Visualizar Classificação",
+                "🏅 Visualizar Rankings"
             ]
             page = st.selectbox("Selecione uma opção:", menu_opcoes)
+            perfilar = False
 
     st.title("⚽ CBF Manager")
+
+    perfil_cpu = relatorio_cpu = None
+    if perfilar:
+        perfil.iniciar()
+        if "perfil" in st.query_params:
+            perfil_cpu = perfil.iniciar_cpu(st.query_params["perfil"])
     
     try:
         if st.session_state.pessoa["tipo"] == "administrador":
             if page == "👥 Usuários":
                 from modules import pessoas
-                tab1, tab2 = st.tabs(["Cadastrar", "Deletar"])
-                with tab1:
-                    pessoas.cadastrar_pessoa()
-                with tab2:
-                    pessoas.deletar_pessoa()
+                abrir_aba(page, {
+                    "Cadastrar": pessoas.cadastrar_pessoa,
+                    "Deletar": pessoas.deletar_pessoa,
+                })
                         
             elif page == "👟 Jogadores":
                 from modules import jogadores
-                tab1, tab2, tab3 = st.tabs(["Cadastrar", "Editar", "Deletar"])
-                with tab1:
-                    jogadores.cadastrar_jogador()
-                with tab2:
-                    jogadores.editar_jogador()
-                with tab3:
-                    jogadores.deletar_jogador()
+                abrir_aba(page, {
+                    "Cadastrar": jogadores.cadastrar_jogador,
+                    "Editar": jogadores.editar_jogador,
+                    "Deletar": jogadores.deletar_jogador,
+                })
             elif page == "🏆 Equipes":
                 from modules import equipes
-                tab1, tab2 = st.tabs(["Cadastrar", "Deletar"])
-                with tab1:
-                    equipes.cadastrar_equipe()
-                with tab2:
-                    equipes.deletar_equipe()
+                abrir_aba(page, {
+                    "Cadastrar": equipes.cadastrar_equipe,
+                    "Deletar": equipes.deletar_equipe,
+                })
                 
             elif page == "⚽ Jogos":
                 from modules import jogos
-                tab1, tab2, tab3 = st.tabs(["Cadastrar", "Editar", "Deletar"])
-                with tab1:
-                    jogos.cadastrar_jogo()
-                with tab2:
-                    jogos.editar_jogo()
-                with tab3:
-                    jogos.deletar_jogo()
+                abrir_aba(page, {
+                    "Cadastrar": jogos.cadastrar_jogo,
+                    "Editar": jogos.editar_jogo,
+                    "Deletar": jogos.deletar_jogo,
+                })
                 
             elif page == "📊 Estatísticas":
                 from modules import estatisticas
-                tab1, tab2, tab3 = st.tabs(["Cadastrar", "Editar", "Deletar"])
-                with tab1:
-                    estatisticas.cadastrar_estatisticas()
-                with tab2:
-                    estatisticas.editar_estatisticas()
-                with tab3:
-                    estatisticas.deletar_estatisticas()
+                from modules import importacao
+                abrir_aba(page, {
+                    "Cadastrar": estatisticas.cadastrar_estatisticas,
+                    "Editar": estatisticas.editar_estatisticas,
+                    "Deletar": estatisticas.deletar_estatisticas,
+                    "Importar": importacao.importar_arquivo,
+                })
+
+            elif page == "📤 Exportar Dados":
+                from modules import exportacao
+                exportacao.exportar_dados()
+
+            elif page == "⚙️ Sistema":
+                from modules import sistema
+                sistema.visualizar_sistema()
         
         else:
             if page == "👟 Visualizar Jogadores":
@@ -143,6 +169,21 @@ else:
             elif page == "📊 Visualizar Estatísticas":
                 from modules import estatisticas
                 estatisticas.visualizar_estatisticas()
+            elif page == "🥇 Visualizar Classificação":
+                from modules import classificacao
+                classificacao.visualizar_classificacao()
+            elif page == "🏅 Visualizar Rankings":
+                from modules import rankings
+                rankings.visualizar_rankings()
                 
     except Exception as e:
-        st.error(f"Erro ao conectar ao banco de dados: {str(e)}")
\ No newline at end of file
+        st.error(f"Erro ao conectar ao banco de dados: {str(e)}")
+    finally:
+        if perfil_cpu:
+            relatorio_cpu = perfil.parar_cpu(perfil_cpu)
+        registros = perfil.encerrar()
+        metricas.observar_render(page, time.perf_counter() - inicio_render)
+
+    if perfilar:
+        from modules.perfil import mostrar_perfil
+        mostrar_perfil(registros, relatorio_cpu)
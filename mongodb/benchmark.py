@@ -0,0 +1,210 @@
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from streamlit.testing.v1 import AppTest
+from database import connection
+from database.cache import limpar
+from preencher_BD import preencher_bd
+
+# Todas as funções de página de modules/, na ordem do menu
+PAGINAS = (
+    "pessoas.cadastrar_pessoa",
+    "pessoas.deletar_pessoa",
+    "jogadores.cadastrar_jogador",
+    "jogadores.editar_jogador",
+    "jogadores.deletar_jogador",
+    "jogadores.visualizar_jogador",
+    "equipes.cadastrar_equipe",
+    "equipes.deletar_equipe",
+    "equipes.visualizar_equipe",
+    "jogos.cadastrar_jogo",
+    "jogos.editar_jogo",
+    "jogos.deletar_jogo",
+    "jogos.visualizar_jogo",
+    "estatisticas.cadastrar_estatisticas",
+    "estatisticas.editar_estatisticas",
+    "estatisticas.deletar_estatisticas",
+    "estatisticas.visualizar_estatisticas",
+    "importacao.importar_arquivo",
+    "exportacao.exportar_dados",
+    "classificacao.visualizar_classificacao",
+    "rankings.visualizar_rankings",
+    "sistema.visualizar_sistema",
+)
+
+# Roda uma página sozinha, como o app.py faria, contando as consultas pelo perfil da renderização
+SCRIPT = """
+import streamlit as st
+from database import perfil
+
+perfil.iniciar()
+try:
+    from modules.{modulo} import {funcao}
+    {funcao}()
+finally:
+    st.session_state["benchmark_consultas"] = len(perfil.encerrar())
+"""
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _renderizar(script, timeout, cache_quente):
+    """Uma renderização headless; retorna (segundos, consultas, erro)"""
+    if not cache_quente:
+        limpar()
+    app = AppTest.from_string(script, default_timeout=timeout)
+    inicio = time.perf_counter()
+    app.run()
+    duracao = time.perf_counter() - inicio
+    erro = app.exception[0].message if app.exception else None
+    consultas = app.session_state["benchmark_consultas"] if "benchmark_consultas" in app.session_state else None
+    return duracao, consultas, erro
+
+
+def medir_pagina(pagina, repeticoes, timeout, cache_quente):
+    modulo, funcao = pagina.split(".")
+    script = SCRIPT.format(modulo=modulo, funcao=funcao)
+
+    # Aquecimento: importa o módulo (e conecta) fora das medições
+    _renderizar(script, timeout, cache_quente)
+    duracoes = []
+    for _ in range(repeticoes):
+        duracao, consultas, erro = _renderizar(script, timeout, cache_quente)
+        duracoes.append(duracao * 1000)
+
+    # O tracemalloc deixa tudo mais lento: a memória é medida numa renderização à parte
+    tracemalloc.start()
+    try:
+        _renderizar(script, timeout, cache_quente)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(_percentil(duracoes, 50), 3),
+        "p95_ms": round(_percentil(duracoes, 95), 3),
+        "p99_ms": round(_percentil(duracoes, 99), 3),
+        "media_ms": round(sum(duracoes) / len(duracoes), 3),
+        "consultas": consultas,
+        "pico_memoria_kb": round(pico / 1024, 1),
+        "erro": erro,
+    }
+
+
+def executar(escalas, repeticoes, paginas, timeout, cache_quente, semear, semente, mongomock):
+    resultado = {
+        "banco": "mongomock" if mongomock else "mongodb",
+        "commit": _commit(),
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeticoes": repeticoes,
+        "cache": "quente" if cache_quente else "frio",
+        "semente": semente,
+        "escalas": {},
+    }
+    for escala in escalas:
+        if semear:
+            print(f"\n=== Semeando {escala}× uma temporada ===")
+            preencher_bd(temporadas=escala, semente=semente)
+        print(f"\n=== Medindo escala {escala}× ===")
+        medidas = {}
+        for pagina in paginas:
+            medidas[pagina] = medida = medir_pagina(pagina, repeticoes, timeout, cache_quente)
+            if mongomock:
+                medida["consultas"] = None
+            situacao = f"❌ {medida['erro']}" if medida["erro"] else ""
+            print(
+                f"  {pagina:<40} p50 {medida['p50_ms']:>9.1f} ms  p95 {medida['p95_ms']:>9.1f} ms  "
+                f"{medida['consultas']} comandos  {medida['pico_memoria_kb']:>9.0f} KiB {situacao}"
+            )
+        resultado["escalas"][str(escala)] = medidas
+    return resultado
+
+
+def comparar(base, atual, limite):
+    """Imprime a variação de p50, p95 e consultas de cada página; retorna quantas pioraram além do limite"""
+    regressoes = 0
+    print(f"\nComparando {base.get('commit')} -> {atual.get('commit')} (limite {limite:.0%})")
+    for escala, medidas in atual["escalas"].items():
+        anteriores = base["escalas"].get(escala, {})
+        for pagina, medida in medidas.items():
+            anterior = anteriores.get(pagina)
+            if anterior is None:
+                continue
+            variacoes = []
+            piorou = False
+            for campo in ("p50_ms", "p95_ms"):
+                if anterior[campo]:
+                    variacao = medida[campo] / anterior[campo] - 1
+                    variacoes.append(f"{campo[:3]} {variacao:+.0%}")
+                    piorou = piorou or variacao > limite
+            if anterior["consultas"] is not None and medida["consultas"] is not None:
+                variacoes.append(f"consultas {anterior['consultas']} -> {medida['consultas']}")
+                piorou = piorou or medida["consultas"] > anterior["consultas"]
+            regressoes += piorou
+            print(f"  {'⚠️ ' if piorou else '   '}{escala}× {pagina:<40} {'  '.join(variacoes)}")
+    return regressoes
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(
+        description="Mede as páginas de modules/ em modo headless (AppTest) sobre dados gerados. "
+                    "Apaga e repopula o banco configurado no .env: use um mongod local ou --mongomock."
+    )
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100], help="temporadas geradas em cada escala")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--paginas", nargs="+", default=list(PAGINAS), help="modulo.funcao")
+    parser.add_argument("--timeout", type=float, default=60, help="segundos por renderização")
+    parser.add_argument("--cache-quente", action="store_true", help="não limpa o cache entre as renderizações")
+    parser.add_argument("--sem-semear", action="store_true", help="mede os dados que já estão no banco")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--mongomock", action="store_true", help="banco em memória (pip install mongomock), sem mongod")
+    parser.add_argument("--saida", default=None, help="arquivo JSON (padrão: benchmark_<commit>_<data>.json)")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--limite", type=float, default=0.2, help="piora de p50/p95 considerada regressão")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _argumentos()
+    if args.mongomock:
+        import mongomock
+        # Precisa vir antes de qualquer get_db(): os módulos guardam as coleções ao serem importados.
+        # O mongomock não emite eventos de monitoramento, então os comandos não são contados
+        connection._client = mongomock.MongoClient()
+    resultado = executar(
+        escalas=args.escalas,
+        repeticoes=args.repeticoes,
+        paginas=args.paginas,
+        timeout=args.timeout,
+        cache_quente=args.cache_quente,
+        semear=not args.sem_semear,
+        semente=args.semente,
+        mongomock=args.mongomock
+    )
+    saida = args.saida or f"benchmark_{resultado['commit'] or 'local'}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        sys.exit(1 if comparar(base, resultado, args.limite) else 0)
@@ -1,7 +1,51 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME")
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 5))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30000))
+
+# Cria/valida os índices de todas as coleções na primeira conexão do processo; as migrações
+# dos dados ficam no python -m database.init_db
+MONGO_CRIAR_INDICES = os.getenv("MONGO_CRIAR_INDICES", "true").lower() in ("1", "true", "sim")
+
+# Escritas no mesmo jogo passam por atualizar_agregados uma de cada vez (database/agregados.py):
+# quanto uma escrita espera a trava do jogo e por quanto tempo a trava vale se o processo cair no meio
+MONGO_TRAVA_ESPERA_SEGUNDOS = float(os.getenv("MONGO_TRAVA_ESPERA_SEGUNDOS", 10))
+MONGO_TRAVA_VALIDADE_SEGUNDOS = float(os.getenv("MONGO_TRAVA_VALIDADE_SEGUNDOS", 60))
+
+# Cache das páginas de visualização (database/cache.py); memoria: só do processo,
+# sqlite/redis: compartilhado entre os workers do Streamlit
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria").lower()
+CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", 256))
+CACHE_TTL_SEGUNDOS = float(os.getenv("CACHE_TTL_SEGUNDOS", 300))
+CACHE_SQLITE_CAMINHO = os.getenv(
+    "CACHE_SQLITE_CAMINHO", os.path.join(tempfile.gettempdir(), "cbfmanager_mongodb_cache.sqlite3")
+)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Perfil de comandos (database/perfil.py): o mesmo comando com filtros diferentes repetido
+# mais vezes que isso numa renderização é apontado como N+1
+PERFIL_LIMITE_N_MAIS_1 = int(os.getenv("PERFIL_LIMITE_N_MAIS_1", 5))
+
+# Suspensão automática (database/suspensoes.py): cartões acumulados que suspendem o jogador,
+# cartões num único jogo que suspendem direto e quantos jogos da equipe ele fica de fora; 0 desliga
+# um limite. Depois de mudar, rode python -m database.agregados para refazer o histórico
+SUSPENSAO_CARTOES_ACUMULADOS = int(os.getenv("SUSPENSAO_CARTOES_ACUMULADOS", 3))
+SUSPENSAO_CARTOES_JOGO = int(os.getenv("SUSPENSAO_CARTOES_JOGO", 2))
+SUSPENSAO_JOGOS = int(os.getenv("SUSPENSAO_JOGOS", 1))
+
+# Endpoint /metrics no formato do Prometheus (database/metricas.py); 0 desliga as métricas.
+# Com vários workers na mesma máquina, cada um precisa da sua porta
+METRICAS_PORTA = int(os.getenv("METRICAS_PORTA", 0))
+METRICAS_ENDERECO = os.getenv("METRICAS_ENDERECO", "127.0.0.1")
@@ -0,0 +1,368 @@
+import datetime
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pymongo import UpdateOne
+from config import MONGO_TRAVA_ESPERA_SEGUNDOS, MONGO_TRAVA_VALIDADE_SEGUNDOS
+from database.hidratacao import buscar_por_ids
+from database.cache import invalidar
+from database.suspensoes import atualizar_suspensoes, atualizar_situacao, recalcular_suspensoes
+
+CAMPOS_CLASSIFICACAO = ("jogos", "vitorias", "empates", "derrotas", "gols_pro", "gols_contra", "saldo", "pontos", "cartoes")
+# Totais mantidos no próprio documento do jogador (computed pattern)
+CAMPOS_JOGADOR = ("total_jogos", "total_gols", "total_cartoes")
+# Placar mantido no próprio documento do jogo, na ordem devolvida por placar()
+CAMPOS_PLACAR = ("gols_equipe1", "gols_equipe2", "cartoes_equipe1", "cartoes_equipe2")
+# Coleções reescritas por atualizar_agregados, para invalidar o cache junto com a escrita
+COLECOES_AGREGADAS = ("classificacao", "jogadores", "jogos")
+
+_TOTAIS_POR_JOGADOR = [
+    {"$match": {"jogador_id": {"$ne": None}}},
+    {"$group": {
+        "_id": "$jogador_id",
+        "total_jogos": {"$sum": 1},
+        "total_gols": {"$sum": "$gols"},
+        "total_cartoes": {"$sum": "$cartoes"}
+    }},
+]
+
+
+def _carregar_jogos(collections, jogo_ids):
+    """Lê os jogos afetados, suas estatísticas e a equipe atual de cada jogador com uma consulta $in por coleção"""
+    if not jogo_ids:
+        return {}
+
+    jogos = {
+        jogo_id: {
+            "data": jogo.get("data"),
+            "equipe1": jogo["nome_equipe1"],
+            "equipe2": jogo["nome_equipe2"],
+            "estatisticas": []
+        }
+        for jogo_id, jogo in buscar_por_ids(
+            collections["jogos"], jogo_ids, {"data": 1, "nome_equipe1": 1, "nome_equipe2": 1}
+        ).items()
+    }
+
+    estatisticas = list(collections["estatisticas"].find(
+        {"jogo_id": {"$in": list(jogos)}},
+        {"jogo_id": 1, "jogador_id": 1, "gols": 1, "cartoes": 1}
+    ))
+    equipes = {
+        jogador_id: jogador.get("nome_equipe")
+        for jogador_id, jogador in buscar_por_ids(
+            collections["jogadores"], (e["jogador_id"] for e in estatisticas), {"nome_equipe": 1}
+        ).items()
+    }
+
+    for estat in estatisticas:
+        jogos[estat["jogo_id"]]["estatisticas"].append({
+            "jogador_id": estat["jogador_id"],
+            "nome_equipe": equipes.get(estat["jogador_id"]),
+            "gols": estat.get("gols") or 0,
+            "cartoes": estat.get("cartoes") or 0
+        })
+    return jogos
+
+
+def placar(jogo):
+    """Retorna (gols_equipe1, gols_equipe2, cartoes_equipe1, cartoes_equipe2) de um jogo carregado"""
+    gols = {jogo["equipe1"]: 0, jogo["equipe2"]: 0}
+    cartoes = {jogo["equipe1"]: 0, jogo["equipe2"]: 0}
+    for estat in jogo["estatisticas"]:
+        if estat["nome_equipe"] in gols:
+            gols[estat["nome_equipe"]] += estat["gols"]
+            cartoes[estat["nome_equipe"]] += estat["cartoes"]
+    return gols[jogo["equipe1"]], gols[jogo["equipe2"]], cartoes[jogo["equipe1"]], cartoes[jogo["equipe2"]]
+
+
+def _placar_gravado(jogo):
+    """Placar guardado no documento do jogo; None enquanto o jogo não tem estatísticas (não disputado)"""
+    if not jogo["estatisticas"]:
+        return dict.fromkeys(CAMPOS_PLACAR)
+    return dict(zip(CAMPOS_PLACAR, placar(jogo)))
+
+
+def _contribuicao(jogo):
+    """Linhas da classificação geradas por um jogo; jogos sem estatísticas ainda não foram disputados"""
+    if not jogo["estatisticas"]:
+        return {}
+
+    gols1, gols2, cartoes1, cartoes2 = placar(jogo)
+    resultado = {}
+    for equipe, pro, contra, cartoes in (
+        (jogo["equipe1"], gols1, gols2, cartoes1),
+        (jogo["equipe2"], gols2, gols1, cartoes2),
+    ):
+        resultado[equipe] = Counter({
+            "jogos": 1,
+            "vitorias": int(pro > contra),
+            "empates": int(pro == contra),
+            "derrotas": int(pro < contra),
+            "gols_pro": pro,
+            "gols_contra": contra,
+            "saldo": pro - contra,
+            "pontos": 3 if pro > contra else 1 if pro == contra else 0,
+            "cartoes": cartoes
+        })
+    return resultado
+
+
+def _contribuicao_jogadores(jogo):
+    """Totais de cada jogador gerados por um jogo: uma partida e os gols/cartões registrados nela"""
+    return {
+        estat["jogador_id"]: Counter({"total_jogos": 1, "total_gols": estat["gols"], "total_cartoes": estat["cartoes"]})
+        for estat in jogo["estatisticas"]
+    }
+
+
+def _deltas(antes, depois, contribuicao, campos):
+    """Diferença por chave entre as contribuições dos jogos depois e antes da escrita"""
+    deltas = {}
+    for jogo in antes.values():
+        for chave, linha in contribuicao(jogo).items():
+            deltas.setdefault(chave, Counter()).subtract(linha)
+    for jogo in depois.values():
+        for chave, linha in contribuicao(jogo).items():
+            deltas.setdefault(chave, Counter()).update(linha)
+    return {
+        chave: delta for chave, delta in deltas.items()
+        if any(delta[campo] for campo in campos)
+    }
+
+
+def _aplicar_classificacao(collections, antes, depois):
+    operacoes = [
+        UpdateOne(
+            {"nome_equipe": equipe},
+            {"$inc": {campo: delta[campo] for campo in CAMPOS_CLASSIFICACAO}},
+            upsert=True
+        )
+        for equipe, delta in _deltas(antes, depois, _contribuicao, CAMPOS_CLASSIFICACAO).items()
+    ]
+    if operacoes:
+        collections["classificacao"].bulk_write(operacoes, ordered=False)
+
+
+def _aplicar_jogador_totais(collections, antes, depois):
+    # Sem upsert: um jogador apagado no bloco simplesmente não recebe o $inc
+    operacoes = [
+        UpdateOne(
+            {"_id": jogador_id},
+            {"$inc": {campo: delta[campo] for campo in CAMPOS_JOGADOR}}
+        )
+        for jogador_id, delta in _deltas(antes, depois, _contribuicao_jogadores, CAMPOS_JOGADOR).items()
+    ]
+    if operacoes:
+        collections["jogadores"].bulk_write(operacoes, ordered=False)
+
+
+def _aplicar_placar(collections, jogos):
+    """Grava o placar dos jogos carregados nos documentos de jogos"""
+    operacoes = [UpdateOne({"_id": jogo_id}, {"$set": _placar_gravado(jogo)}) for jogo_id, jogo in jogos.items()]
+    if operacoes:
+        collections["jogos"].bulk_write(operacoes, ordered=False)
+
+
+def _aplicar_suspensoes(collections, antes, depois):
+    """Refaz as suspensões dos jogadores dos jogos afetados a partir do mais antigo deles"""
+    jogadores = {
+        estat["jogador_id"]
+        for carregados in (antes, depois) for jogo in carregados.values() for estat in jogo["estatisticas"]
+    }
+    if not jogadores:
+        return
+    # A data de antes conta também: editar a data de um jogo muda a ordem a partir da menor delas
+    inicio = min((jogo["data"], jogo_id) for carregados in (antes, depois) for jogo_id, jogo in carregados.items())
+    atualizar_suspensoes(collections, jogadores, inicio)
+    # Um jogo que passa a ter (ou deixa de ter) placar cumpre (ou desfaz) suspensões das duas equipes
+    equipes = {
+        equipe for carregados in (antes, depois) for jogo in carregados.values()
+        for equipe in (jogo["equipe1"], jogo["equipe2"])
+    }
+    atualizar_situacao(collections, jogadores, equipes)
+
+
+class JogoTravado(Exception):
+    """Outra escrita segurou a trava do jogo por mais de MONGO_TRAVA_ESPERA_SEGUNDOS"""
+
+
+@contextmanager
+def _travar_jogos(collections, jogo_ids):
+    """Trava os jogos com um campo `trava` no próprio documento, um de cada vez e em ordem de _id.
+
+    Sem transações multi-documento, é o que impede duas escritas no mesmo jogo de partirem
+    do mesmo "antes" e contarem o resultado (vitória/empate/derrota) em dobro. A trava
+    vence em MONGO_TRAVA_VALIDADE_SEGUNDOS, para não prender o jogo se o processo cair.
+    """
+    token = uuid.uuid4().hex
+    travados = []
+    try:
+        for jogo_id in sorted(jogo_ids):
+            limite = time.monotonic() + MONGO_TRAVA_ESPERA_SEGUNDOS
+            while True:
+                agora = datetime.datetime.utcnow()
+                travado = collections["jogos"].find_one_and_update(
+                    {"_id": jogo_id, "$or": [{"trava_ate": None}, {"trava_ate": {"$lt": agora}}]},
+                    {"$set": {
+                        "trava": token,
+                        "trava_ate": agora + datetime.timedelta(seconds=MONGO_TRAVA_VALIDADE_SEGUNDOS)
+                    }},
+                    projection={"_id": 1}
+                )
+                if travado is not None:
+                    travados.append(jogo_id)
+                    break
+                # Jogo inexistente não tem o que travar
+                if not collections["jogos"].count_documents({"_id": jogo_id}, limit=1):
+                    break
+                if time.monotonic() > limite:
+                    raise JogoTravado(f"O jogo {jogo_id} está sendo alterado por outra escrita; tente novamente.")
+                time.sleep(0.05)
+        yield
+    finally:
+        if travados:
+            collections["jogos"].update_many(
+                {"_id": {"$in": travados}, "trava": token}, {"$unset": {"trava": "", "trava_ate": ""}}
+            )
+
+
+@contextmanager
+def atualizar_agregados(collections, jogo_ids):
+    """Mantém as coleções agregadas em dia com as escritas feitas dentro do bloco.
+
+    Captura o estado dos jogos afetados antes e depois da escrita e aplica somente
+    a diferença, sem varrer a coleção estatisticas inteira. Os jogos ficam travados
+    do "antes" até a aplicação dos deltas.
+    """
+    jogo_ids = {jogo_id for jogo_id in jogo_ids if jogo_id is not None}
+    with _travar_jogos(collections, jogo_ids):
+        antes = _carregar_jogos(collections, jogo_ids)
+        yield
+        depois = _carregar_jogos(collections, jogo_ids)
+        _aplicar_classificacao(collections, antes, depois)
+        _aplicar_jogador_totais(collections, antes, depois)
+        # Jogos apagados no bloco não aparecem em depois
+        _aplicar_placar(collections, depois)
+        _aplicar_suspensoes(collections, antes, depois)
+
+
+def jogos_do_jogador(collections, jogador_id):
+    """IDs dos jogos em que o jogador tem estatísticas registradas"""
+    return collections["estatisticas"].distinct("jogo_id", {"jogador_id": jogador_id})
+
+
+def linha_vazia(nome_equipe):
+    return {"nome_equipe": nome_equipe, **{campo: 0 for campo in CAMPOS_CLASSIFICACAO}}
+
+
+def recalcular_classificacao(collections):
+    """Reconstrói a classificação do zero a partir de todos os jogos"""
+    collections["classificacao"].delete_many({})
+    equipes = [linha_vazia(e["nome"]) for e in collections["equipes"].find({}, {"nome": 1})]
+    if equipes:
+        collections["classificacao"].insert_many(equipes, ordered=False)
+
+    jogo_ids = [jogo["_id"] for jogo in collections["jogos"].find({}, {"_id": 1})]
+    _aplicar_classificacao(collections, {}, _carregar_jogos(collections, jogo_ids))
+
+
+def recalcular_totais_jogadores(collections, tamanho_lote=5000):
+    """Job de reparo: recalcula do zero os totais embutidos em cada jogador.
+
+    Zera os campos e grava o resultado de um $group sobre estatisticas com bulk_write em
+    lotes: só volta um documento por jogador, e funciona também onde não há $merge (mongomock).
+    """
+    collections["jogadores"].update_many({}, {"$set": {campo: 0 for campo in CAMPOS_JOGADOR}})
+    operacoes = []
+    for linha in collections["estatisticas"].aggregate(_TOTAIS_POR_JOGADOR, allowDiskUse=True):
+        operacoes.append(UpdateOne({"_id": linha["_id"]}, {"$set": {campo: linha[campo] for campo in CAMPOS_JOGADOR}}))
+        if len(operacoes) >= tamanho_lote:
+            collections["jogadores"].bulk_write(operacoes, ordered=False)
+            operacoes = []
+    if operacoes:
+        collections["jogadores"].bulk_write(operacoes, ordered=False)
+
+
+def recalcular_placares(collections, filtro=None):
+    """Reconstrói o placar dos jogos que atendem ao filtro (todos, por padrão)"""
+    jogo_ids = [jogo["_id"] for jogo in collections["jogos"].find(filtro or {}, {"_id": 1})]
+    _aplicar_placar(collections, _carregar_jogos(collections, jogo_ids))
+
+
+def recalcular_agregados(collections):
+    """Reconstrói a classificação, os totais dos jogadores, o placar dos jogos e as suspensões"""
+    recalcular_classificacao(collections)
+    recalcular_totais_jogadores(collections)
+    recalcular_placares(collections)
+    recalcular_suspensoes(collections)
+    invalidar(*COLECOES_AGREGADAS)
+
+
+def _divergencias(gravado, esperado, campos):
+    """Chaves cujos documentos gravados diferem dos calculados; documentos ausentes valem zero"""
+    return {
+        chave: {campo: (gravado.get(chave, {}).get(campo, 0), esperado.get(chave, {}).get(campo, 0)) for campo in campos}
+        for chave in set(gravado) | set(esperado)
+        if any(gravado.get(chave, {}).get(campo, 0) != esperado.get(chave, {}).get(campo, 0) for campo in campos)
+    }
+
+
+def verificar_agregados(collections):
+    """Compara os agregados gravados com uma agregação completa de estatisticas e lista as divergências.
+
+    Retorna {coleção: {chave: {campo: (gravado, esperado)}}}; um dicionário vazio indica que está tudo em dia.
+    """
+    jogo_ids = [jogo["_id"] for jogo in collections["jogos"].find({}, {"_id": 1})]
+    jogos = _carregar_jogos(collections, jogo_ids)
+
+    classificacao = {
+        linha.pop("nome_equipe"): linha
+        for linha in collections["classificacao"].find({}, {"_id": 0, "nome_equipe": 1, **dict.fromkeys(CAMPOS_CLASSIFICACAO, 1)})
+    }
+    totais = {
+        jogador.pop("_id"): jogador
+        for jogador in collections["jogadores"].find({}, dict.fromkeys(CAMPOS_JOGADOR, 1))
+    }
+    placares = {
+        jogo["_id"]: {campo: jogo.get(campo) for campo in CAMPOS_PLACAR}
+        for jogo in collections["jogos"].find({}, dict.fromkeys(CAMPOS_PLACAR, 1))
+    }
+    totais_esperados = {}
+    for linha in collections["estatisticas"].aggregate(_TOTAIS_POR_JOGADOR):
+        # Estatísticas de jogadores que não existem mais não têm onde ser gravadas
+        if linha["_id"] in totais:
+            totais_esperados[linha.pop("_id")] = linha
+
+    divergencias = {
+        "classificacao": _divergencias(
+            classificacao, _deltas({}, jogos, _contribuicao, CAMPOS_CLASSIFICACAO), CAMPOS_CLASSIFICACAO
+        ),
+        "jogadores": _divergencias(totais, totais_esperados, CAMPOS_JOGADOR),
+        "jogos": _divergencias(
+            placares, {jogo_id: _placar_gravado(jogo) for jogo_id, jogo in jogos.items()}, CAMPOS_PLACAR
+        ),
+    }
+    return {colecao: linhas for colecao, linhas in divergencias.items() if linhas}
+
+
+if __name__ == "__main__":
+    import sys
+    from database.connection import get_db
+    from database.models import get_collections
+
+    collections = get_collections(get_db())
+    if "--verificar" in sys.argv:
+        divergencias = verificar_agregados(collections)
+        for colecao, linhas in divergencias.items():
+            for chave, campos in linhas.items():
+                diferencas = ", ".join(f"{campo}: {gravado} ≠ {esperado}" for campo, (gravado, esperado) in campos.items() if gravado != esperado)
+                print(f"❌ {colecao}[{chave}] {diferencas}")
+        if divergencias:
+            print("Execute sem --verificar para reconstruir os agregados.")
+            sys.exit(1)
+        print("✅ Agregados conferem com as estatísticas.")
+    else:
+        recalcular_agregados(collections)
+        print("Agregados recalculados com sucesso!")
@@ -0,0 +1,279 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import (
+    CACHE_BACKEND, CACHE_MAX_ENTRADAS, CACHE_TTL_SEGUNDOS, CACHE_SQLITE_CAMINHO, CACHE_REDIS_URL
+)
+
+# Contador global: toda invalidação também o incrementa, independente das coleções
+VERSAO_GLOBAL = "*"
+
+
+class CacheMemoria:
+    """Entradas e versões no próprio processo: rápido, mas frio e isolado em cada worker"""
+
+    nome = "memória"
+
+    def __init__(self, max_entradas):
+        self.max_entradas = max_entradas
+        # chave -> (expira_em, valor serializado), do menos para o mais recente
+        self._entradas = OrderedDict()
+        self._versoes = {}
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            expira_em, valor = entrada
+            if expira_em <= time.time():
+                del self._entradas[chave]
+                return None
+            self._entradas.move_to_end(chave)
+            return valor
+
+    def gravar(self, chave, valor, ttl):
+        with self._lock:
+            self._entradas[chave] = (time.time() + ttl, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def versoes(self, colecoes):
+        with self._lock:
+            return {colecao: self._versoes.get(colecao, 0) for colecao in colecoes}
+
+    def incrementar(self, colecoes):
+        with self._lock:
+            for colecao in colecoes:
+                self._versoes[colecao] = self._versoes.get(colecao, 0) + 1
+
+    def todas_versoes(self):
+        with self._lock:
+            return dict(self._versoes)
+
+    def tamanho(self):
+        return len(self._entradas)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+class CacheSQLite:
+    """Entradas e versões num arquivo SQLite (WAL) compartilhado pelos processos da máquina.
+
+    Cada thread abre sua própria conexão. Leituras não bloqueiam escritas no modo WAL, e
+    as versões são incrementadas atomicamente pelo próprio SQLite, então todos os workers
+    enxergam a mesma versão de cada coleção logo após a escrita de qualquer um deles.
+    """
+
+    nome = "sqlite"
+
+    def __init__(self, caminho, max_entradas):
+        self.caminho = caminho
+        self.max_entradas = max_entradas
+        self._local = threading.local()
+        db = self._conexao()
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                chave TEXT PRIMARY KEY,
+                valor BLOB NOT NULL,
+                expira_em REAL NOT NULL
+            )
+        """)
+        db.execute("CREATE INDEX IF NOT EXISTS idx_cache_expira_em ON cache (expira_em)")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS versoes (
+                colecao TEXT PRIMARY KEY,
+                versao INTEGER NOT NULL
+            )
+        """)
+
+    def _conexao(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def obter(self, chave):
+        linha = self._conexao().execute(
+            "SELECT valor FROM cache WHERE chave = ? AND expira_em > ?", (chave, time.time())
+        ).fetchone()
+        return linha[0] if linha else None
+
+    def gravar(self, chave, valor, ttl):
+        agora = time.time()
+        db = self._conexao()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO cache (chave, valor, expira_em) VALUES (?, ?, ?)",
+                (chave, valor, agora + ttl)
+            )
+            # Sem registrar cada acesso (seria uma escrita por acerto): descarta as vencidas e,
+            # acima do limite, as que vencem primeiro, ou seja, as gravadas há mais tempo
+            db.execute("DELETE FROM cache WHERE expira_em <= ?", (agora,))
+            db.execute("""
+                DELETE FROM cache WHERE chave IN (
+                    SELECT chave FROM cache ORDER BY expira_em DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entradas,))
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+
+    def versoes(self, colecoes):
+        if not colecoes:
+            return {}
+        marcadores = ", ".join("?" * len(colecoes))
+        gravadas = dict(self._conexao().execute(
+            f"SELECT colecao, versao FROM versoes WHERE colecao IN ({marcadores})", tuple(colecoes)
+        ).fetchall())
+        return {colecao: gravadas.get(colecao, 0) for colecao in colecoes}
+
+    def incrementar(self, colecoes):
+        self._conexao().executemany("""
+            INSERT INTO versoes (colecao, versao) VALUES (?, 1)
+            ON CONFLICT (colecao) DO UPDATE SET versao = versao + 1
+        """, [(colecao,) for colecao in colecoes])
+
+    def todas_versoes(self):
+        return dict(self._conexao().execute("SELECT colecao, versao FROM versoes").fetchall())
+
+    def tamanho(self):
+        return self._conexao().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def limpar(self):
+        self._conexao().execute("DELETE FROM cache")
+
+
+class CacheRedis:
+    """Entradas e versões num servidor que fale o protocolo do Redis (Redis, Valkey, KeyDB...).
+
+    O limite de tamanho fica a cargo do servidor (maxmemory com política allkeys-lru);
+    aqui cada entrada só recebe o TTL.
+    """
+
+    nome = "redis"
+    PREFIXO = "cbfmanager:mongodb:"
+
+    def __init__(self, url, max_entradas):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requer o pacote redis (pip install redis)") from e
+        self.max_entradas = max_entradas
+        self._redis = redis.Redis.from_url(url)
+        self._chave_versoes = f"{self.PREFIXO}versoes"
+
+    def obter(self, chave):
+        return self._redis.get(f"{self.PREFIXO}cache:{chave}")
+
+    def gravar(self, chave, valor, ttl):
+        self._redis.set(f"{self.PREFIXO}cache:{chave}", valor, ex=max(1, int(ttl)))
+
+    def versoes(self, colecoes):
+        if not colecoes:
+            return {}
+        valores = self._redis.hmget(self._chave_versoes, list(colecoes))
+        return {colecao: int(valor or 0) for colecao, valor in zip(colecoes, valores)}
+
+    def incrementar(self, colecoes):
+        pipe = self._redis.pipeline()
+        for colecao in colecoes:
+            pipe.hincrby(self._chave_versoes, colecao, 1)
+        pipe.execute()
+
+    def todas_versoes(self):
+        return {colecao.decode(): int(versao) for colecao, versao in self._redis.hgetall(self._chave_versoes).items()}
+
+    def tamanho(self):
+        return sum(1 for _ in self._redis.scan_iter(match=f"{self.PREFIXO}cache:*", count=1000))
+
+    def limpar(self):
+        chaves = list(self._redis.scan_iter(match=f"{self.PREFIXO}cache:*", count=1000))
+        for inicio in range(0, len(chaves), 1000):
+            self._redis.delete(*chaves[inicio:inicio + 1000])
+
+
+def _criar_backend():
+    if CACHE_BACKEND == "sqlite":
+        return CacheSQLite(CACHE_SQLITE_CAMINHO, CACHE_MAX_ENTRADAS)
+    if CACHE_BACKEND == "redis":
+        return CacheRedis(CACHE_REDIS_URL, CACHE_MAX_ENTRADAS)
+    if CACHE_BACKEND == "memoria":
+        return CacheMemoria(CACHE_MAX_ENTRADAS)
+    raise ValueError(f"CACHE_BACKEND inválido: {CACHE_BACKEND} (use memoria, sqlite ou redis)")
+
+
+_backend = _criar_backend()
+# Contadores deste processo; com um backend compartilhado cada worker conta os seus
+_contadores = {"acertos": 0, "falhas": 0, "invalidadas": 0}
+_lock = threading.Lock()
+
+
+def _contar(contador):
+    with _lock:
+        _contadores[contador] += 1
+
+
+def memoizar(chave, calcular, colecoes=(), ttl=CACHE_TTL_SEGUNDOS):
+    """Retorna o valor guardado para `chave` ou calcula, guarda e retorna `calcular()`.
+
+    `colecoes` lista as coleções de que o valor depende: a entrada deixa de valer assim que
+    qualquer uma delas for invalidada, por este ou por outro processo, ou quando o TTL vence.
+    O valor é guardado serializado, então cada chamada recebe uma cópia própria.
+    """
+    chave = hashlib.sha1(repr(chave).encode()).hexdigest()
+    # As versões são lidas antes do cálculo: uma escrita feita durante a leitura
+    # muda a versão e a entrada já nasce invalidada
+    atuais = _backend.versoes(colecoes)
+
+    dados = _backend.obter(chave)
+    if dados is not None:
+        versoes, valor = pickle.loads(dados)
+        if versoes == atuais:
+            _contar("acertos")
+            return valor
+        _contar("invalidadas")
+    _contar("falhas")
+
+    valor = calcular()
+    _backend.gravar(chave, pickle.dumps((atuais, valor), pickle.HIGHEST_PROTOCOL), ttl)
+    return valor
+
+
+def invalidar(*colecoes):
+    """Marca as coleções como alteradas; deve ser chamado depois da escrita"""
+    _backend.incrementar(colecoes + (VERSAO_GLOBAL,))
+
+
+def limpar():
+    _backend.limpar()
+
+
+def estatisticas_cache():
+    """Contadores deste processo e estado atual do backend"""
+    with _lock:
+        contadores = dict(_contadores)
+    consultas = contadores["acertos"] + contadores["falhas"]
+    versoes = _backend.todas_versoes()
+    return {
+        **contadores,
+        "backend": _backend.nome,
+        "entradas": _backend.tamanho(),
+        "max_entradas": CACHE_MAX_ENTRADAS,
+        "ttl_segundos": CACHE_TTL_SEGUNDOS,
+        "taxa_acerto": contadores["acertos"] / consultas if consultas else 0.0,
+        "versao_global": versoes.pop(VERSAO_GLOBAL, 0),
+        "versoes": versoes,
+    }
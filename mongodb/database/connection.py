@@ -1,6 +1,178 @@
-from pymongo import MongoClient
-from config import MONGO_URI, DB_NAME
+import atexit
+import threading
+import time
+from pymongo import MongoClient, monitoring
+from config import (
+    MONGO_URI, DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS, MONGO_CRIAR_INDICES
+)
+from database.indices import criar_indices
+from database.init_db import migracoes_pendentes
+from database.perfil import monitor_comandos
+from database.cache import estatisticas_cache
+from database import metricas
+
+
+class MonitorPool(monitoring.ConnectionPoolListener):
+    """Contadores do pool de conexões do MongoClient, alimentados pelos eventos do driver"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.criadas = 0
+        self.fechadas = 0
+        self.em_uso = 0
+        self.checkouts = 0
+        self.falhas_checkout = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "conexoes_abertas": self.criadas - self.fechadas,
+                "conexoes_criadas": self.criadas,
+                "conexoes_em_uso": self.em_uso,
+                "checkouts": self.checkouts,
+                "falhas_checkout": self.falhas_checkout,
+                "espera_media_ms": (self.espera_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "espera_maxima_ms": self.espera_maxima * 1000,
+            }
+
+    def connection_check_out_started(self, event):
+        self._local.inicio = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        espera = time.perf_counter() - getattr(self._local, "inicio", time.perf_counter())
+        with self._lock:
+            self.checkouts += 1
+            self.em_uso += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+        if metricas.HABILITADAS:
+            latencia_checkout.observar(segundos=espera)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.falhas_checkout += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.em_uso -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.criadas += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.fechadas += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+monitor_pool = MonitorPool()
+
+_client = None
+_lock = threading.Lock()
+
+def _initialize_client():
+    global _client
+    client = MongoClient(
+        MONGO_URI,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=[monitor_pool, monitor_comandos]
+    )
+    try:
+        # Aquecimento: resolve o servidor e abre a primeira conexão antes da primeira página
+        client.admin.command("ping")
+        if MONGO_CRIAR_INDICES:
+            db = client[DB_NAME]
+            criar_indices(db)
+            # As migrações reescrevem coleções inteiras: ficam para o python -m database.init_db,
+            # e não para o primeiro acesso de cada worker
+            pendentes = migracoes_pendentes(db)
+            if pendentes:
+                print(f"⚠️ Migrações pendentes ({', '.join(pendentes)}): rode python -m database.init_db")
+    except Exception:
+        # Sem isso, cada nova tentativa deixaria para trás um pool e suas threads de monitoramento
+        client.close()
+        raise
+    _client = client
+    print("✅ Cliente MongoDB inicializado com sucesso")
+
+def get_client():
+    """Obtém o MongoClient compartilhado pelo processo, criando-o na primeira chamada"""
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _initialize_client()
+    return _client
 
 def get_db():
-    client = MongoClient(MONGO_URI)
-    return client[DB_NAME]
\ No newline at end of file
+    return get_client()[DB_NAME]
+
+def estatisticas_pool():
+    """Contadores atuais do pool de conexões (em uso, espera, conexões criadas)"""
+    return {
+        **monitor_pool.snapshot(),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+    }
+
+def _metricas_pool():
+    pool = monitor_pool.snapshot()
+    return [
+        ("cbf_mongo_pool_tamanho_maximo", "gauge", "maxPoolSize do MongoClient", [({}, MONGO_MAX_POOL_SIZE)]),
+        ("cbf_mongo_pool_conexoes_abertas", "gauge", "Conexões abertas pelo pool", [({}, pool["conexoes_abertas"])]),
+        ("cbf_mongo_pool_conexoes_em_uso", "gauge", "Conexões emprestadas agora", [({}, pool["conexoes_em_uso"])]),
+        ("cbf_mongo_pool_checkouts_total", "counter", "Conexões entregues pelo pool", [({}, pool["checkouts"])]),
+        ("cbf_mongo_pool_espera_segundos_total", "counter", "Tempo total de espera dos checkouts",
+         [({}, monitor_pool.espera_total)]),
+        ("cbf_mongo_pool_erros_total", "counter", "Checkouts que terminaram em erro",
+         [({}, pool["falhas_checkout"])]),
+    ]
+
+def _metricas_cache():
+    cache = estatisticas_cache()
+    return [
+        ("cbf_cache_consultas_total", "counter", "Consultas ao cache deste processo, por resultado", [
+            ({"resultado": resultado}, cache[resultado]) for resultado in ("acertos", "falhas", "invalidadas")
+        ]),
+        ("cbf_cache_taxa_acerto", "gauge", "Fração das consultas atendidas pelo cache", [({}, cache["taxa_acerto"])]),
+        ("cbf_cache_entradas", "gauge", "Entradas guardadas no backend do cache", [({}, cache["entradas"])]),
+    ]
+
+latencia_checkout = metricas.registrar(metricas.Histograma(
+    "cbf_mongo_pool_checkout_segundos", "Espera de cada checkout do pool do MongoClient"
+))
+if metricas.HABILITADAS:
+    metricas.registrar_coletor(_metricas_pool)
+    metricas.registrar_coletor(_metricas_cache)
+
+@atexit.register
+def fechar_cliente():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
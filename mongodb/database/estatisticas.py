@@ -0,0 +1,14 @@
+def somar_estatistica(collections, jogo_id, jogador_id, gols, cartoes):
+    """Soma gols e cartões do jogador no jogo com um único update_one(upsert=True) e $inc.
+
+    O índice único (jogo_id, jogador_id) garante um documento por par: dois administradores
+    salvando ao mesmo tempo não criam duplicatas, o servidor refaz o upsert que perder a
+    corrida como atualização. Retorna True se o documento foi criado e False se já existia.
+    """
+    resultado = collections["estatisticas"].update_one(
+        {"jogo_id": jogo_id, "jogador_id": jogador_id},
+        {"$inc": {"gols": gols, "cartoes": cartoes}},
+        upsert=True
+    )
+    return resultado.upserted_id is not None
+
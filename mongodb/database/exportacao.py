@@ -0,0 +1,163 @@
+import csv
+import datetime
+import io
+import itertools
+import json
+import time
+from contextlib import contextmanager
+from bson import ObjectId
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+TAMANHO_LOTE = 5000
+FORMATOS = ("csv", "jsonl", "parquet")
+# Campos que nunca saem do banco em uma exportação
+COLUNAS_OCULTAS = {
+    "pessoas": ("senha",),
+    "jogos": ("confronto", "trava", "trava_ate"),
+    "estatisticas": ("cartoes_acumulados", "suspensao_jogo_id"),
+}
+
+
+def _valor(valor):
+    """Converte ObjectId e datas para tipos serializáveis"""
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    return valor
+
+
+@contextmanager
+def ler_colecao(collections, nome_colecao, tamanho_lote=TAMANHO_LOTE):
+    """Abre a coleção com um cursor de batch_size fixo e entrega (colunas, gerador de lotes de tuplas).
+
+    Os documentos chegam do servidor em getMores de tamanho_lote, então a memória usada
+    não depende do tamanho da coleção. As colunas são os campos presentes no primeiro
+    lote; campos que só aparecem depois são ignorados.
+    """
+    if nome_colecao not in collections:
+        raise ValueError(f"Coleção '{nome_colecao}' desconhecida; use uma de: {', '.join(collections)}")
+
+    ocultas = COLUNAS_OCULTAS.get(nome_colecao, ())
+    cursor = collections[nome_colecao].find(
+        {}, {campo: 0 for campo in ocultas} or None, batch_size=tamanho_lote
+    )
+    try:
+        primeiro = list(itertools.islice(cursor, tamanho_lote))
+        colunas = list(dict.fromkeys(campo for doc in primeiro for campo in doc))
+
+        def lotes():
+            lote = primeiro
+            while lote:
+                yield [tuple(_valor(doc.get(campo)) for campo in colunas) for doc in lote]
+                lote = list(itertools.islice(cursor, tamanho_lote))
+
+        yield colunas, lotes()
+    finally:
+        cursor.close()
+
+
+def _escrever_csv(destino, colunas, lotes):
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="")
+    escritor = csv.writer(texto)
+    escritor.writerow(colunas)
+    total = 0
+    for lote in lotes:
+        escritor.writerows(lote)
+        total += len(lote)
+    texto.flush()
+    texto.detach()
+    return total
+
+
+def _escrever_jsonl(destino, colunas, lotes):
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="\n")
+    total = 0
+    for lote in lotes:
+        texto.writelines(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False) + "\n" for linha in lote)
+        total += len(lote)
+    texto.flush()
+    texto.detach()
+    return total
+
+
+def _tipo_arrow(valores):
+    """Tipo Arrow de uma coluna, pelo primeiro valor não nulo do primeiro lote"""
+    exemplo = next((v for v in valores if v is not None), None)
+    if isinstance(exemplo, bool):
+        return pa.bool_()
+    if isinstance(exemplo, int):
+        return pa.int64()
+    if isinstance(exemplo, float):
+        return pa.float64()
+    return pa.string()
+
+
+def _escrever_parquet(destino, colunas, lotes):
+    """Escreve cada lote como um row group, mantendo o mesmo schema do primeiro lote"""
+    escritor = None
+    total = 0
+    try:
+        for lote in lotes:
+            valores = list(zip(*lote))
+            if escritor is None:
+                schema = pa.schema([(c, _tipo_arrow(v)) for c, v in zip(colunas, valores)])
+                escritor = pq.ParquetWriter(destino, schema)
+            arrays = [
+                pa.array([None if v is None else str(v) for v in coluna] if campo.type == pa.string() else coluna,
+                         type=campo.type)
+                for campo, coluna in zip(schema, valores)
+            ]
+            escritor.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            total += len(lote)
+        if escritor is None:
+            pq.write_table(pa.table({c: pa.array([], type=pa.string()) for c in colunas}), destino)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return total
+
+
+ESCRITORES = {
+    "csv": _escrever_csv,
+    "jsonl": _escrever_jsonl,
+    "parquet": _escrever_parquet,
+}
+
+
+def exportar_colecao(collections, nome_colecao, destino, formato="csv", tamanho_lote=TAMANHO_LOTE):
+    """Exporta uma coleção para o arquivo binário `destino` no formato escolhido; retorna o número de documentos"""
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato '{formato}' não suportado; use {', '.join(FORMATOS)}")
+    if formato == "parquet" and pa is None:
+        raise RuntimeError("A exportação em Parquet requer o pacote pyarrow (pip install pyarrow).")
+    with ler_colecao(collections, nome_colecao, tamanho_lote) as (colunas, lotes):
+        return ESCRITORES[formato](destino, colunas, lotes)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from database.connection import get_db
+    from database.models import get_collections
+
+    collections = get_collections(get_db())
+    parser = argparse.ArgumentParser(description="Exporta coleções do banco para CSV, JSONL ou Parquet.")
+    parser.add_argument("colecoes", nargs="*", default=list(collections), help="padrão: todas")
+    parser.add_argument("--formato", choices=FORMATOS, default="csv")
+    parser.add_argument("--saida", default="exportacao", help="diretório de destino")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="documentos por batch do cursor")
+    args = parser.parse_args()
+
+    os.makedirs(args.saida, exist_ok=True)
+    for nome_colecao in args.colecoes:
+        caminho = os.path.join(args.saida, f"{nome_colecao}.{args.formato}")
+        inicio = time.perf_counter()
+        with open(caminho, "wb") as destino:
+            documentos = exportar_colecao(collections, nome_colecao, destino, args.formato, args.lote)
+        print(f"✅ {nome_colecao}: {documentos} documentos em {time.perf_counter() - inicio:.2f}s -> {caminho}")
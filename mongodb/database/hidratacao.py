@@ -0,0 +1,35 @@
+def buscar_por_ids(colecao, ids, projecao=None):
+    """Busca vários documentos por _id com uma única consulta $in, indexados pelo _id"""
+    ids = [i for i in set(ids) if i is not None]
+    if not ids:
+        return {}
+    return {doc["_id"]: doc for doc in colecao.find({"_id": {"$in": ids}}, projecao)}
+
+
+def hidratar_estatisticas(collections, estatisticas, com_jogo=True):
+    """Anexa o jogador (e opcionalmente o jogo) a cada estatística.
+
+    Reúne os jogador_id/jogo_id referenciados e resolve cada coleção com uma
+    consulta $in, independente de quantas estatísticas houver. Referências
+    quebradas ficam como None.
+    """
+    estatisticas = list(estatisticas)
+    jogadores = buscar_por_ids(
+        collections["jogadores"],
+        (e.get("jogador_id") for e in estatisticas),
+        {"nome": 1, "numero": 1, "nome_equipe": 1}
+    )
+    jogos = buscar_por_ids(
+        collections["jogos"],
+        (e.get("jogo_id") for e in estatisticas),
+        {"data": 1, "hora": 1, "local": 1, "nome_equipe1": 1, "nome_equipe2": 1}
+    ) if com_jogo else {}
+
+    return [
+        {
+            **estat,
+            "jogador": jogadores.get(estat.get("jogador_id")),
+            "jogo": jogos.get(estat.get("jogo_id"))
+        }
+        for estat in estatisticas
+    ]
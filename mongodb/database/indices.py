@@ -0,0 +1,201 @@
+import datetime
+from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import OperationFailure
+from database.models import get_collections
+
+ORDEM_CLASSIFICACAO = [
+    ("pontos", -1),
+    ("vitorias", -1),
+    ("saldo", -1),
+    ("gols_pro", -1),
+    ("cartoes", 1),
+    ("nome_equipe", 1)
+]
+
+# Rankings sobre os totais embutidos em jogadores (atualizados com $inc a cada escrita de estatística)
+ORDEM_ARTILHARIA = [("total_gols", -1), ("_id", 1)]
+ORDEM_CARTOES = [("total_cartoes", -1), ("_id", 1)]
+
+# coleção -> [(chaves, opções)]; cada índice atende a uma consulta de modules/
+INDICES = {
+    "pessoas": [
+        # login (app.py) e cadastrar_pessoa
+        ([("login", 1)], {"name": "uq_pessoas_login", "unique": True}),
+    ],
+    "equipes": [
+        # cadastrar_equipe, editar_jogador e listas ordenadas por nome
+        ([("nome", 1)], {"name": "uq_equipes_nome", "unique": True}),
+    ],
+    "jogadores": [
+        # listas .sort("nome", 1) e o filtro $regex de visualizar_jogador (varre só o índice)
+        ([("nome", 1), ("_id", 1)], {"name": "idx_jogadores_nome"}),
+        # número de camisa único na equipe (cadastrar_jogador, editar_jogador) e jogadores de uma equipe;
+        # jogadores sem equipe (nome_equipe nulo) ficam fora do índice e podem repetir o número
+        ([("nome_equipe", 1), ("numero", 1)], {
+            "name": "uq_jogadores_equipe_numero", "unique": True, "partialFilterExpression": {"nome_equipe": {"$gt": ""}}
+        }),
+        # rankings de artilharia e cartões, gerais e por equipe: os k primeiros saem do índice já ordenados
+        (ORDEM_ARTILHARIA, {"name": "idx_jogadores_artilharia"}),
+        (ORDEM_CARTOES, {"name": "idx_jogadores_cartoes"}),
+        ([("nome_equipe", 1), *ORDEM_ARTILHARIA], {"name": "idx_jogadores_equipe_artilharia"}),
+        ([("nome_equipe", 1), *ORDEM_CARTOES], {"name": "idx_jogadores_equipe_cartoes"}),
+        # jogadores_suspensos: só os documentos com suspenso = true entram no índice
+        ([("suspenso", 1)], {"name": "idx_jogadores_suspensos", "partialFilterExpression": {"suspenso": True}}),
+    ],
+    "jogos": [
+        # .sort("data", -1) e o intervalo de datas de visualizar_jogo
+        ([("data", -1), ("hora", -1)], {"name": "idx_jogos_data"}),
+        # $or por nome_equipe1/nome_equipe2 com .sort("data", -1): um IXSCAN por ramo + SORT_MERGE
+        ([("nome_equipe1", 1), ("data", -1)], {"name": "idx_jogos_equipe1_data"}),
+        ([("nome_equipe2", 1), ("data", -1)], {"name": "idx_jogos_equipe2_data"}),
+        # um único jogo entre as mesmas equipes na mesma data e hora, em qualquer ordem de mando
+        ([("data", 1), ("hora", 1), ("confronto", 1)], {"name": "uq_jogos_confronto", "unique": True}),
+    ],
+    "estatisticas": [
+        # cadastrar_estatisticas, estatísticas de um jogo, atualizar_agregados
+        ([("jogo_id", 1), ("jogador_id", 1)], {"name": "uq_estatisticas_jogo_jogador", "unique": True}),
+        # estatísticas e totais de um jogador
+        ([("jogador_id", 1)], {"name": "idx_estatisticas_jogador"}),
+    ],
+    "classificacao": [
+        ([("nome_equipe", 1)], {"name": "uq_classificacao_equipe", "unique": True}),
+        (ORDEM_CLASSIFICACAO, {"name": "idx_classificacao_ordem"}),
+    ],
+}
+
+
+# coleção -> índices antigos com o mesmo padrão de chaves de um índice novo, removidos antes de criá-lo
+INDICES_SUBSTITUIDOS = {
+    "jogadores": ["idx_jogadores_equipe_numero"],
+}
+
+
+def _consultas_verificadas():
+    """(descrição, coleção, filtro, ordenação) de cada formato de consulta usado em modules/"""
+    exemplo_id = ObjectId()
+    hoje = str(datetime.date.today())
+    return [
+        ("login", "pessoas", {"login": "admin", "senha": "123"}, None),
+        ("equipe pelo nome", "equipes", {"nome": "FLAMENGO"}, None),
+        ("equipes por nome", "equipes", {}, [("nome", 1)]),
+        ("jogadores por nome", "jogadores", {}, [("nome", 1)]),
+        ("filtro por nome", "jogadores", {"nome": {"$regex": "silva", "$options": "i"}}, [("nome", 1)]),
+        ("página seguinte de jogadores (keyset)", "jogadores",
+         {"$or": [{"nome": {"$gt": "M"}}, {"nome": "M", "_id": {"$gt": exemplo_id}}]}, [("nome", 1), ("_id", 1)]),
+        ("jogadores da equipe", "jogadores", {"nome_equipe": "FLAMENGO"}, None),
+        ("número na equipe", "jogadores", {"numero": 10, "nome_equipe": "FLAMENGO"}, None),
+        ("jogos por data", "jogos", {}, [("data", -1)]),
+        ("jogos no intervalo", "jogos", {"data": {"$gte": hoje, "$lte": hoje}}, [("data", -1)]),
+        ("jogos de uma equipe", "jogos",
+         {"$or": [{"nome_equipe1": "FLAMENGO"}, {"nome_equipe2": "FLAMENGO"}]}, [("data", -1)]),
+        ("estatísticas de um jogador", "estatisticas", {"jogador_id": exemplo_id}, None),
+        ("estatísticas de um jogo", "estatisticas", {"jogo_id": exemplo_id}, None),
+        ("estatística de um jogador em um jogo", "estatisticas", {"jogador_id": exemplo_id, "jogo_id": exemplo_id}, None),
+        ("tabela de classificação", "classificacao", {}, ORDEM_CLASSIFICACAO),
+        ("artilharia", "jogadores", {"total_gols": {"$gt": 0}}, ORDEM_ARTILHARIA),
+        ("artilharia da equipe", "jogadores", {"nome_equipe": "FLAMENGO", "total_gols": {"$gt": 0}}, ORDEM_ARTILHARIA),
+        ("ranking de cartões", "jogadores", {"total_cartoes": {"$gt": 0}}, ORDEM_CARTOES),
+        ("ranking de cartões da equipe", "jogadores",
+         {"nome_equipe": "FLAMENGO", "total_cartoes": {"$gt": 0}}, ORDEM_CARTOES),
+        ("jogadores suspensos", "jogadores", {"suspenso": True}, None),
+    ]
+
+
+def consolidar_estatisticas_duplicadas(collections):
+    """Soma os documentos repetidos de (jogo_id, jogador_id) antes de criar o índice único"""
+    duplicadas = collections["estatisticas"].aggregate([
+        {"$group": {
+            "_id": {"jogo_id": "$jogo_id", "jogador_id": "$jogador_id"},
+            "ids": {"$push": "$_id"},
+            "gols": {"$sum": "$gols"},
+            "cartoes": {"$sum": "$cartoes"}
+        }},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True)
+
+    operacoes = []
+    for grupo in duplicadas:
+        manter, *remover = grupo["ids"]
+        operacoes.append(UpdateOne({"_id": manter}, {"$set": {"gols": grupo["gols"], "cartoes": grupo["cartoes"]}}))
+        operacoes.append(DeleteMany({"_id": {"$in": remover}}))
+
+    if operacoes:
+        collections["estatisticas"].bulk_write(operacoes, ordered=False)
+        print(f"{len(operacoes) // 2} estatísticas duplicadas consolidadas.")
+
+
+def preencher_confrontos(collections):
+    """Calcula o campo confronto dos jogos cadastrados antes dele, usado por uq_jogos_confronto"""
+    resultado = collections["jogos"].update_many(
+        {"confronto": {"$exists": False}},
+        [{"$set": {"confronto": {"$concat": [
+            {"$min": ["$nome_equipe1", "$nome_equipe2"]}, "|", {"$max": ["$nome_equipe1", "$nome_equipe2"]}
+        ]}}}]
+    )
+    if resultado.modified_count:
+        print(f"Confronto preenchido em {resultado.modified_count} jogos.")
+
+
+def criar_indices(db):
+    """Cria os índices de todas as coleções; create_index é idempotente, então pode rodar a cada inicialização"""
+    collections = get_collections(db)
+    existentes = set(collections["estatisticas"].index_information())
+    if "uq_estatisticas_jogo_jogador" not in existentes:
+        consolidar_estatisticas_duplicadas(collections)
+    preencher_confrontos(collections)
+
+    for nome_colecao, antigos in INDICES_SUBSTITUIDOS.items():
+        for nome in set(antigos) & set(collections[nome_colecao].index_information()):
+            collections[nome_colecao].drop_index(nome)
+            print(f"Índice '{nome}' removido de {nome_colecao} (substituído).")
+
+    for nome_colecao, indices in INDICES.items():
+        for chaves, opcoes in indices:
+            try:
+                collections[nome_colecao].create_index(chaves, **opcoes)
+            except OperationFailure as e:
+                print(f"❌ Não foi possível criar o índice '{opcoes['name']}' em {nome_colecao}: {e}")
+
+
+def _estagios(plano):
+    """Lista todos os estágios (COLLSCAN, IXSCAN, SORT...) de um plano de execução"""
+    if isinstance(plano, dict):
+        estagios = [plano["stage"]] if "stage" in plano else []
+        for valor in plano.values():
+            estagios.extend(_estagios(valor))
+        return estagios
+    if isinstance(plano, list):
+        return [estagio for item in plano for estagio in _estagios(item)]
+    return []
+
+
+def verificar_indices(db):
+    """Executa explain() em cada formato de consulta e confere que nenhum termina em COLLSCAN"""
+    collections = get_collections(db)
+    ok = True
+    for descricao, nome_colecao, filtro, ordenacao in _consultas_verificadas():
+        cursor = collections[nome_colecao].find(filtro)
+        if ordenacao:
+            cursor = cursor.sort(ordenacao)
+        estagios = _estagios(cursor.explain()["queryPlanner"]["winningPlan"])
+
+        if "COLLSCAN" in estagios:
+            ok = False
+            print(f"  ❌ {descricao}: {' > '.join(estagios)}")
+        elif "SORT" in estagios:
+            print(f"  ⚠️ {descricao}: usa índice, mas ordena em memória ({' > '.join(estagios)})")
+        else:
+            print(f"  ✅ {descricao}: {' > '.join(estagios)}")
+    return ok
+
+
+if __name__ == "__main__":
+    import sys
+    from database.connection import get_db
+
+    db = get_db()
+    criar_indices(db)
+    print("Índices criados com sucesso!")
+    if "--verificar" in sys.argv:
+        sys.exit(0 if verificar_indices(db) else 1)
@@ -0,0 +1,67 @@
+import sys
+from database.agregados import recalcular_classificacao, recalcular_totais_jogadores, recalcular_placares
+from database.indices import criar_indices, verificar_indices
+from database.models import get_collections
+from database.suspensoes import recalcular_suspensoes
+
+# (descrição, coleção, filtro dos documentos anteriores ao campo) — cada migração
+# só roda se algum documento ainda não tem o campo calculado
+MIGRACOES = [
+    ("totais dos jogadores", "jogadores", {"total_jogos": {"$exists": False}}),
+    ("placar dos jogos", "jogos", {"gols_equipe1": {"$exists": False}}),
+    ("suspensões", "estatisticas", {"cartoes_acumulados": {"$exists": False}}),
+]
+
+
+def migracoes_pendentes(db):
+    """Descrições das migrações que ainda têm documentos por preencher; um find_one por coleção"""
+    pendentes = [
+        descricao for descricao, nome_colecao, filtro in MIGRACOES
+        if db[nome_colecao].find_one(filtro, {"_id": 1})
+    ]
+    # Bancos anteriores à classificação materializada: alguma equipe ainda sem linha nela
+    if db["classificacao"].estimated_document_count() < db["equipes"].estimated_document_count():
+        pendentes.append("classificação")
+    return pendentes
+
+
+def migrar(db):
+    """Preenche os campos calculados dos documentos cadastrados antes deles.
+
+    Reescreve coleções inteiras, então roda como passo explícito de implantação
+    (python -m database.init_db), nunca na inicialização de cada worker do Streamlit.
+    """
+    collections = get_collections(db)
+    pendentes = migracoes_pendentes(db)
+    if "totais dos jogadores" in pendentes:
+        recalcular_totais_jogadores(collections)
+        print("Totais dos jogadores recalculados a partir das estatísticas.")
+    if "placar dos jogos" in pendentes:
+        recalcular_placares(collections, {"gols_equipe1": {"$exists": False}})
+        print("Placar dos jogos recalculado a partir das estatísticas.")
+    if "classificação" in pendentes:
+        recalcular_classificacao(collections)
+        print("Classificação recalculada a partir dos jogos.")
+    # Totais recém-reconstruídos partem sem o estado de suspensão
+    if "suspensões" in pendentes or "totais dos jogadores" in pendentes:
+        recalcular_suspensoes(collections)
+        print("Suspensões recalculadas a partir das estatísticas.")
+
+
+def main():
+    from database.connection import get_db
+
+    print("--- Database Setup Initialized ---")
+    db = get_db()
+    criar_indices(db)
+    print("Índices criados com sucesso!")
+    migrar(db)
+    print("Checking query plans...")
+    if not verificar_indices(db):
+        print("Erro: algumas consultas não usam índice.")
+        sys.exit(1)
+    print("--- Database Setup Complete ---")
+
+
+if __name__ == "__main__":
+    main()
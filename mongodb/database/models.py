@@ -1,8 +1,4 @@
+COLECOES = ["jogadores", "equipes", "jogos", "estatisticas", "pessoas", "classificacao"]
+
 def get_collections(db):
-    return {
-        "jogadores": db["jogadores"],
-        "equipes": db["equipes"],
-        "jogos": db["jogos"],
-        "estatisticas": db["estatisticas"],
-        "pessoas": db["pessoas"],
-    }
\ No newline at end of file
+    return {nome: db[nome] for nome in COLECOES}
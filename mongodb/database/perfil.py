@@ -0,0 +1,172 @@
+import cProfile
+import io
+import pstats
+import threading
+from collections import defaultdict
+from pymongo import monitoring
+from config import PERFIL_LIMITE_N_MAIS_1
+
+# Comandos da renderização atual; cada sessão do Streamlit roda o script na sua própria thread
+_render = threading.local()
+
+
+def iniciar():
+    """Passa a registrar os comandos enviados por esta thread até encerrar()"""
+    _render.registros = []
+
+
+def encerrar():
+    """Para de registrar e retorna os comandos registrados desde iniciar()"""
+    registros = getattr(_render, "registros", None) or []
+    _render.registros = None
+    return registros
+
+
+def ativo():
+    return getattr(_render, "registros", None) is not None
+
+
+def _formato(valor):
+    """Forma do filtro ou pipeline sem os valores: {nome_equipe: str}, ({$match: {...}})..."""
+    if isinstance(valor, dict):
+        return "{" + ", ".join(f"{chave}: {_formato(v)}" for chave, v in valor.items()) + "}"
+    if isinstance(valor, (list, tuple)):
+        return "(" + ", ".join(_formato(v) for v in valor) + ")"
+    return type(valor).__name__
+
+
+def registrar(comando, parametros, valores, duracao, linhas=None):
+    """Anota um comando enviado ao servidor"""
+    registros = getattr(_render, "registros", None)
+    if registros is None:
+        return None
+    registro = {
+        "comando": comando,
+        "parametros": parametros,
+        "valores": valores,
+        "ms": duracao * 1000,
+        "linhas": linhas,
+    }
+    registros.append(registro)
+    return registro
+
+
+# Argumento de cada comando cuja forma identifica a consulta
+_ARGUMENTOS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+    "insert": "documents",
+}
+# Comandos do próprio driver (handshake, sessões), fora do perfil da página
+_IGNORADOS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "saslStart", "saslContinue", "buildInfo"}
+
+
+def _linhas(resposta):
+    """Documentos devolvidos (find/aggregate/getMore/distinct) ou afetados (escritas)"""
+    cursor = resposta.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if "values" in resposta:
+        return len(resposta["values"])
+    return resposta.get("n")
+
+
+class MonitorComandos(monitoring.CommandListener):
+    """Anota no perfil da renderização cada comando enviado ao servidor, com duração e documentos.
+
+    O driver publica os eventos na thread que executou o comando, então cada sessão do
+    Streamlit só enxerga os próprios comandos.
+    """
+
+    def started(self, event):
+        if not ativo() or event.command_name in _IGNORADOS:
+            return
+        comando = event.command
+        if event.command_name == "getMore":
+            colecao = comando.get("collection")
+        else:
+            colecao = comando.get(event.command_name)
+        argumento = comando.get(_ARGUMENTOS.get(event.command_name))
+        if isinstance(argumento, list) and event.command_name in ("update", "delete", "insert"):
+            formato = f"{len(argumento)} × {_formato(argumento[0])}" if argumento else "0 × ()"
+            valores = formato
+        else:
+            formato = _formato(argumento) if argumento is not None else ""
+            valores = repr(argumento)
+        pendentes = getattr(_render, "pendentes", None)
+        if pendentes is None:
+            pendentes = _render.pendentes = {}
+        pendentes[event.request_id] = (f"{event.command_name} {colecao}", formato, valores)
+
+    def _concluir(self, event, linhas):
+        pendente = getattr(_render, "pendentes", {}).pop(event.request_id, None)
+        if pendente is not None:
+            registrar(*pendente, event.duration_micros / 1_000_000, linhas)
+
+    def succeeded(self, event):
+        self._concluir(event, _linhas(event.reply))
+
+    def failed(self, event):
+        self._concluir(event, None)
+
+
+monitor_comandos = MonitorComandos()
+
+
+def suspeitas_n_mais_1(registros, limite=PERFIL_LIMITE_N_MAIS_1):
+    """Comandos repetidos com parâmetros diferentes mais de `limite` vezes na mesma renderização"""
+    grupos = defaultdict(list)
+    for registro in registros:
+        grupos[(registro["comando"], registro["parametros"])].append(registro)
+    return sorted((
+        {
+            "comando": comando,
+            "parametros": parametros,
+            "execucoes": len(grupo),
+            "parametros_distintos": len({registro["valores"] for registro in grupo}),
+            "ms": sum(registro["ms"] for registro in grupo),
+        }
+        for (comando, parametros), grupo in grupos.items()
+        if len({registro["valores"] for registro in grupo}) > limite
+    ), key=lambda suspeita: -suspeita["execucoes"])
+
+
+def iniciar_cpu(motor="cprofile"):
+    """Liga o profiler da renderização: pyinstrument se pedido e instalado, senão cProfile.
+
+    Retorna None quando outro profiler já está ativo no processo (outra sessão perfilando).
+    """
+    if motor == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            pass
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return ("pyinstrument", profiler)
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return ("cprofile", profiler)
+
+
+def parar_cpu(perfil, linhas=30):
+    """Desliga o profiler e retorna o relatório em texto"""
+    motor, profiler = perfil
+    if motor == "pyinstrument":
+        profiler.stop()
+        return profiler.output_text(unicode=True, color=False)
+
+    profiler.disable()
+    saida = io.StringIO()
+    pstats.Stats(profiler, stream=saida).sort_stats("cumulative").print_stats(linhas)
+    return saida.getvalue()
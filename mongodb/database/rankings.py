@@ -0,0 +1,35 @@
+from database.cache import memoizar
+from database.indices import ORDEM_ARTILHARIA, ORDEM_CARTOES
+
+# Ranking -> campo total do jogador
+RANKINGS = {
+    "⚽ Artilharia": "total_gols",
+    "🟨 Cartões": "total_cartoes",
+}
+# Campo -> ordenação atendida por um índice de jogadores (geral e com nome_equipe na frente)
+ORDENS = {
+    "total_gols": ORDEM_ARTILHARIA,
+    "total_cartoes": ORDEM_CARTOES,
+}
+
+
+def buscar_ranking(collections, campo, limite, equipe=None):
+    """Os `limite` primeiros jogadores pelo campo total, no geral ou de uma equipe.
+
+    Os totais ficam no próprio documento do jogador e recebem $inc a cada escrita de
+    estatística (atualizar_agregados), então o ranking é a leitura dos primeiros itens
+    do índice, sem agregar a coleção estatisticas.
+    """
+    filtro = {campo: {"$gt": 0}}
+    if equipe:
+        filtro["nome_equipe"] = equipe
+    return memoizar(
+        ("ranking", campo, limite, equipe),
+        lambda: list(
+            collections["jogadores"]
+            .find(filtro, {"nome": 1, "numero": 1, "nome_equipe": 1, "total_jogos": 1, "total_gols": 1, "total_cartoes": 1})
+            .sort(ORDENS[campo])
+            .limit(limite)
+        ),
+        ("jogadores",)
+    )
@@ -0,0 +1,20 @@
+import re
+from pymongo.errors import DuplicateKeyError
+
+
+def confronto(equipe1, equipe2):
+    """As duas equipes em ordem alfabética: A x B e B x A caem na mesma chave de uq_jogos_confronto"""
+    return "|".join(sorted((equipe1, equipe2)))
+
+
+def indice_violado(erro):
+    """Nome do índice único violado por um DuplicateKeyError; None para os demais erros.
+
+    Os formulários gravam direto e traduzem a violação numa mensagem, em vez de
+    consultar antes se o valor já existe.
+    """
+    if not isinstance(erro, DuplicateKeyError):
+        return None
+    # "E11000 duplicate key error collection: banco.colecao index: nome dup key: {...}"
+    encontrado = re.search(r"index: (\S+) dup key", str(erro))
+    return encontrado.group(1) if encontrado else None
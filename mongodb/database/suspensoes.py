@@ -0,0 +1,142 @@
+from pymongo import UpdateOne
+from config import SUSPENSAO_CARTOES_ACUMULADOS, SUSPENSAO_CARTOES_JOGO, SUSPENSAO_JOGOS
+from database.cache import memoizar
+from database.hidratacao import buscar_por_ids
+
+# Os jogos de cada jogador são percorridos na ordem (data, _id) do jogo
+
+
+def proximo_estado(acumulados, suspensao_jogo_id, jogo_id, cartoes):
+    """Aplica os cartões de um jogo ao estado (cartões acumulados, último jogo que gerou suspensão).
+
+    O acúmulo zera a cada suspensão, seja por atingir o limite de cartões acumulados
+    ou o limite de cartões num único jogo; um limite 0 fica desligado.
+    """
+    acumulados += cartoes
+    if (SUSPENSAO_CARTOES_ACUMULADOS and acumulados >= SUSPENSAO_CARTOES_ACUMULADOS) or \
+            (SUSPENSAO_CARTOES_JOGO and cartoes >= SUSPENSAO_CARTOES_JOGO):
+        return 0, jogo_id
+    return acumulados, suspensao_jogo_id
+
+
+def atualizar_suspensoes(collections, jogador_ids=None, inicio=None):
+    """Refaz o estado de suspensão dos jogadores a partir do jogo `inicio` = (data, _id).
+
+    Cada estatística guarda o estado do jogador depois daquele jogo; o percurso parte do
+    estado gravado na última estatística anterior a `inicio` e reescreve só as seguintes,
+    sem recalcular a temporada inteira. Sem `inicio`, percorre todos os jogos; sem
+    `jogador_ids`, todos os jogadores.
+    """
+    estados = {}
+    if jogador_ids is not None:
+        jogador_ids = list(jogador_ids)
+        if not jogador_ids:
+            return
+        estados = {jogador_id: (0, None) for jogador_id in jogador_ids}
+        filtro = {"jogador_id": {"$in": jogador_ids}}
+    else:
+        filtro = {"jogador_id": {"$ne": None}}
+
+    # O histórico de cartões vem ordenado pelo servidor, com a data de cada jogo via $lookup
+    linhas = collections["estatisticas"].aggregate([
+        {"$match": filtro},
+        {"$lookup": {"from": collections["jogos"].name, "localField": "jogo_id", "foreignField": "_id", "as": "jogo"}},
+        {"$unwind": "$jogo"},
+        {"$project": {
+            "jogador_id": 1, "jogo_id": 1, "cartoes": 1, "cartoes_acumulados": 1, "suspensao_jogo_id": 1,
+            "data": "$jogo.data"
+        }},
+        {"$sort": {"jogador_id": 1, "data": 1, "jogo_id": 1}},
+    ], allowDiskUse=True)
+
+    operacoes = []
+    for linha in linhas:
+        gravado = (linha.get("cartoes_acumulados"), linha.get("suspensao_jogo_id"))
+        if inicio and (linha["data"], linha["jogo_id"]) < inicio:
+            estados[linha["jogador_id"]] = (gravado[0] or 0, gravado[1])
+            continue
+        anterior = estados.get(linha["jogador_id"], (0, None))
+        estado = proximo_estado(*anterior, linha["jogo_id"], linha.get("cartoes") or 0)
+        estados[linha["jogador_id"]] = estado
+        if estado != gravado:
+            operacoes.append(UpdateOne(
+                {"_id": linha["_id"]},
+                {"$set": {"cartoes_acumulados": estado[0], "suspensao_jogo_id": estado[1]}}
+            ))
+
+    if operacoes:
+        collections["estatisticas"].bulk_write(operacoes, ordered=False)
+    if estados:
+        collections["jogadores"].bulk_write([
+            UpdateOne({"_id": jogador_id}, {"$set": {"cartoes_acumulados": acumulados, "suspensao_jogo_id": jogo_id}})
+            for jogador_id, (acumulados, jogo_id) in estados.items()
+        ], ordered=False)
+
+
+def atualizar_situacao(collections, jogador_ids=None, equipes=None):
+    """Marca como suspensos os jogadores que ainda não cumpriram a última suspensão.
+
+    A suspensão é cumprida quando a equipe atual do jogador disputa SUSPENSAO_JOGOS jogos
+    depois do que a gerou; um jogo conta como disputado quando já tem placar. Só mudam de
+    situação os jogadores com estatísticas alteradas e os das equipes dos jogos alterados,
+    então basta refazer esses; sem filtros, refaz todos.
+    """
+    condicoes = []
+    if jogador_ids:
+        condicoes.append({"_id": {"$in": list(jogador_ids)}})
+    if equipes:
+        condicoes.append({"nome_equipe": {"$in": list(equipes)}})
+    if (jogador_ids is not None or equipes is not None) and not condicoes:
+        return
+
+    candidatos = list(collections["jogadores"].find(
+        {"$or": condicoes} if condicoes else {}, {"nome_equipe": 1, "suspensao_jogo_id": 1, "suspenso": 1}
+    ))
+    gatilhos = buscar_por_ids(collections["jogos"], (c.get("suspensao_jogo_id") for c in candidatos), {"data": 1})
+
+    # Os SUSPENSAO_JOGOS últimos jogos disputados de cada equipe, do mais recente para o mais antigo
+    recentes = {}
+    if SUSPENSAO_JOGOS > 0:
+        for equipe in {c.get("nome_equipe") for c in candidatos if c.get("suspensao_jogo_id") in gatilhos} - {None}:
+            recentes[equipe] = [
+                (jogo["data"], jogo["_id"])
+                for jogo in collections["jogos"].find(
+                    {"$or": [{"nome_equipe1": equipe}, {"nome_equipe2": equipe}], "gols_equipe1": {"$ne": None}},
+                    {"data": 1}
+                ).sort([("data", -1), ("_id", -1)]).limit(SUSPENSAO_JOGOS)
+            ]
+
+    operacoes = []
+    for candidato in candidatos:
+        gatilho = gatilhos.get(candidato.get("suspensao_jogo_id"))
+        suspenso = False
+        if gatilho and SUSPENSAO_JOGOS > 0:
+            jogos = recentes.get(candidato.get("nome_equipe"), [])
+            # Cumprida se o SUSPENSAO_JOGOS-ésimo jogo mais recente da equipe é posterior ao que a gerou
+            suspenso = len(jogos) < SUSPENSAO_JOGOS or jogos[-1] <= (gatilho["data"], gatilho["_id"])
+        if suspenso != candidato.get("suspenso", False):
+            operacoes.append(UpdateOne({"_id": candidato["_id"]}, {"$set": {"suspenso": suspenso}}))
+    if operacoes:
+        collections["jogadores"].bulk_write(operacoes, ordered=False)
+
+
+def recalcular_suspensoes(collections):
+    """Refaz do zero o estado de suspensão de todos os jogadores"""
+    collections["jogadores"].update_many({}, {"$set": {"cartoes_acumulados": 0, "suspensao_jogo_id": None}})
+    atualizar_suspensoes(collections)
+    atualizar_situacao(collections)
+
+
+def jogadores_suspensos(collections):
+    """{_id do jogador: data do jogo que gerou a suspensão} dos jogadores suspensos para o próximo jogo"""
+    def calcular():
+        suspensos = {
+            jogador["_id"]: jogador.get("suspensao_jogo_id")
+            for jogador in collections["jogadores"].find({"suspenso": True}, {"suspensao_jogo_id": 1})
+        }
+        gatilhos = buscar_por_ids(collections["jogos"], suspensos.values(), {"data": 1})
+        return {
+            jogador_id: gatilhos[jogo_id]["data"]
+            for jogador_id, jogo_id in suspensos.items() if jogo_id in gatilhos
+        }
+    return memoizar("suspensos", calcular, ("jogadores", "jogos"))
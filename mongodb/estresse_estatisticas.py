@@ -0,0 +1,108 @@
+import argparse
+import random
+import sys
+import threading
+import time
+from pymongo.errors import PyMongoError
+from database.agregados import atualizar_agregados, verificar_agregados, JogoTravado, COLECOES_AGREGADAS
+from database.cache import invalidar
+from database.connection import get_db
+from database.estatisticas import somar_estatistica
+from database.models import get_collections
+
+# Teste de estresse da gravação de estatísticas: várias threads somando gols nos mesmos
+# (jogo, jogador) pelo mesmo caminho do cadastrar_estatisticas, e no final a conferência
+# de que nenhum gol se perdeu, não há documentos repetidos e os agregados batem com as estatísticas.
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(
+        description="Várias threads somando estatísticas nos mesmos (jogo, jogador) com somar_estatistica "
+                    "dentro de atualizar_agregados. Usa o primeiro jogo do banco e restaura os documentos "
+                    "originais ao final; sai com código 1 se encontrar alguma inconsistência."
+    )
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--gravacoes", type=int, default=200, help="gravações por thread")
+    parser.add_argument("--jogadores", type=int, default=4, help="jogadores disputados (menos = mais concorrência)")
+    return parser.parse_args()
+
+
+def _regravar(collections, jogo_id, pares, documentos):
+    """Troca as estatísticas dos pares pelos documentos dados, mantendo os agregados em dia"""
+    with atualizar_agregados(collections, [jogo_id]):
+        collections["estatisticas"].delete_many(pares)
+        if documentos:
+            collections["estatisticas"].insert_many(documentos)
+    invalidar("estatisticas", *COLECOES_AGREGADAS)
+
+
+def _trabalhador(collections, jogo_id, jogadores, gravacoes, semente, duracoes, resultado):
+    rng = random.Random(semente)
+    for _ in range(gravacoes):
+        inicio = time.perf_counter()
+        try:
+            with atualizar_agregados(collections, [jogo_id]):
+                somar_estatistica(collections, jogo_id, rng.choice(jogadores), 1, 0)
+            invalidar("estatisticas", *COLECOES_AGREGADAS)
+            resultado["gravadas"] += 1
+        except (PyMongoError, JogoTravado):
+            resultado["erros"] += 1
+        duracoes.append((time.perf_counter() - inicio) * 1000)
+
+
+def main():
+    args = _argumentos()
+    collections = get_collections(get_db())
+    jogo = collections["jogos"].find_one({}, {"nome_equipe1": 1}, sort=[("_id", 1)])
+    if jogo is None:
+        raise SystemExit("❌ Nenhum jogo cadastrado: rode o preencher_BD.py antes")
+    jogadores = [
+        jogador["_id"] for jogador in
+        collections["jogadores"].find({"nome_equipe": jogo["nome_equipe1"]}, {"_id": 1}).sort("_id", 1).limit(args.jogadores)
+    ]
+    pares = {"jogo_id": jogo["_id"], "jogador_id": {"$in": jogadores}}
+    originais = list(collections["estatisticas"].find(pares, {"jogo_id": 1, "jogador_id": 1, "gols": 1, "cartoes": 1}))
+
+    problemas = []
+    try:
+        _regravar(collections, jogo["_id"], pares, [])
+        duracoes = []
+        resultados = [{"gravadas": 0, "erros": 0} for _ in range(args.threads)]
+        threads = [
+            threading.Thread(
+                target=_trabalhador,
+                args=(collections, jogo["_id"], jogadores, args.gravacoes, semente, duracoes, resultados[semente])
+            )
+            for semente in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        documentos = list(collections["estatisticas"].find(pares, {"jogador_id": 1, "gols": 1}))
+        gravadas = sum(r["gravadas"] for r in resultados)
+        erros = sum(r["erros"] for r in resultados)
+        duplicatas = len(documentos) - len({d["jogador_id"] for d in documentos})
+        perdidos = gravadas - sum(d.get("gols", 0) for d in documentos)
+        duracoes.sort()
+        print(
+            f"p50 {duracoes[len(duracoes) // 2]:7.2f} ms  p95 {duracoes[int(len(duracoes) * 0.95)]:7.2f} ms  "
+            f"{gravadas} gravadas, {erros} erros, {duplicatas} duplicatas, {perdidos} gols perdidos"
+        )
+        if duplicatas or perdidos:
+            problemas.append("estatisticas")
+        divergencias = verificar_agregados(collections)
+        for colecao, linhas in divergencias.items():
+            print(f"❌ {colecao}: {len(linhas)} documentos divergentes das estatísticas")
+            problemas.append(colecao)
+    finally:
+        _regravar(collections, jogo["_id"], pares, originais)
+
+    if problemas:
+        sys.exit(1)
+    print("✅ Nenhum gol perdido, nenhuma duplicata e agregados em dia.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import streamlit as st
+import pandas as pd
+from database.connection import get_db
+from database.models import get_collections
+from database.indices import ORDEM_CLASSIFICACAO
+from database.cache import memoizar
+from database.metricas import operacao
+
+with st.spinner("Conectando ao banco de dados..."):
+    db = get_db()
+    collections = get_collections(db)
+
+@operacao
+def visualizar_classificacao():
+    st.subheader("🥇 Classificação")
+
+    tabela = memoizar(
+        "classificacao",
+        lambda: list(collections["classificacao"].find({}, {"_id": 0}).sort(ORDEM_CLASSIFICACAO)),
+        ("classificacao",)
+    )
+
+    if not tabela:
+        st.info("Nenhuma equipe cadastrada ainda.")
+        return
+
+    dados = [{
+        "Posição": posicao,
+        "Equipe": linha['nome_equipe'],
+        "Pontos": linha['pontos'],
+        "Jogos": linha['jogos'],
+        "Vitórias": linha['vitorias'],
+        "Empates": linha['empates'],
+        "Derrotas": linha['derrotas'],
+        "Gols Pró": linha['gols_pro'],
+        "Gols Contra": linha['gols_contra'],
+        "Saldo": linha['saldo'],
+        "Cartões": linha['cartoes']
+    } for posicao, linha in enumerate(tabela, start=1)]
+
+    st.dataframe(
+        pd.DataFrame(dados),
+        use_container_width=True,
+        column_config={
+            "Pontos": st.column_config.NumberColumn(format="%d 🏆"),
+            "Cartões": st.column_config.NumberColumn(format="%d 🟨")
+        },
+        hide_index=True
+    )
@@ -3,11 +3,16 @@ import pandas as pd
 from database.connection import get_db
 from database.models import get_collections
 from bson import ObjectId
+from database.agregados import linha_vazia
+from database.cache import memoizar, invalidar
+from database.restricoes import indice_violado
+from database.metricas import operacao
 
 with st.spinner("Conectando ao banco de dados..."):
     db = get_db()
     collections = get_collections(db)
 
+@operacao
 def cadastrar_equipe():
     st.header("Cadastrar Equipe")
     with st.form("team_form"):
@@ -20,16 +25,16 @@ def cadastrar_equipe():
                     st.error("O nome da equipe não pode estar vazio.")
                     return
                     
-                equipe_existente = collections["equipes"].find_one({"nome": nome_equipe})
-                if equipe_existente:
-                    st.error(f"Já existe uma equipe com o nome {nome_equipe}.")
-                    return
-                    
                 collections["equipes"].insert_one({"nome": nome_equipe})
+                collections["classificacao"].insert_one(linha_vazia(nome_equipe))
+                invalidar("equipes", "classificacao")
                 st.success(f"Equipe '{nome_equipe}' cadastrada com sucesso!")
                 st.rerun()
             except Exception as e:
-                st.error(f"Erro ao cadastrar equipe: {str(e)}")
+                if indice_violado(e) == "uq_equipes_nome":
+                    st.error(f"Já existe uma equipe com o nome {nome_equipe}.")
+                else:
+                    st.error(f"Erro ao cadastrar equipe: {str(e)}")
 
 def desassociar_jogadores_da_equipe(nome_equipe):
     collections["jogadores"].update_many(
@@ -46,6 +51,7 @@ def deletar_jogos_da_equipe(nome_equipe):
         collections["estatisticas"].delete_many({"jogo_id": jogo_id})
         collections["jogos"].delete_one({"_id": jogo_id})
 
+@operacao
 def deletar_equipe():
     st.header("Deletar Equipe")
     
@@ -82,18 +88,25 @@ def deletar_equipe():
                     
                 desassociar_jogadores_da_equipe(equipe_selecionada)
                 collections["equipes"].delete_one({"nome": equipe_selecionada})
+                collections["classificacao"].delete_one({"nome_equipe": equipe_selecionada})
+                invalidar("equipes", "jogadores", "classificacao")
                 st.success("Equipe deletada com sucesso!")
                 st.rerun()
             except Exception as e:
                 st.error(f"Erro ao deletar equipe: {str(e)}")
 
+@operacao
 def visualizar_equipe():
     st.subheader("🏆 Equipes Cadastradas")
     
-    equipes = list(collections["equipes"].find().sort("nome", 1))
+    equipes = memoizar(
+        "equipes", lambda: list(collections["equipes"].find({}, {"nome": 1}).sort("nome", 1)), ("equipes",)
+    )
 
     if equipes:
-        total_jogadores = collections["jogadores"].count_documents({})
+        total_jogadores = memoizar(
+            "total_jogadores", lambda: collections["jogadores"].count_documents({}), ("jogadores",)
+        )
         
         col1, col2, col3 = st.columns(3)
         col1.metric("Total de Equipes", len(equipes))
@@ -120,22 +133,10 @@ def visualizar_equipe():
             
             with col2:
                 if st.button("📊 Ver Estatísticas"):
-                    pipeline = [
-                        {"$match": {"nome_equipe": equipe_selecionada}},
-                        {"$lookup": {
-                            "from": "estatisticas",
-                            "localField": "_id",
-                            "foreignField": "jogador_id",
-                            "as": "estatisticas"
-                        }},
-                        {"$unwind": "$estatisticas"},
-                        {"$group": {
-                            "_id": None,
-                            "total_gols": {"$sum": "$estatisticas.gols"}
-                        }}
-                    ]
-                    resultado = list(collections["jogadores"].aggregate(pipeline))
-                    total_gols = resultado[0]['total_gols'] if resultado else 0
+                    total_gols = sum(
+                        j.get("total_gols", 0)
+                        for j in collections["jogadores"].find({"nome_equipe": equipe_selecionada}, {"total_gols": 1})
+                    )
                     st.metric("Total de Gols", int(total_gols))
 
         st.dataframe(
@@ -1,13 +1,76 @@
+import re
 import streamlit as st
 import pandas as pd  
 from database.connection import get_db
 from database.models import get_collections
 from bson import ObjectId
+from database.agregados import atualizar_agregados, COLECOES_AGREGADAS
+from database.cache import memoizar, invalidar
+from database.estatisticas import somar_estatistica
+from database.hidratacao import hidratar_estatisticas
+from database.metricas import operacao
+from database.rankings import buscar_ranking
+from database.suspensoes import jogadores_suspensos
+
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+# Barras do gráfico de gols sem filtros
+LIMITE_GRAFICO = 20
 
 with st.spinner("Conectando ao banco de dados..."):
     db = get_db()
     collections = get_collections(db)
 
+def filtro_estatisticas(nome_jogador=None):
+    """Filtro de estatisticas pelos jogadores cujo nome contém `nome_jogador`; vazio, todas"""
+    if not nome_jogador:
+        return {}
+    jogadores = collections["jogadores"].find(
+        {"nome": {"$regex": re.escape(nome_jogador), "$options": "i"}}, {"_id": 1}
+    )
+    return {"jogador_id": {"$in": [jogador["_id"] for jogador in jogadores]}}
+
+def buscar_estatisticas(filtro, limite, offset=0):
+    """Uma página de estatísticas, da mais recente para a mais antiga, já com o jogador e o jogo.
+
+    Só os documentos da página são hidratados (um $in por coleção), então o custo
+    não cresce com o total de estatísticas.
+    """
+    return hidratar_estatisticas(
+        collections,
+        collections["estatisticas"].find(filtro).sort("_id", -1).skip(offset).limit(limite)
+    )
+
+def paginacao(total, chave):
+    """Controles de paginação; retorna (limite, offset) da página escolhida"""
+    col1, col2 = st.columns(2)
+    with col1:
+        limite = st.selectbox("Itens por página:", TAMANHOS_PAGINA, index=1, key=f"{chave}_limite")
+    total_paginas = max(1, -(-total // limite))
+    with col2:
+        pagina = st.number_input(
+            f"Página (de {total_paginas}):",
+            min_value=1, max_value=total_paginas, value=1, step=1,
+            key=f"{chave}_pagina"
+        )
+    return limite, (pagina - 1) * limite
+
+def gols_por_jogador(filtro):
+    """Soma de gols por jogador das estatísticas do filtro: um $group e um $in para os nomes"""
+    somas = list(collections["estatisticas"].aggregate([
+        {"$match": filtro},
+        {"$group": {"_id": "$jogador_id", "gols": {"$sum": "$gols"}}},
+    ]))
+    nomes = {
+        jogador["_id"]: jogador["nome"]
+        for jogador in collections["jogadores"].find({"_id": {"$in": [s["_id"] for s in somas]}}, {"nome": 1})
+    }
+    linhas = {}
+    for soma in somas:
+        nome = nomes.get(soma["_id"], "Desconhecido")
+        linhas[nome] = linhas.get(nome, 0) + soma["gols"]
+    return [{"Jogador": nome, "Gols": gols} for nome, gols in linhas.items()]
+
+@operacao
 def cadastrar_estatisticas():
     st.header("Cadastrar Estatística de Jogador")
     
@@ -33,9 +96,13 @@ def cadastrar_estatisticas():
             else:
                 st.session_state.jogos_disponiveis = []
     
+    suspensos = jogadores_suspensos(collections)
     jogador_selecionado = st.selectbox(
         "Jogador:",
-        [f"{j['nome']} (#{j['numero']}) - {j.get('nome_equipe', 'Nenhuma')}" for j in jogadores],
+        [
+            f"{j['nome']} (#{j['numero']}) - {j.get('nome_equipe', 'Nenhuma')}{' 🟥 Suspenso' if j['_id'] in suspensos else ''}"
+            for j in jogadores
+        ],
         key="jogador_selected",
         on_change=update_jogos
     )
@@ -45,6 +112,12 @@ def cadastrar_estatisticas():
     
     jogador_nome = jogador_selecionado.split(" - ")[0].split(" (")[0]
     jogador = next(j for j in jogadores if j['nome'] == jogador_nome)
+
+    if jogador['_id'] in suspensos:
+        st.warning(
+            f"{jogador['nome']} está suspenso pelos cartões do jogo de "
+            f"{suspensos[jogador['_id']]} e não deveria atuar no próximo jogo da equipe."
+        )
     
     if not jogador.get('nome_equipe'):
         st.error("Este jogador não está vinculado a nenhuma equipe. Atualize o cadastro do jogador primeiro.")
@@ -80,44 +153,37 @@ def cadastrar_estatisticas():
                     st.error("Erro: Este jogador não pertence a nenhuma das equipes deste jogo!")
                     return
                 
-                estat_existente = collections["estatisticas"].find_one({
-                    "jogador_id": jogador['_id'],
-                    "jogo_id": jogo['_id']
-                })
-                
-                if estat_existente:
-                    collections["estatisticas"].update_one(
-                        {"_id": estat_existente['_id']},
-                        {"$inc": {"gols": gols, "cartoes": cartoes}}
-                    )
-                    msg = "Estatísticas atualizadas"
-                else:
-                    collections["estatisticas"].insert_one({
-                        "jogador_id": jogador['_id'],
-                        "jogo_id": jogo['_id'],
-                        "gols": gols,
-                        "cartoes": cartoes
-                    })
-                    msg = "Estatísticas cadastradas"
+                with atualizar_agregados(collections, [jogo['_id']]):
+                    if somar_estatistica(collections, jogo['_id'], jogador['_id'], gols, cartoes):
+                        msg = "Estatísticas cadastradas"
+                    else:
+                        msg = "Estatísticas atualizadas"
+                invalidar("estatisticas", *COLECOES_AGREGADAS)
                 
                 st.success(f"{msg} com sucesso para {jogador['nome']} no jogo {jogo['nome_equipe1']} vs {jogo['nome_equipe2']}!")
                 st.rerun()
             except Exception as e:
                 st.error(f"Erro ao salvar estatísticas: {str(e)}")
                 
+@operacao
 def deletar_estatisticas():
     st.header("Deletar Estatística de Jogador")
 
-    estatisticas = list(collections["estatisticas"].find())
+    nome_filtro = st.text_input("Filtrar por jogador:", key="delete_stats_nome").strip()
+    filtro = filtro_estatisticas(nome_filtro)
 
-    if not estatisticas:
-        st.info("Nenhuma estatística registrada ainda.")
+    total = collections["estatisticas"].count_documents(filtro)
+    if not total:
+        st.info("Nenhuma estatística registrada ainda." if not nome_filtro else "Nenhuma estatística encontrada para este jogador.")
         return
 
+    limite, offset = paginacao(total, "delete_stats")
+    estatisticas = buscar_estatisticas(filtro, limite, offset)
+
     opcoes = []
     for estat in estatisticas:
-        jogador = collections["jogadores"].find_one({"_id": estat['jogador_id']})
-        jogo = collections["jogos"].find_one({"_id": estat['jogo_id']})
+        jogador = estat['jogador']
+        jogo = estat['jogo']
 
         jogador_nome = jogador['nome'] if jogador else "Desconhecido"
         jogo_data = jogo['data'] if jogo else "Data?"
@@ -126,6 +192,7 @@ def deletar_estatisticas():
         opcoes.append({
             "label": f"{jogador_nome} - {jogo_data} em {jogo_local} (Gols: {estat['gols']}, Cartões: {estat['cartoes']})",
             "id": estat['_id'],
+            "jogo_id": estat['jogo_id'],
         })
 
     opcoes_labels = [op["label"] for op in opcoes]
@@ -134,12 +201,15 @@ def deletar_estatisticas():
     if st.button("Deletar"):
         try:
             selecionado = next(op for op in opcoes if op["label"] == escolha)
-            collections["estatisticas"].delete_one({"_id": selecionado["id"]})
+            with atualizar_agregados(collections, [selecionado["jogo_id"]]):
+                collections["estatisticas"].delete_one({"_id": selecionado["id"]})
+            invalidar("estatisticas", *COLECOES_AGREGADAS)
             st.success("Estatística deletada com sucesso!")
             st.rerun()
         except Exception as e:
             st.error(f"Erro ao deletar estatística: {str(e)}")
 
+@operacao
 def visualizar_estatisticas():
     st.subheader("📊 Estatísticas Registradas")
 
@@ -155,14 +225,16 @@ def visualizar_estatisticas():
                     del st.session_state.jogo_selecionado
                     st.rerun()
             else:
-                jogos = list(collections["jogos"].find().sort("data", -1))
+                jogos = memoizar("jogos", lambda: list(collections["jogos"].find().sort("data", -1)), ("jogos",))
                 jogo_selecionado = st.selectbox(
                     "Filtrar por jogo:",
                     ["Todos"] + [f"{j['data']} - {j['nome_equipe1']} vs {j['nome_equipe2']} (ID: {str(j['_id'])})" for j in jogos]
                 )
     
         with col2:
-            jogadores = list(collections["jogadores"].find().sort("nome", 1))
+            jogadores = memoizar(
+                "nomes_jogadores", lambda: list(collections["jogadores"].find({}, {"nome": 1}).sort("nome", 1)), ("jogadores",)
+            )
             jogador_selecionado = st.selectbox(
                 "Filtrar por jogador:",
                 ["Todos"] + [f"{j['nome']} (ID: {str(j['_id'])})" for j in jogadores]
@@ -179,13 +251,20 @@ def visualizar_estatisticas():
         jogador_id = jogador_selecionado.split("ID: ")[1].strip(")")
         match["jogador_id"] = ObjectId(jogador_id)
 
-    estatisticas = list(collections["estatisticas"].find(match))
+    total = collections["estatisticas"].count_documents(match)
+    if total:
+        st.caption(f"{total} estatísticas encontradas.")
+        limite, offset = paginacao(total, "view_stats")
+        estatisticas = memoizar(
+            ("estatisticas", match, limite, offset),
+            lambda: buscar_estatisticas(match, limite, offset),
+            ("estatisticas", "jogos", "jogadores")
+        )
 
-    if estatisticas:
         dados = []
         for estat in estatisticas:
-            jogador = collections["jogadores"].find_one({"_id": estat['jogador_id']})
-            jogo = collections["jogos"].find_one({"_id": estat['jogo_id']})
+            jogador = estat['jogador']
+            jogo = estat['jogo']
             
             dados.append({
                 "Jogador": jogador['nome'] if jogador else "Desconhecido",
@@ -206,25 +285,43 @@ def visualizar_estatisticas():
         )
         
         st.subheader("📈 Gols por Jogador")
-        df_gols = pd.DataFrame(dados).groupby("Jogador")["Gols"].sum().reset_index()
+        if match:
+            # Agregado sobre todas as estatísticas do filtro, não só as da página
+            df_gols = pd.DataFrame(
+                memoizar(("gols_por_jogador", match), lambda: gols_por_jogador(match), ("estatisticas", "jogadores")),
+                columns=["Jogador", "Gols"]
+            )
+        else:
+            # Sem filtros, só os artilheiros: os primeiros do índice dos totais embutidos em jogadores
+            st.caption(f"Os {LIMITE_GRAFICO} maiores artilheiros; o ranking completo fica em Rankings.")
+            df_gols = pd.DataFrame(
+                [{"Jogador": j['nome'], "Gols": j['total_gols']} for j in buscar_ranking(collections, "total_gols", LIMITE_GRAFICO)],
+                columns=["Jogador", "Gols"]
+            ).groupby("Jogador")["Gols"].sum().reset_index()
         st.bar_chart(df_gols.set_index("Jogador"))
         
     else:
         st.info("Nenhuma estatística encontrada com os filtros selecionados.")
         
+@operacao
 def editar_estatisticas():
     st.header("Editar Estatística de Jogador")
 
-    estatisticas = list(collections["estatisticas"].find())
+    nome_filtro = st.text_input("Filtrar por jogador:", key="edit_stats_nome").strip()
+    filtro = filtro_estatisticas(nome_filtro)
 
-    if not estatisticas:
-        st.info("Nenhuma estatística registrada ainda.")
+    total = collections["estatisticas"].count_documents(filtro)
+    if not total:
+        st.info("Nenhuma estatística registrada ainda." if not nome_filtro else "Nenhuma estatística encontrada para este jogador.")
         return
 
+    limite, offset = paginacao(total, "edit_stats")
+    estatisticas = buscar_estatisticas(filtro, limite, offset)
+
     opcoes = []
     for estat in estatisticas:
-        jogador = collections["jogadores"].find_one({"_id": estat['jogador_id']})
-        jogo = collections["jogos"].find_one({"_id": estat['jogo_id']})
+        jogador = estat['jogador']
+        jogo = estat['jogo']
 
         jogador_nome = jogador['nome'] if jogador else "Jogador Desconhecido"
         jogo_info = f"{jogo['data']} - {jogo['local']}" if jogo else "Jogo Desconhecido"
@@ -237,7 +334,7 @@ def editar_estatisticas():
     estat_id_str = estatistica_selecionada.split("ID: ")[1].strip()
     estat_id = ObjectId(estat_id_str)
     
-    estatistica = collections["estatisticas"].find_one({"_id": estat_id})
+    estatistica = next((e for e in estatisticas if e['_id'] == estat_id), None)
 
     if not estatistica:
         st.error("Estatística não encontrada.")
@@ -248,10 +345,12 @@ def editar_estatisticas():
 
     if st.button("Salvar Alterações"):
         try:
-            collections["estatisticas"].update_one(
-                {"_id": estat_id},
-                {"$set": {"gols": gols, "cartoes": cartoes}}
-            )
+            with atualizar_agregados(collections, [estatistica['jogo_id']]):
+                collections["estatisticas"].update_one(
+                    {"_id": estat_id},
+                    {"$set": {"gols": gols, "cartoes": cartoes}}
+                )
+            invalidar("estatisticas", *COLECOES_AGREGADAS)
             st.success("Estatística atualizada com sucesso!")
             st.rerun()
         except Exception as e:
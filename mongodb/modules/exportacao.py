@@ -0,0 +1,58 @@
+import os
+import tempfile
+import streamlit as st
+from pymongo.errors import PyMongoError
+from database.connection import get_db
+from database.models import get_collections
+from database.exportacao import exportar_colecao, FORMATOS
+from database.metricas import operacao
+
+TIPOS_MIME = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+with st.spinner("Conectando ao banco de dados..."):
+    db = get_db()
+    collections = get_collections(db)
+
+@operacao
+def exportar_dados():
+    st.header("Exportar Dados")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        nome_colecao = st.selectbox("Coleção:", list(collections))
+    with col2:
+        formato = st.selectbox("Formato:", FORMATOS)
+
+    if st.button("Gerar arquivo", type="primary"):
+        # O arquivo é gerado em disco, lote a lote, e só então oferecido para download
+        anterior = st.session_state.pop("exportacao", None)
+        if anterior and os.path.exists(anterior["caminho"]):
+            os.remove(anterior["caminho"])
+        try:
+            with st.spinner(f"Exportando {nome_colecao}..."):
+                with tempfile.NamedTemporaryFile(suffix=f".{formato}", delete=False) as destino:
+                    linhas = exportar_colecao(collections, nome_colecao, destino, formato)
+            st.session_state.exportacao = {
+                "caminho": destino.name,
+                "nome": f"{nome_colecao}.{formato}",
+                "formato": formato,
+                "linhas": linhas
+            }
+        except (PyMongoError, RuntimeError) as e:
+            os.remove(destino.name)
+            st.error(f"Erro ao exportar dados: {str(e)}")
+
+    exportacao = st.session_state.get("exportacao")
+    if exportacao and os.path.exists(exportacao["caminho"]):
+        st.success(f"{exportacao['linhas']} registros exportados para {exportacao['nome']}.")
+        with open(exportacao["caminho"], "rb") as arquivo:
+            st.download_button(
+                "Baixar arquivo",
+                arquivo,
+                file_name=exportacao["nome"],
+                mime=TIPOS_MIME[exportacao["formato"]]
+            )
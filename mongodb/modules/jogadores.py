@@ -1,22 +1,28 @@
+import re
 import streamlit as st
 import pandas as pd
 from database.connection import get_db
 from database.models import get_collections
 from bson import ObjectId
+from database.agregados import atualizar_agregados, jogos_do_jogador, CAMPOS_JOGADOR, COLECOES_AGREGADAS
+from database.cache import memoizar, invalidar
+from database.restricoes import indice_violado
+from database.suspensoes import jogadores_suspensos
+from database.metricas import operacao
 
 with st.spinner("Conectando ao banco de dados..."):
     db = get_db()
     collections = get_collections(db)
 
-def validate_player_number(numero, nome_equipe):
-    if nome_equipe == "Nenhuma":
-        return True
-    jogador_existente = collections["jogadores"].find_one({
-        "numero": numero,
-        "nome_equipe": nome_equipe
-    })
-    return not jogador_existente
+TAMANHOS_PAGINA = [25, 50, 100, 200]
 
+def mensagem_restricao(erro, numero):
+    """Mensagem para a violação do índice único (equipe, número)"""
+    if indice_violado(erro) == "uq_jogadores_equipe_numero":
+        return f"O número {numero} já está em uso nesta equipe."
+    return None
+
+@operacao
 def cadastrar_jogador():
     st.header("Cadastrar Jogador")
     
@@ -38,20 +44,19 @@ def cadastrar_jogador():
                     st.error("Nome é obrigatório")
                     return
                     
-                if equipe != "Nenhuma" and not validate_player_number(numero, equipe):
-                    st.error(f"O número {numero} já está em uso nesta equipe.")
-                    return
-                    
                 collections["jogadores"].insert_one({
                     "nome": nome,
                     "numero": numero,
-                    "nome_equipe": equipe if equipe != "Nenhuma" else None
+                    "nome_equipe": equipe if equipe != "Nenhuma" else None,
+                    **dict.fromkeys(CAMPOS_JOGADOR, 0)
                 })
+                invalidar("jogadores")
                 st.success("Jogador cadastrado com sucesso!")
                 st.rerun()
             except Exception as e:
-                st.error(f"Erro ao cadastrar jogador: {str(e)}")
+                st.error(mensagem_restricao(e, numero) or f"Erro ao cadastrar jogador: {str(e)}")
             
+@operacao
 def deletar_jogador():
     st.header("Deletar Jogador")
 
@@ -76,62 +81,130 @@ def deletar_jogador():
             jogador_id = ObjectId(jogador_id_str)
 
             # CASCADE - deletar estatísticas do jogador
-            collections["estatisticas"].delete_many({"jogador_id": jogador_id})
-            collections["jogadores"].delete_one({"_id": jogador_id})
+            with atualizar_agregados(collections, jogos_do_jogador(collections, jogador_id)):
+                collections["estatisticas"].delete_many({"jogador_id": jogador_id})
+                collections["jogadores"].delete_one({"_id": jogador_id})
+            invalidar("estatisticas", *COLECOES_AGREGADAS)
             
             st.success("Jogador e estatísticas relacionadas deletados com sucesso!")
             st.rerun()
         except Exception as e:
             st.error(f"Erro ao deletar jogador: {str(e)}")
 
+def buscar_pagina_jogadores(limite, apos=None, equipe=None, nome=None):
+    """Busca uma página de jogadores ordenada por (nome, _id) a partir da chave `apos` (keyset).
+
+    Lê limite + 1 documentos pelo índice idx_jogadores_nome para saber se existe próxima
+    página, sem skip(): o custo é o mesmo na primeira e na última página. Os totais
+    vêm embutidos no próprio documento do jogador.
+    """
+    filtros = []
+    if equipe:
+        filtros.append({"nome_equipe": equipe})
+    if nome:
+        filtros.append({"nome": {"$regex": re.escape(nome), "$options": "i"}})
+    if apos:
+        nome_apos, id_apos = apos
+        filtros.append({"$or": [
+            {"nome": {"$gt": nome_apos}},
+            {"nome": nome_apos, "_id": {"$gt": id_apos}}
+        ]})
+
+    query = {"$and": filtros} if filtros else {}
+    jogadores = memoizar(("pagina_jogadores", limite, apos, equipe, nome), lambda: list(
+        collections["jogadores"].find(
+            query, {"nome": 1, "numero": 1, "nome_equipe": 1, "cartoes_acumulados": 1, **dict.fromkeys(CAMPOS_JOGADOR, 1)}
+        )
+        .sort([("nome", 1), ("_id", 1)])
+        .limit(limite + 1)
+    ), ("jogadores",))
+    return jogadores[:limite], len(jogadores) > limite
+
+@operacao
 def visualizar_jogador():
     st.subheader("👟 Jogadores Cadastrados")
     
     col1, col2 = st.columns(2)
     with col1:
-        equipes = list(collections["equipes"].find().sort("nome", 1))
+        equipes = memoizar(
+            "equipes", lambda: list(collections["equipes"].find({}, {"nome": 1}).sort("nome", 1)), ("equipes",)
+        )
         equipe_filtro = st.selectbox(
             "Filtrar por equipe:",
             ["Todas"] + [e['nome'] for e in equipes]
         )
     with col2:
-        nome_filtro = st.text_input("Filtrar por nome:")
+        nome_filtro = st.text_input("Filtrar por nome:").strip()
 
-    query = {}
-    if equipe_filtro != "Todas":
-        query["nome_equipe"] = equipe_filtro
-    
-    if nome_filtro:
-        query["nome"] = {"$regex": nome_filtro, "$options": "i"}
+    col1, col2 = st.columns(2)
+    with col1:
+        limite = st.selectbox("Jogadores por página:", TAMANHOS_PAGINA, index=1, key="view_players_limite")
+    with col2:
+        modo = st.radio("Exibição:", ["Tabela", "Cartões"], horizontal=True, key="view_players_modo")
 
-    jogadores = list(collections["jogadores"].find(query).sort("nome", 1))
+    # Cada página começa depois da última chave (nome, _id) da anterior; filtros novos voltam ao início
+    estado = (equipe_filtro, nome_filtro, limite)
+    if st.session_state.get("view_players_filtros") != estado:
+        st.session_state.view_players_filtros = estado
+        st.session_state.view_players_chaves = [None]
+    chaves = st.session_state.view_players_chaves
+
+    jogadores, tem_proxima = buscar_pagina_jogadores(
+        limite, chaves[-1],
+        equipe=equipe_filtro if equipe_filtro != "Todas" else None,
+        nome=nome_filtro
+    )
 
     if jogadores:
-        cols = st.columns(3)
-        for i, jogador in enumerate(jogadores):
-            with cols[i % 3]:
-                with st.container(border=True):
-                    st.markdown(f"**{jogador['nome']}**")
-                    st.markdown(f"📌 Número: {jogador['numero']}")
-                    st.markdown(f"🏆 Equipe: {jogador.get('nome_equipe', 'Nenhuma')}")
-                    
-                    pipeline = [
-                        {"$match": {"jogador_id": jogador['_id']}},
-                        {"$group": {
-                            "_id": None,
-                            "total_gols": {"$sum": "$gols"},
-                            "total_cartoes": {"$sum": "$cartoes"}
-                        }}
-                    ]
-                    stats = list(collections["estatisticas"].aggregate(pipeline))
-                    total_gols = stats[0]['total_gols'] if stats else 0
-                    total_cartoes = stats[0]['total_cartoes'] if stats else 0
-                    
-                    st.markdown(f"⚽ Gols totais: {total_gols}")
-                    st.markdown(f"🟨 Cartões totais: {total_cartoes}")
+        for jogador in jogadores:
+            for campo in (*CAMPOS_JOGADOR, "cartoes_acumulados"):
+                jogador.setdefault(campo, 0)
+        suspensos = jogadores_suspensos(collections)
+
+        if modo == "Tabela":
+            st.dataframe(
+                pd.DataFrame([{
+                    "Nome": j['nome'],
+                    "Número": j['numero'],
+                    "Equipe": j.get('nome_equipe') or "Nenhuma",
+                    "Jogos": j['total_jogos'],
+                    "Gols": j['total_gols'],
+                    "Cartões": j['total_cartoes'],
+                    "Pendentes": j['cartoes_acumulados'],
+                    "Situação": "🟥 Suspenso" if j['_id'] in suspensos else "✅ Liberado"
+                } for j in jogadores]),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            cols = st.columns(3)
+            for i, jogador in enumerate(jogadores):
+                with cols[i % 3]:
+                    with st.container(border=True):
+                        st.markdown(f"**{jogador['nome']}**")
+                        if jogador['_id'] in suspensos:
+                            st.markdown(f"🟥 **Suspenso** pelos cartões do jogo de {suspensos[jogador['_id']]}")
+                        st.markdown(f"📌 Número: {jogador['numero']}")
+                        st.markdown(f"🏆 Equipe: {jogador.get('nome_equipe', 'Nenhuma')}")
+                        st.markdown(f"🏟️ Jogos: {jogador['total_jogos']}")
+                        st.markdown(f"⚽ Gols totais: {jogador['total_gols']}")
+                        st.markdown(f"🟨 Cartões totais: {jogador['total_cartoes']} ({jogador['cartoes_acumulados']} pendentes)")
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("◀ Anterior", disabled=len(chaves) == 1, key="view_players_anterior"):
+                chaves.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Página {len(chaves)}")
+        with col3:
+            if st.button("Próxima ▶", disabled=not tem_proxima, key="view_players_proxima"):
+                chaves.append((jogadores[-1]['nome'], jogadores[-1]['_id']))
+                st.rerun()
     else:
         st.info("Nenhum jogador encontrado com os filtros selecionados.")
         
+@operacao
 def editar_jogador():
     st.header("Editar Jogador")
 
@@ -169,19 +242,25 @@ def editar_jogador():
 
     if st.button("Salvar Alterações"):
         try:
+            # O MongoDB não tem chave estrangeira: a existência da equipe ainda é conferida antes
             if nome_equipe and not collections["equipes"].find_one({"nome": nome_equipe}):
                 st.error("A equipe selecionada não existe mais no banco de dados.")
                 return
 
-            collections["jogadores"].update_one(
-                {"_id": jogador_id},
-                {"$set": {
-                    "nome": nome,
-                    "numero": numero,
-                    "nome_equipe": nome_equipe
-                }}
-            )
+            # Trocar de equipe muda a atribuição dos gols nos jogos já registrados
+            jogos_afetados = jogos_do_jogador(collections, jogador_id) if nome_equipe != jogador.get('nome_equipe') else []
+
+            with atualizar_agregados(collections, jogos_afetados):
+                collections["jogadores"].update_one(
+                    {"_id": jogador_id},
+                    {"$set": {
+                        "nome": nome,
+                        "numero": numero,
+                        "nome_equipe": nome_equipe
+                    }}
+                )
+            invalidar(*COLECOES_AGREGADAS)
             st.success("Jogador atualizado com sucesso!")
             st.rerun()
         except Exception as e:
-            st.error(f"Erro ao atualizar jogador: {str(e)}")
\ No newline at end of file
+            st.error(mensagem_restricao(e, numero) or f"Erro ao atualizar jogador: {str(e)}")
\ No newline at end of file
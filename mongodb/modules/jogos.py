@@ -4,29 +4,23 @@ import pandas as pd
 from database.connection import get_db
 from database.models import get_collections
 from bson import ObjectId
+from database.agregados import atualizar_agregados, CAMPOS_PLACAR, COLECOES_AGREGADAS
+from database.cache import memoizar, invalidar
+from database.restricoes import confronto, indice_violado
+from database.hidratacao import hidratar_estatisticas
+from database.metricas import operacao
 
 with st.spinner("Conectando ao banco de dados..."):
     db = get_db()
     collections = get_collections(db)
 
-def validate_game(data, hora, equipe1, equipe2):
-    if equipe1 == equipe2:
-        return False, "As equipes devem ser diferentes"
-        
-    jogo_existente = collections["jogos"].find_one({
-        "$or": [
-            {"nome_equipe1": equipe1, "nome_equipe2": equipe2},
-            {"nome_equipe1": equipe2, "nome_equipe2": equipe1}
-        ],
-        "data": str(data),
-        "hora": str(hora)
-    })
-    
-    if jogo_existente:
-        return False, "Jogo já cadastrado"
-        
-    return True, ""
+def mensagem_restricao(erro):
+    """Mensagem para a violação do índice único do confronto"""
+    if indice_violado(erro) == "uq_jogos_confronto":
+        return "Jogo já cadastrado"
+    return None
 
+@operacao
 def cadastrar_jogo():
     st.header("Cadastrar Jogo")
     
@@ -46,9 +40,8 @@ def cadastrar_jogo():
         submitted = st.form_submit_button("Cadastrar")
         if submitted:
             try:
-                valid, msg = validate_game(data, hora, equipe1, equipe2)
-                if not valid:
-                    st.error(msg)
+                if equipe1 == equipe2:
+                    st.error("As equipes devem ser diferentes")
                     return
                     
                 collections["jogos"].insert_one({
@@ -56,13 +49,18 @@ def cadastrar_jogo():
                     "hora": str(hora),
                     "local": local,
                     "nome_equipe1": equipe1,
-                    "nome_equipe2": equipe2
+                    "nome_equipe2": equipe2,
+                    "confronto": confronto(equipe1, equipe2),
+                    # Sem estatísticas ainda: placar vazio até a primeira gravação
+                    **dict.fromkeys(CAMPOS_PLACAR)
                 })
+                invalidar("jogos")
                 st.success("Jogo cadastrado com sucesso!")
                 st.rerun()
             except Exception as e:
-                st.error(f"Erro ao cadastrar jogo: {str(e)}")
+                st.error(mensagem_restricao(e) or f"Erro ao cadastrar jogo: {str(e)}")
 
+@operacao
 def deletar_jogo():
     st.header("Deletar Jogo")
 
@@ -85,14 +83,17 @@ def deletar_jogo():
             jogo_id = ObjectId(jogo_id_str)
 
             # CASCADE - deletar estatísticas do jogo
-            collections["estatisticas"].delete_many({"jogo_id": jogo_id})
-            collections["jogos"].delete_one({"_id": jogo_id})
+            with atualizar_agregados(collections, [jogo_id]):
+                collections["estatisticas"].delete_many({"jogo_id": jogo_id})
+                collections["jogos"].delete_one({"_id": jogo_id})
+            invalidar("jogos", "estatisticas", *COLECOES_AGREGADAS)
             
             st.success("Jogo e suas estatísticas associadas deletados com sucesso!")
             st.rerun()
         except Exception as e:
             st.error(f"Erro ao deletar o jogo: {str(e)}")
 
+@operacao
 def mostrar_estatisticas_jogo(jogo_id):
     jogo = collections["jogos"].find_one({"_id": jogo_id})
     
@@ -100,27 +101,25 @@ def mostrar_estatisticas_jogo(jogo_id):
         st.error("Jogo não encontrado.")
         return
 
-    pipeline = [
-        {"$match": {"jogo_id": jogo_id}},
-        {"$lookup": {
-            "from": "jogadores",
-            "localField": "jogador_id",
-            "foreignField": "_id",
-            "as": "jogador"
-        }},
-        {"$unwind": "$jogador"},
-        {"$project": {
-            "jogador_nome": "$jogador.nome",
-            "nome_equipe": "$jogador.nome_equipe",
-            "numero": "$jogador.numero",
-            "gols": "$gols",
-            "cartoes": "$cartoes"
-        }}
+    estatisticas = [
+        {
+            "jogador_nome": estat['jogador']['nome'],
+            "nome_equipe": estat['jogador'].get('nome_equipe'),
+            "numero": estat['jogador']['numero'],
+            "gols": estat['gols'],
+            "cartoes": estat['cartoes']
+        }
+        for estat in hidratar_estatisticas(
+            collections,
+            collections["estatisticas"].find({"jogo_id": jogo_id}),
+            com_jogo=False
+        )
+        if estat['jogador']
     ]
-    estatisticas = list(collections["estatisticas"].aggregate(pipeline))
     
-    gols_equipe1 = sum(e['gols'] for e in estatisticas if e['nome_equipe'] == jogo['nome_equipe1'])
-    gols_equipe2 = sum(e['gols'] for e in estatisticas if e['nome_equipe'] == jogo['nome_equipe2'])
+    # Placar mantido pelas escritas de estatística (atualizar_agregados); None antes da primeira
+    gols_equipe1 = jogo.get('gols_equipe1') or 0
+    gols_equipe2 = jogo.get('gols_equipe2') or 0
 
     st.markdown(f"""
     <div style="
@@ -170,11 +169,9 @@ def mostrar_estatisticas_jogo(jogo_id):
             
         with col2:
             st.subheader("Cartões por Equipe")
-            cartoes_equipe1 = sum(e['cartoes'] for e in estatisticas if e['nome_equipe'] == jogo['nome_equipe1'])
-            cartoes_equipe2 = sum(e['cartoes'] for e in estatisticas if e['nome_equipe'] == jogo['nome_equipe2'])
             df_cartoes = pd.DataFrame({
                 "Equipe": [jogo['nome_equipe1'], jogo['nome_equipe2']],
-                "Cartões": [cartoes_equipe1, cartoes_equipe2]
+                "Cartões": [jogo.get('cartoes_equipe1') or 0, jogo.get('cartoes_equipe2') or 0]
             })
             st.bar_chart(df_cartoes.set_index("Equipe"))
     else:
@@ -197,6 +194,7 @@ def formatar_hora(hora_db):
                 return hora_db
     return hora_db
 
+@operacao
 def visualizar_jogo():
     st.subheader("📅 Jogos Cadastrados")
 
@@ -222,7 +220,9 @@ def visualizar_jogo():
             )
 
         with col3:
-            equipes = list(collections["equipes"].find().sort("nome", 1))
+            equipes = memoizar(
+                "equipes", lambda: list(collections["equipes"].find({}, {"nome": 1}).sort("nome", 1)), ("equipes",)
+            )
             equipe_filtro = st.selectbox(
                 "Filtrar por equipe",
                 ["Todas"] + [e['nome'] for e in equipes],
@@ -242,7 +242,7 @@ def visualizar_jogo():
             {"nome_equipe2": equipe_filtro}
         ]
 
-    jogos = list(collections["jogos"].find(query).sort("data", -1))
+    jogos = memoizar(("jogos", query), lambda: list(collections["jogos"].find(query).sort("data", -1)), ("jogos",))
 
     st.markdown(f"**Total de jogos encontrados:** {len(jogos)}")
     st.divider()
@@ -266,7 +266,10 @@ def visualizar_jogo():
             info_col, action_col = st.columns([3, 1])
 
             with info_col:
-                st.markdown(f"#### {jogo['nome_equipe1']} vs {jogo['nome_equipe2']}")
+                if jogo.get('gols_equipe1') is None:
+                    st.markdown(f"#### {jogo['nome_equipe1']} vs {jogo['nome_equipe2']}")
+                else:
+                    st.markdown(f"#### {jogo['nome_equipe1']} {jogo['gols_equipe1']} × {jogo['gols_equipe2']} {jogo['nome_equipe2']}")
                 st.markdown(f"📅 **Data:** {jogo['data']}")
                 st.markdown(f"🕒 **Hora:** {formatar_hora(jogo['hora'])}")
                 st.markdown(f"📍 **Local:** {jogo['local']}")
@@ -276,6 +279,7 @@ def visualizar_jogo():
                     st.session_state.jogo_selecionado = str(jogo['_id'])
                     st.rerun()
     
+@operacao
 def editar_jogo():
     st.header("Editar Jogo")
     st.warning("Editar um jogo irá deletar todas as estatísticas relacionadas ao mesmo")
@@ -333,20 +337,23 @@ def editar_jogo():
 
     if st.button("Salvar Alterações"):
         try:
-            collections["estatisticas"].delete_many({"jogo_id": jogo_id})
-            
-            collections["jogos"].update_one(
-                {"_id": jogo_id},
-                {"$set": {
-                    "data": str(data_jogo),
-                    "hora": str(hora_jogo),
-                    "local": local_jogo,
-                    "nome_equipe1": equipe1,
-                    "nome_equipe2": equipe2
-                }}
-            )
+            with atualizar_agregados(collections, [jogo_id]):
+                collections["estatisticas"].delete_many({"jogo_id": jogo_id})
+                
+                collections["jogos"].update_one(
+                    {"_id": jogo_id},
+                    {"$set": {
+                        "data": str(data_jogo),
+                        "hora": str(hora_jogo),
+                        "local": local_jogo,
+                        "nome_equipe1": equipe1,
+                        "nome_equipe2": equipe2,
+                        "confronto": confronto(equipe1, equipe2)
+                    }}
+                )
+            invalidar("jogos", "estatisticas", *COLECOES_AGREGADAS)
             
             st.success("Jogo atualizado e estatísticas relacionadas deletadas com sucesso!")
             st.rerun()
         except Exception as e:
-            st.error(f"Erro ao atualizar jogo: {str(e)}")
\ No newline at end of file
+            st.error(mensagem_restricao(e) or f"Erro ao atualizar jogo: {str(e)}")
\ No newline at end of file
@@ -2,12 +2,16 @@ import streamlit as st
 from database.connection import get_db
 from database.models import get_collections
 from bson import ObjectId
+from database.cache import invalidar
+from database.restricoes import indice_violado
+from database.metricas import operacao
 
 
 with st.spinner("Conectando ao banco de dados..."):
     db = get_db()
     collections = get_collections(db)
 
+@operacao
 def cadastrar_pessoa():
     with st.form("user_form"):
         login_pessoa = st.text_input("Login do Usuario:")
@@ -21,21 +25,21 @@ def cadastrar_pessoa():
                     st.error("Login e senha são obrigatórios")
                     return
                     
-                pessoa_existente = collections["pessoas"].find_one({"login": login_pessoa})
-                if pessoa_existente:
-                    st.error(f"Já existe um usuário com o login {login_pessoa}.")
-                    return
-                    
                 collections["pessoas"].insert_one({
                     "login": login_pessoa,
                     "senha": senha_pessoa,
                     "tipo": "administrador" if tipo_pessoa == "Administrador" else "usuario"
                 })
+                invalidar("pessoas")
                 st.success(f"Usuário '{login_pessoa}' cadastrado com sucesso!")
                 st.rerun()
             except Exception as e:
-                st.error(f"Erro ao cadastrar usuário: {str(e)}")
+                if indice_violado(e) == "uq_pessoas_login":
+                    st.error(f"Já existe um usuário com o login {login_pessoa}.")
+                else:
+                    st.error(f"Erro ao cadastrar usuário: {str(e)}")
 
+@operacao
 def deletar_pessoa():
     st.subheader("Deletar Usuario")
     
@@ -55,6 +59,7 @@ def deletar_pessoa():
             try:
                 pessoa_login_to_delete = pessoa_selecionada.split(" (Login: ")[1].strip(")")
                 collections["pessoas"].delete_one({"login": pessoa_login_to_delete})
+                invalidar("pessoas")
                 st.success("Usuário deletado com sucesso!")
                 st.rerun()
             except Exception as e:
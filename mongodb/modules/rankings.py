@@ -0,0 +1,52 @@
+import streamlit as st
+import pandas as pd
+from database.connection import get_db
+from database.models import get_collections
+from database.cache import memoizar
+from database.rankings import RANKINGS, buscar_ranking
+from database.metricas import operacao
+
+with st.spinner("Conectando ao banco de dados..."):
+    db = get_db()
+    collections = get_collections(db)
+
+@operacao
+def visualizar_rankings():
+    st.subheader("🏅 Rankings")
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        ranking = st.radio("Ranking", list(RANKINGS), horizontal=True, key="ranking_tipo")
+    with col2:
+        equipes = memoizar(
+            "equipes", lambda: list(collections["equipes"].find({}, {"nome": 1}).sort("nome", 1)), ("equipes",)
+        )
+        equipe = st.selectbox("Equipe", ["Todas"] + [e['nome'] for e in equipes], key="ranking_equipe")
+    with col3:
+        limite = st.number_input("Posições", min_value=5, max_value=100, value=10, step=5, key="ranking_limite")
+
+    jogadores = buscar_ranking(collections, RANKINGS[ranking], int(limite), None if equipe == "Todas" else equipe)
+
+    if not jogadores:
+        st.info("Nenhum jogador pontuou neste ranking ainda.")
+        return
+
+    dados = [{
+        "Posição": posicao,
+        "Jogador": jogador['nome'],
+        "Equipe": jogador.get('nome_equipe') or "Nenhuma",
+        "Número": jogador.get('numero'),
+        "Jogos": jogador.get('total_jogos', 0),
+        "Gols": jogador.get('total_gols', 0),
+        "Cartões": jogador.get('total_cartoes', 0)
+    } for posicao, jogador in enumerate(jogadores, start=1)]
+
+    st.dataframe(
+        pd.DataFrame(dados),
+        use_container_width=True,
+        column_config={
+            "Gols": st.column_config.NumberColumn(format="%d ⚽"),
+            "Cartões": st.column_config.NumberColumn(format="%d 🟨")
+        },
+        hide_index=True
+    )
@@ -0,0 +1,57 @@
+import streamlit as st
+import pandas as pd
+from database.connection import estatisticas_pool
+from database.cache import estatisticas_cache, limpar
+from database.metricas import operacao
+
+@operacao
+def visualizar_sistema():
+    st.header("⚙️ Sistema")
+
+    st.subheader("Pool de conexões do MongoDB")
+    pool = estatisticas_pool()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Conexões em uso", pool["conexoes_em_uso"])
+    col2.metric("Conexões abertas", pool["conexoes_abertas"])
+    col3.metric("Conexões criadas", pool["conexoes_criadas"])
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Checkouts", pool["checkouts"])
+    col2.metric("Espera média (ms)", round(pool["espera_media_ms"], 2))
+    col3.metric("Espera máxima (ms)", round(pool["espera_maxima_ms"], 2))
+
+    st.caption(
+        f"maxPoolSize={pool['max_pool_size']} • minPoolSize={pool['min_pool_size']} • "
+        f"falhas de checkout: {pool['falhas_checkout']}"
+    )
+
+    st.subheader("Cache das páginas de visualização")
+    cache = estatisticas_cache()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Acertos", cache["acertos"])
+    col2.metric("Falhas", cache["falhas"])
+    col3.metric("Taxa de acerto", f"{cache['taxa_acerto']:.1%}")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Entradas", f"{cache['entradas']} / {cache['max_entradas']}")
+    col2.metric("Invalidadas", cache["invalidadas"])
+    col3.metric("Versão global", cache["versao_global"])
+
+    st.caption(
+        f"Backend: {cache['backend']} • TTL de {cache['ttl_segundos']:.0f}s • acertos e falhas contados "
+        "neste processo • versão atual de cada coleção alterada:"
+    )
+    if cache["versoes"]:
+        st.dataframe(
+            pd.DataFrame(
+                [{"Coleção": colecao, "Versão": versao} for colecao, versao in sorted(cache["versoes"].items())]
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    if st.button("Limpar cache"):
+        limpar()
+        st.rerun()
@@ -1,7 +1,13 @@
+import argparse
 import datetime
 import random
+import time
 from database.connection import get_db
-from database.models import get_collections
+from database.models import get_collections, COLECOES
+from database import agregados
+from database.cache import invalidar
+from database.indices import criar_indices
+from database.restricoes import confronto
 from bson import ObjectId
 
 NOMES_JOGADORES = [
@@ -35,141 +41,206 @@ SOBRENOMES_JOGADORES = [
     "Andrade", "Tavares", "Caldeira", "Maciel", "Aguiar", "Viana", "Fogaça", "Vasconcelos", "Ximenes", "Zimmermann"
 ]
 
+EQUIPES = [
+    "Palmeiras", "Grêmio", "Atlético - MG", "Flamengo", "Botafogo", "Bragantino", "Fluminense",
+    "Athletico - PR", "Internacional", "Fortaleza", "São Paulo", "Cuiabá", "Corinthians", "Cruzeiro",
+    "Vasco", "Bahia", "Santos", "Goiás", "Coritiba", "América - MG"
+]
+
+LOCAIS = ["Maracanã", "Morumbi", "Mineirão", "Beira-Rio", "Fonte Nova", "Arena Corinthians", "Allianz Parque"]
+
+def _relatar(colecao, documentos, inicio):
+    """Imprime a vazão de inserção de uma coleção"""
+    duracao = time.perf_counter() - inicio
+    taxa = documentos / duracao if duracao > 0 else float("inf")
+    print(f"  -> {colecao}: {documentos} documentos em {duracao:.2f}s ({taxa:,.0f} docs/s)")
+
+def _inserir_em_lotes(colecao, documentos, tamanho_lote):
+    """insert_many(ordered=False) a cada lote; aceita um gerador de documentos"""
+    total = 0
+    lote = []
+    for documento in documentos:
+        lote.append(documento)
+        if len(lote) >= tamanho_lote:
+            colecao.insert_many(lote, ordered=False)
+            total += len(lote)
+            lote = []
+    if lote:
+        colecao.insert_many(lote, ordered=False)
+        total += len(lote)
+    return total
+
+def nomes_equipes(quantidade):
+    """Nomes dos clubes da Série A; acima de 20 equipes, gera nomes numerados"""
+    return [
+        EQUIPES[i] if i < len(EQUIPES) else f"{EQUIPES[i % len(EQUIPES)]} {i // len(EQUIPES) + 1}"
+        for i in range(quantidade)
+    ]
+
+def gerar_rodadas(equipes):
+    """Tabela de turno e returno pelo método do círculo: cada equipe joga uma vez por rodada"""
+    equipes = list(equipes)
+    if len(equipes) % 2:
+        equipes.append(None)
+    n = len(equipes)
+
+    turno = []
+    for r in range(n - 1):
+        rodada = []
+        for i in range(n // 2):
+            casa, fora = equipes[i], equipes[n - 1 - i]
+            if casa and fora:
+                rodada.append((casa, fora) if r % 2 == 0 else (fora, casa))
+        turno.append(rodada)
+        equipes = [equipes[0], equipes[-1]] + equipes[1:-1]
+
+    returno = [[(fora, casa) for casa, fora in rodada] for rodada in turno]
+    return turno + returno
+
+def gerar_estatisticas(rng, elenco_casa, elenco_fora, titulares):
+    """Gera (jogador_id, gols, cartoes) para os titulares das duas equipes de um jogo"""
+    for elenco in (elenco_casa, elenco_fora):
+        escalados = rng.sample(elenco, min(titulares, len(elenco)))
+        gols_equipe = rng.choices(range(6), weights=[25, 35, 22, 11, 5, 2])[0]
+        gols = dict.fromkeys(escalados, 0)
+        for autor in rng.choices(escalados, k=gols_equipe):
+            gols[autor] += 1
+        for jogador_id in escalados:
+            cartoes = 1 if rng.random() < 0.12 else 0
+            yield jogador_id, gols[jogador_id], cartoes
+
 def apagar_dados(db):
-    """Apaga todos os dados das coleções na ordem correta para evitar erros de referência."""
+    """Apaga todas as coleções."""
     print("Iniciando a limpeza do banco de dados...")
     try:
-        # Ordem importante devido às referências entre documentos
-        db["estatisticas"].delete_many({})
-        db["jogos"].delete_many({})
-        db["jogadores"].delete_many({})
-        db["equipes"].delete_many({})
-        db["pessoas"].delete_many({})
-        
+        # drop() é instantâneo mesmo com milhões de documentos; os índices são recriados em seguida
+        for colecao in get_collections(db).values():
+            colecao.drop()
+        criar_indices(db)
         print("Todas as coleções foram limpas com sucesso!")
     except Exception as e:
         print(f"Erro ao limpar dados: {e}")
+        raise
 
-def cadastrar_pessoas(db):
+def cadastrar_pessoas(db, tamanho_lote):
     """Cadastra os usuários iniciais do sistema (admin e usuário comum)."""
     lista = [
         {"login": "admin", "senha": "123", "tipo": "administrador"},
         {"login": "user",  "senha": "123", "tipo": "usuario"},
     ]
-    
-    try:
-        for p in lista:
-            if not db["pessoas"].find_one({"login": p["login"]}):
-                db["pessoas"].insert_one(p)
-                print(f"Pessoa '{p['login']}' cadastrada!")
-            else:
-                print(f"Pessoa '{p['login']}' já existe!")
-    except Exception as e:
-        print(f"Erro ao cadastrar pessoas: {e}")
+    inicio = time.perf_counter()
+    _relatar("pessoas", _inserir_em_lotes(db["pessoas"], lista, tamanho_lote), inicio)
 
-def cadastrar_equipes(db):
-    """Cadastra uma lista expandida de times brasileiros."""
-    nomes = [
-        "Flamengo", "Palmeiras", "Atlético - MG", "Cruzeiro"
-    ]
-    
-    try:
-        for nome in nomes:
-            if not db["equipes"].find_one({"nome": nome}):
-                db["equipes"].insert_one({"nome": nome})
-                print(f"Equipe '{nome}' cadastrada!")
-            else:
-                print(f"Equipe '{nome}' já existe!")
-    except Exception as e:
-        print(f"Erro ao cadastrar equipes: {e}")
+def cadastrar_equipes(db, nomes, tamanho_lote):
+    """Cadastra as equipes do campeonato."""
+    inicio = time.perf_counter()
+    _relatar("equipes", _inserir_em_lotes(db["equipes"], [{"nome": nome} for nome in nomes], tamanho_lote), inicio)
 
-def cadastrar_jogadores(db):
-    """Para cada equipe cadastrada, gera 11 jogadores com nomes e números aleatórios."""
-    try:
-        equipes = list(db["equipes"].find())
-        
-        for equipe in equipes:
-            print(f"Cadastrando jogadores para a equipe: {equipe['nome']}")
-            numeros_usados = set()
-            
-            for _ in range(11):
-                # Gera um nome completo aleatório
-                nome_completo = f"{random.choice(NOMES_JOGADORES)} {random.choice(SOBRENOMES_JOGADORES)}"
-                
-                # Garante um número de camisa único para o time
-                while True:
-                    numero = random.randint(1, 99)
-                    if numero not in numeros_usados:
-                        numeros_usados.add(numero)
-                        break
-                
-                # Verifica se já existe um jogador com o mesmo nome na equipe
-                if not db["jogadores"].find_one({
-                    "nome": nome_completo,
-                    "nome_equipe": equipe['nome']
-                }):
-                    jogador = {
-                        "nome": nome_completo,
-                        "numero": numero,
-                        "nome_equipe": equipe['nome']
-                    }
-                    db["jogadores"].insert_one(jogador)
-                    print(f"  -> Jogador '{nome_completo}' (camisa {numero}) cadastrado no {equipe['nome']}!")
-                else:
-                    print(f"  -> Jogador '{nome_completo}' já existe no {equipe['nome']}, pulando.")
-    except Exception as e:
-        print(f"Erro ao cadastrar jogadores: {e}")
+def cadastrar_jogadores(db, rng, nomes, jogadores_por_equipe, tamanho_lote):
+    """Gera o elenco de cada equipe (números de camisa únicos) e retorna {equipe: [ids]}."""
+    jogadores_por_equipe = min(jogadores_por_equipe, 99)
+    elencos = {}
+    documentos = []
+    for equipe in nomes:
+        for numero in sorted(rng.sample(range(1, 100), jogadores_por_equipe)):
+            jogador_id = ObjectId()
+            elencos.setdefault(equipe, []).append(jogador_id)
+            documentos.append({
+                "_id": jogador_id,
+                "nome": f"{rng.choice(NOMES_JOGADORES)} {rng.choice(SOBRENOMES_JOGADORES)}",
+                "numero": numero,
+                "nome_equipe": equipe
+            })
 
-def cadastrar_jogos(db):
-    """Cadastra 10 jogos aleatórios entre as equipes existentes."""
-    locais = ["Maracanã", "Morumbi", "Mineirão", "Beira-Rio", "Fonte Nova", "Arena Corinthians", "Allianz Parque"]
-    
-    try:
-        equipes = list(db["equipes"].find())
-        
-        if len(equipes) < 2:
-            print("Não há equipes suficientes para cadastrar jogos.")
-            return
-        
-        for i in range(10):
-            e1, e2 = random.sample(equipes, 2)
-            data = datetime.date(datetime.date.today().year, 3, 20) + datetime.timedelta(days=i)
-            
-            # Verifica se o jogo já existe
-            if not db["jogos"].find_one({
-                "$or": [
-                    {"nome_equipe1": e1['nome'], "nome_equipe2": e2['nome'], "data": str(data)},
-                    {"nome_equipe1": e2['nome'], "nome_equipe2": e1['nome'], "data": str(data)}
-                ]
-            }):
-                jogo = {
+    inicio = time.perf_counter()
+    _relatar("jogadores", _inserir_em_lotes(db["jogadores"], documentos, tamanho_lote), inicio)
+    return elencos
+
+def cadastrar_jogos(db, rng, nomes, temporadas, rodadas, ano_inicial, tamanho_lote):
+    """Cadastra turno e returno de cada temporada (uma rodada por semana) e retorna os jogos com ids."""
+    tabela = gerar_rodadas(nomes)[:rodadas]
+    documentos = []
+    for temporada in range(temporadas):
+        abertura = datetime.date(ano_inicial + temporada, 4, 15)
+        for numero_rodada, rodada in enumerate(tabela):
+            data = abertura + datetime.timedelta(weeks=numero_rodada)
+            for casa, fora in rodada:
+                documentos.append({
+                    "_id": ObjectId(),
                     "data": str(data),
-                    "hora": f"{random.randint(16, 22)}:00",
-                    "local": random.choice(locais),
-                    "nome_equipe1": e1['nome'],
-                    "nome_equipe2": e2['nome']
-                }
-                db["jogos"].insert_one(jogo)
-                print(f"Jogo {e1['nome']} x {e2['nome']} cadastrado!")
-            else:
-                print(f"Jogo {e1['nome']} x {e2['nome']} já existe!")
-    except Exception as e:
-        print(f"Erro ao cadastrar jogos: {e}")
+                    "hora": str(datetime.time(rng.choice([16, 18, 19, 21]), 0)),
+                    "local": rng.choice(LOCAIS),
+                    "nome_equipe1": casa,
+                    "nome_equipe2": fora,
+                    "confronto": confronto(casa, fora)
+                })
+
+    inicio = time.perf_counter()
+    _relatar("jogos", _inserir_em_lotes(db["jogos"], documentos, tamanho_lote), inicio)
+    return [(j["_id"], j["nome_equipe1"], j["nome_equipe2"]) for j in documentos]
+
+def cadastrar_estatisticas(db, rng, jogos, elencos, titulares, tamanho_lote):
+    """Gera as estatísticas dos titulares de cada jogo, em lotes, sem manter a temporada em memória."""
+    documentos = (
+        {"jogo_id": jogo_id, "jogador_id": jogador_id, "gols": gols, "cartoes": cartoes}
+        for jogo_id, casa, fora in jogos
+        for jogador_id, gols, cartoes in gerar_estatisticas(rng, elencos[casa], elencos[fora], titulares)
+    )
+    inicio = time.perf_counter()
+    _relatar("estatisticas", _inserir_em_lotes(db["estatisticas"], documentos, tamanho_lote), inicio)
 
-def preencher_bd():
+def recalcular_agregados(db):
+    """Reconstrói as coleções agregadas depois da carga em massa."""
+    inicio = time.perf_counter()
+    agregados.recalcular_agregados(get_collections(db))
+    print(f"  -> agregados recalculados em {time.perf_counter() - inicio:.2f}s")
+
+def preencher_bd(equipes=20, jogadores=30, rodadas=None, temporadas=1, titulares=14,
+                 semente=42, tamanho_lote=5000, ano_inicial=2023):
     """Função principal para limpar e popular o banco de dados."""
+    rng = random.Random(semente)
+    nomes = nomes_equipes(equipes)
+    rodadas = rodadas or 2 * (len(nomes) - 1 + len(nomes) % 2)
+
     try:
         db = get_db()
-        collections = get_collections(db)
-        
         apagar_dados(db)
-        cadastrar_pessoas(db)
-        cadastrar_equipes(db)
-        cadastrar_jogadores(db)
-        cadastrar_jogos(db)
+        print(f"Gerando {temporadas} temporada(s): {equipes} equipes x {jogadores} jogadores x {rodadas} rodadas (semente {semente})")
+        cadastrar_pessoas(db, tamanho_lote)
+        cadastrar_equipes(db, nomes, tamanho_lote)
+        elencos = cadastrar_jogadores(db, rng, nomes, jogadores, tamanho_lote)
+        jogos = cadastrar_jogos(db, rng, nomes, temporadas, rodadas, ano_inicial, tamanho_lote)
+        cadastrar_estatisticas(db, rng, jogos, elencos, titulares, tamanho_lote)
+        recalcular_agregados(db)
         print("\nBanco de dados populado com sucesso!")
     except Exception as e:
         print(f"\nErro durante a população do BD: {e}")
+        raise
+    finally:
+        # Os workers do Streamlit que compartilham o cache passam a ler o banco novo
+        invalidar(*COLECOES)
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Limpa e popula o banco com uma ou mais temporadas geradas.")
+    parser.add_argument("--equipes", type=int, default=20)
+    parser.add_argument("--jogadores", type=int, default=30, help="jogadores por equipe (máx. 99)")
+    parser.add_argument("--rodadas", type=int, default=None, help="padrão: turno e returno completos")
+    parser.add_argument("--temporadas", type=int, default=1)
+    parser.add_argument("--titulares", type=int, default=14, help="jogadores com estatística por equipe em cada jogo")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=5000, help="documentos por insert_many")
+    parser.add_argument("--ano-inicial", type=int, default=2023)
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    preencher_bd()
\ No newline at end of file
+    args = _argumentos()
+    preencher_bd(
+        equipes=args.equipes,
+        jogadores=args.jogadores,
+        rodadas=args.rodadas,
+        temporadas=args.temporadas,
+        titulares=args.titulares,
+        semente=args.semente,
+        tamanho_lote=args.lote,
+        ano_inicial=args.ano_inicial
+    )
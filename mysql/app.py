@@ -1,7 +1,15 @@
 import streamlit as st
-from database.connection import get_db
+import time
+from database.connection import get_db, ConexaoSobDemanda
+from database.cache import iniciar_render, consultas_desatualizadas
+from database import perfil, metricas
 from mysql.connector import Error
 
+inicio_render = time.perf_counter()
+# O /metrics sobe antes de qualquer acesso ao banco: é justamente com o banco fora
+# do ar que as métricas mais fazem falta (sem HABILITADAS, não faz nada)
+metricas.iniciar_servidor()
+
 st.set_page_config(
     page_title="⚽ CBF Manager",
     page_icon="./assets/CBF.png",
@@ -20,6 +28,11 @@ if "logado" not in st.session_state:
 if "pessoa" not in st.session_state:
     st.session_state.pessoa = None
 
+def abrir_aba(pagina, abas, *args):
+    """Como st.tabs, mas só a função da aba escolhida roda; as demais não vão ao banco"""
+    aba = st.radio("Aba", list(abas), horizontal=True, label_visibility="collapsed", key=f"aba_{pagina}")
+    abas[aba](*args)
+
 if not st.session_state.logado:
     st.title("🔐 Login - CBF Manager")
     
@@ -32,13 +45,16 @@ if not st.session_state.logado:
             if st.button("Entrar", type="primary", use_container_width=True):
                 try:
                     conn = get_db()
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute(
-                        "SELECT * FROM pessoas WHERE login = %s AND senha = %s",
-                        (login, senha)
-                    )
-                    pessoa = cursor.fetchone()
-                    cursor.close()
+                    try:
+                        cursor = conn.cursor(dictionary=True)
+                        cursor.execute(
+                            "SELECT * FROM pessoas WHERE login = %s AND senha = %s",
+                            (login, senha)
+                        )
+                        pessoa = cursor.fetchone()
+                        cursor.close()
+                    finally:
+                        conn.close()
                     
                     if pessoa:
                         st.success(f"✅ Bem-vindo, {pessoa['login']}!") 
@@ -72,9 +88,12 @@ else:
                 "👟 Jogadores",
                 "🏆 Equipes",
                 "⚽ Jogos",
-                "📊 Estatísticas"
+                "📊 Estatísticas",
+                "📤 Exportar Dados",
+                "⚙️ Sistema"
             ]
             page = st.selectbox("Selecione uma opção:", menu_opcoes)
+            perfilar = st.toggle("🔬 Perfil de consultas", key="perfil_consultas")
         else:
             st.subheader("📋 Menu do Usuário")
             menu_opcoes = [
@@ -82,60 +101,74 @@ else:
                 "👟 Visualizar Jogadores",
                 "🏆 Visualizar Equipes",
                 "⚽ Visualizar Jogos",
-                "📊 Visualizar Estatísticas"
+                "📊 Visualizar Estatísticas",
+                "🥇 Visualizar Classificação",
+                "🏅 Visualizar Rankings"
             ]
             page = st.selectbox("Selecione uma opção:", menu_opcoes)
+            perfilar = False
 
     st.title("⚽ CBF Manager")
+    aviso_desatualizado = st.empty()
+    iniciar_render()
+
+    perfil_cpu = relatorio_cpu = None
+    if perfilar:
+        perfil.iniciar()
+        if "perfil" in st.query_params:
+            perfil_cpu = perfil.iniciar_cpu(st.query_params["perfil"])
     
     try:
-        conn = get_db()
+        # A conexão só sai do pool quando alguma consulta não for atendida pelo cache
+        conn = ConexaoSobDemanda()
         
         if st.session_state.pessoa["tipo"] == "administrador":
             if page == "👥 Usuários":
                 from modules import pessoas
-                tab1, tab2 = st.tabs(["Cadastrar", "Deletar"])
-                with tab1:
-                    pessoas.cadastrar_pessoa(conn)
-                with tab2:
-                    pessoas.deletar_pessoa(conn)
+                abrir_aba(page, {
+                    "Cadastrar": pessoas.cadastrar_pessoa,
+                    "Deletar": pessoas.deletar_pessoa,
+                }, conn)
                         
             elif page == "👟 Jogadores":
                 from modules import jogadores
-                tab1, tab2, tab3 = st.tabs(["Cadastrar", "Editar", "Deletar"])
-                with tab1:
-                    jogadores.cadastrar_jogador(conn)
-                with tab2:
-                    jogadores.editar_jogador(conn)
-                with tab3:
-                    jogadores.deletar_jogador(conn)
+                abrir_aba(page, {
+                    "Cadastrar": jogadores.cadastrar_jogador,
+                    "Editar": jogadores.editar_jogador,
+                    "Deletar": jogadores.deletar_jogador,
+                }, conn)
             elif page == "🏆 Equipes":
                 from modules import equipes
-                tab1, tab2 = st.tabs(["Cadastrar", "Deletar"])
-                with tab1:
-                    equipes.cadastrar_equipe(conn)
-                with tab2:
-                    equipes.deletar_equipe(conn)
+                abrir_aba(page, {
+                    "Cadastrar": equipes.cadastrar_equipe,
+                    "Deletar": equipes.deletar_equipe,
+                }, conn)
                 
             elif page == "⚽ Jogos":
                 from modules import jogos
-                tab1, tab2, tab3 = st.tabs(["Cadastrar", "Editar", "Deletar"])
-                with tab1:
-                    jogos.cadastrar_jogo(conn)
-                with tab2:
-                    jogos.editar_jogo(conn)
-                with tab3:
-                    jogos.deletar_jogo(conn)
+                abrir_aba(page, {
+                    "Cadastrar": jogos.cadastrar_jogo,
+                    "Editar": jogos.editar_jogo,
+                    "Deletar": jogos.deletar_jogo,
+                }, conn)
                 
             elif page == "📊 Estatísticas":
                 from modules import estatisticas
-                tab1, tab2, tab3 = st.tabs(["Cadastrar", "Editar", "Deletar"])
-                with tab1:
-                    estatisticas.cadastrar_estatisticas(conn)
-                with tab2:
-                    estatisticas.editar_estatisticas(conn)
-                with tab3:
-                    estatisticas.deletar_estatisticas(conn)
+                from modules import importacao
+                abrir_aba(page, {
+                    "Cadastrar": estatisticas.cadastrar_estatisticas,
+                    "Editar": estatisticas.editar_estatisticas,
+                    "Deletar": estatisticas.deletar_estatisticas,
+                    "Importar": importacao.importar_arquivo,
+                }, conn)
+
+            elif page == "📤 Exportar Dados":
+                from modules import exportacao
+                exportacao.exportar_dados(conn)
+
+            elif page == "⚙️ Sistema":
+                from modules import sistema
+                sistema.visualizar_sistema()
         
         else:
             if page == "👟 Visualizar Jogadores":
@@ -150,9 +183,29 @@ else:
             elif page == "📊 Visualizar Estatísticas":
                 from modules import estatisticas
                 estatisticas.visualizar_estatisticas(conn)
+            elif page == "🥇 Visualizar Classificação":
+                from modules import classificacao
+                classificacao.visualizar_classificacao(conn)
+            elif page == "🏅 Visualizar Rankings":
+                from modules import rankings
+                rankings.visualizar_rankings(conn)
                 
     except Error as e:
         st.error(f"Erro ao conectar ao banco de dados: {str(e)}")
     finally:
-        if 'conn' in locals() and conn.is_connected():
-            conn.close()
\ No newline at end of file
+        if 'conn' in locals():
+            conn.close()
+        if perfil_cpu:
+            relatorio_cpu = perfil.parar_cpu(perfil_cpu)
+        registros = perfil.encerrar()
+        metricas.observar_render(page, time.perf_counter() - inicio_render)
+
+    if consultas_desatualizadas():
+        aviso_desatualizado.warning(
+            "⚠️ Desatualizado: o banco de dados está sobrecarregado ou indisponível, "
+            "exibindo a última versão guardada destes dados."
+        )
+
+    if perfilar:
+        from modules.perfil import mostrar_perfil
+        mostrar_perfil(registros, relatorio_cpu)
@@ -0,0 +1,360 @@
+from collections import Counter
+from contextlib import contextmanager
+from database.cache import invalidar
+from database.suspensoes import atualizar_suspensoes, atualizar_situacao, recalcular_suspensoes
+
+CAMPOS_CLASSIFICACAO = ("jogos", "vitorias", "empates", "derrotas", "gols_pro", "gols_contra", "pontos", "cartoes")
+CAMPOS_JOGADOR = ("jogos", "gols", "cartoes")
+# Colunas de placar da tabela jogo, na ordem devolvida por placar()
+CAMPOS_PLACAR = ("gols_equipe1", "gols_equipe2", "cartoes_equipe1", "cartoes_equipe2")
+# Tabelas reescritas por atualizar_agregados, para invalidar o cache junto com a escrita
+TABELAS_AGREGADAS = ("classificacao", "jogador_totais", "jogo")
+
+
+def _marcadores(valores):
+    return ", ".join(["%s"] * len(valores))
+
+
+def _carregar_jogos(cursor, jogo_ids):
+    """Lê os jogos e suas estatísticas (com a equipe atual de cada jogador) em uma única consulta"""
+    if not jogo_ids:
+        return {}
+
+    cursor.execute(f"""
+        SELECT g.id AS jogo_id, g.data, g.equipe1_id, g.equipe2_id,
+               e.jogador_id, e.gols, e.cartoes, j.nome_equipe
+        FROM jogo g
+        LEFT JOIN estatistica e ON e.jogo_id = g.id
+        LEFT JOIN jogador j ON j.id = e.jogador_id
+        WHERE g.id IN ({_marcadores(jogo_ids)})
+    """, list(jogo_ids))
+
+    jogos = {}
+    for linha in cursor.fetchall():
+        jogo = jogos.setdefault(linha['jogo_id'], {
+            "data": linha['data'],
+            "equipe1": linha['equipe1_id'],
+            "equipe2": linha['equipe2_id'],
+            "estatisticas": []
+        })
+        if linha['jogador_id'] is not None:
+            jogo["estatisticas"].append({
+                "jogador_id": linha['jogador_id'],
+                "nome_equipe": linha['nome_equipe'],
+                "gols": linha['gols'] or 0,
+                "cartoes": linha['cartoes'] or 0
+            })
+    return jogos
+
+
+def _bloquear_jogos(cursor, jogo_ids):
+    """Trava as linhas dos jogos até o fim da transação, em ordem de id para não gerar deadlock.
+
+    Duas escritas no mesmo jogo passam a capturar o estado uma depois da outra; sem isso as
+    duas partiriam do mesmo "antes" e o resultado (vitória/empate/derrota) seria contado em dobro.
+    Precisa ser a primeira leitura da transação: as leituras seguintes abrem o snapshot já
+    com a escrita concorrente confirmada.
+    """
+    if not jogo_ids:
+        return
+    cursor.execute(
+        f"SELECT id FROM jogo WHERE id IN ({_marcadores(jogo_ids)}) ORDER BY id FOR UPDATE", sorted(jogo_ids)
+    )
+    cursor.fetchall()
+
+
+def placar(jogo):
+    """Retorna (gols_equipe1, gols_equipe2, cartoes_equipe1, cartoes_equipe2) de um jogo carregado"""
+    gols = {jogo["equipe1"]: 0, jogo["equipe2"]: 0}
+    cartoes = {jogo["equipe1"]: 0, jogo["equipe2"]: 0}
+    for estat in jogo["estatisticas"]:
+        if estat["nome_equipe"] in gols:
+            gols[estat["nome_equipe"]] += estat["gols"]
+            cartoes[estat["nome_equipe"]] += estat["cartoes"]
+    return gols[jogo["equipe1"]], gols[jogo["equipe2"]], cartoes[jogo["equipe1"]], cartoes[jogo["equipe2"]]
+
+
+def _placar_gravado(jogo):
+    """Placar guardado na linha do jogo; NULL enquanto o jogo não tem estatísticas (não disputado)"""
+    if not jogo["estatisticas"]:
+        return (None,) * len(CAMPOS_PLACAR)
+    return placar(jogo)
+
+
+def _contribuicao(jogo):
+    """Linhas da classificação geradas por um jogo; jogos sem estatísticas ainda não foram disputados"""
+    if not jogo["estatisticas"]:
+        return {}
+
+    gols1, gols2, cartoes1, cartoes2 = placar(jogo)
+    resultado = {}
+    for equipe, pro, contra, cartoes in (
+        (jogo["equipe1"], gols1, gols2, cartoes1),
+        (jogo["equipe2"], gols2, gols1, cartoes2),
+    ):
+        resultado[equipe] = Counter({
+            "jogos": 1,
+            "vitorias": int(pro > contra),
+            "empates": int(pro == contra),
+            "derrotas": int(pro < contra),
+            "gols_pro": pro,
+            "gols_contra": contra,
+            "pontos": 3 if pro > contra else 1 if pro == contra else 0,
+            "cartoes": cartoes
+        })
+    return resultado
+
+
+def _contribuicao_jogadores(jogo):
+    """Totais de cada jogador gerados por um jogo: uma partida e os gols/cartões registrados nela"""
+    return {
+        estat["jogador_id"]: Counter({"jogos": 1, "gols": estat["gols"], "cartoes": estat["cartoes"]})
+        for estat in jogo["estatisticas"]
+    }
+
+
+def _deltas(antes, depois, contribuicao, campos):
+    """Diferença por chave entre as contribuições dos jogos depois e antes da escrita"""
+    deltas = {}
+    for jogo in antes.values():
+        for chave, linha in contribuicao(jogo).items():
+            deltas.setdefault(chave, Counter()).subtract(linha)
+    for jogo in depois.values():
+        for chave, linha in contribuicao(jogo).items():
+            deltas.setdefault(chave, Counter()).update(linha)
+    return {
+        chave: delta for chave, delta in deltas.items()
+        if any(delta[campo] for campo in campos)
+    }
+
+
+def _somar(cursor, tabela, chave, campos, deltas):
+    """Soma os deltas às linhas da tabela agregada, criando as que ainda não existem"""
+    if not deltas:
+        return
+    colunas = ", ".join(campos)
+    atualizacoes = ", ".join(f"{campo} = {campo} + VALUES({campo})" for campo in campos)
+    cursor.executemany(f"""
+        INSERT INTO {tabela} ({chave}, {colunas})
+        VALUES (%s, {_marcadores(campos)})
+        ON DUPLICATE KEY UPDATE {atualizacoes}
+    """, [(valor, *[delta[campo] for campo in campos]) for valor, delta in deltas.items()])
+
+
+def _aplicar_classificacao(cursor, antes, depois):
+    deltas = _deltas(antes, depois, _contribuicao, CAMPOS_CLASSIFICACAO)
+    _somar(cursor, "classificacao", "nome_equipe", CAMPOS_CLASSIFICACAO, deltas)
+
+
+def _aplicar_placar(cursor, jogos):
+    """Grava o placar dos jogos carregados nas colunas da tabela jogo"""
+    if not jogos:
+        return
+    atribuicoes = ", ".join(f"{campo} = %s" for campo in CAMPOS_PLACAR)
+    cursor.executemany(
+        f"UPDATE jogo SET {atribuicoes} WHERE id = %s",
+        [(*_placar_gravado(jogo), jogo_id) for jogo_id, jogo in jogos.items()]
+    )
+
+
+def _aplicar_jogador_totais(cursor, antes, depois):
+    deltas = _deltas(antes, depois, _contribuicao_jogadores, CAMPOS_JOGADOR)
+    if deltas:
+        # Jogadores apagados no bloco já perderam a linha pelo ON DELETE CASCADE
+        cursor.execute(f"SELECT id FROM jogador WHERE id IN ({_marcadores(deltas)})", list(deltas))
+        existentes = {linha['id'] for linha in cursor.fetchall()}
+        deltas = {jogador_id: delta for jogador_id, delta in deltas.items() if jogador_id in existentes}
+    _somar(cursor, "jogador_totais", "jogador_id", CAMPOS_JOGADOR, deltas)
+
+
+def _aplicar_suspensoes(cursor, antes, depois):
+    """Refaz as suspensões dos jogadores dos jogos afetados a partir do mais antigo deles"""
+    jogadores = {
+        estat["jogador_id"]
+        for carregados in (antes, depois) for jogo in carregados.values() for estat in jogo["estatisticas"]
+    }
+    if not jogadores:
+        return
+    # A data de antes conta também: editar a data de um jogo muda a ordem a partir da menor delas
+    inicio = min((jogo["data"], jogo_id) for carregados in (antes, depois) for jogo_id, jogo in carregados.items())
+    atualizar_suspensoes(cursor, jogadores, inicio)
+    # Um jogo que passa a ter (ou deixa de ter) placar cumpre (ou desfaz) suspensões das duas equipes
+    equipes = {
+        equipe for carregados in (antes, depois) for jogo in carregados.values()
+        for equipe in (jogo["equipe1"], jogo["equipe2"])
+    }
+    atualizar_situacao(cursor, jogadores, equipes)
+
+
+@contextmanager
+def atualizar_agregados(conn, jogo_ids):
+    """Mantém as tabelas agregadas em dia com as escritas feitas dentro do bloco.
+
+    Captura o estado dos jogos afetados antes e depois da escrita e aplica somente
+    a diferença, sem varrer a tabela estatistica inteira. Deve ser usado dentro da
+    mesma transação da escrita, logo depois de start_transaction(): os jogos afetados
+    ficam travados até o commit.
+    """
+    jogo_ids = {jogo_id for jogo_id in jogo_ids if jogo_id is not None}
+    cursor = conn.cursor(dictionary=True)
+    try:
+        _bloquear_jogos(cursor, jogo_ids)
+        antes = _carregar_jogos(cursor, jogo_ids)
+        yield
+        depois = _carregar_jogos(cursor, jogo_ids)
+        _aplicar_classificacao(cursor, antes, depois)
+        _aplicar_jogador_totais(cursor, antes, depois)
+        # Jogos apagados no bloco não aparecem em depois
+        _aplicar_placar(cursor, depois)
+        _aplicar_suspensoes(cursor, antes, depois)
+    finally:
+        cursor.close()
+
+
+def jogos_do_jogador(conn, jogador_id):
+    """IDs dos jogos em que o jogador tem estatísticas registradas"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT DISTINCT jogo_id FROM estatistica WHERE jogador_id = %s", (jogador_id,))
+        return [linha[0] for linha in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def recalcular_classificacao(conn):
+    """Reconstrói a classificação do zero a partir de todos os jogos"""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        conn.start_transaction()
+        cursor.execute("DELETE FROM classificacao")
+        cursor.execute("INSERT INTO classificacao (nome_equipe) SELECT nome FROM equipe")
+        cursor.execute("SELECT id FROM jogo")
+        jogo_ids = [linha['id'] for linha in cursor.fetchall()]
+        _aplicar_classificacao(cursor, {}, _carregar_jogos(cursor, jogo_ids))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def recalcular_placares(conn):
+    """Reconstrói o placar de todos os jogos"""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        conn.start_transaction()
+        cursor.execute("SELECT id FROM jogo")
+        _aplicar_placar(cursor, _carregar_jogos(cursor, [linha['id'] for linha in cursor.fetchall()]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def recalcular_jogador_totais(conn):
+    """Reconstrói os totais por jogador do zero com uma única agregação sobre estatistica"""
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute("DELETE FROM jogador_totais")
+        cursor.execute("""
+            INSERT INTO jogador_totais (jogador_id, jogos, gols, cartoes)
+            SELECT jogador_id, COUNT(*), COALESCE(SUM(gols), 0), COALESCE(SUM(cartoes), 0)
+            FROM estatistica
+            WHERE jogador_id IS NOT NULL
+            GROUP BY jogador_id
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def recalcular_agregados(conn):
+    """Reconstrói todas as tabelas agregadas"""
+    recalcular_classificacao(conn)
+    recalcular_jogador_totais(conn)
+    recalcular_placares(conn)
+    recalcular_suspensoes(conn)
+    invalidar(*TABELAS_AGREGADAS)
+
+
+def _divergencias(gravado, esperado, campos):
+    """Chaves cujas linhas gravadas diferem das calculadas; linhas ausentes valem zero"""
+    return {
+        chave: {campo: (gravado.get(chave, {}).get(campo, 0), esperado.get(chave, {}).get(campo, 0)) for campo in campos}
+        for chave in set(gravado) | set(esperado)
+        if any(gravado.get(chave, {}).get(campo, 0) != esperado.get(chave, {}).get(campo, 0) for campo in campos)
+    }
+
+
+def verificar_agregados(conn):
+    """Compara as tabelas agregadas com uma agregação completa de estatistica e lista as divergências.
+
+    Retorna {tabela: {chave: {campo: (gravado, esperado)}}}; um dicionário vazio indica que está tudo em dia.
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id FROM jogo")
+        jogos = _carregar_jogos(cursor, [linha['id'] for linha in cursor.fetchall()])
+
+        cursor.execute(f"SELECT nome_equipe, {', '.join(CAMPOS_CLASSIFICACAO)} FROM classificacao")
+        classificacao = {linha.pop('nome_equipe'): linha for linha in cursor.fetchall()}
+
+        cursor.execute("""
+            SELECT jogador_id, COUNT(*) AS jogos,
+                   CAST(COALESCE(SUM(gols), 0) AS SIGNED) AS gols,
+                   CAST(COALESCE(SUM(cartoes), 0) AS SIGNED) AS cartoes
+            FROM estatistica
+            WHERE jogador_id IS NOT NULL
+            GROUP BY jogador_id
+        """)
+        totais_esperados = {linha.pop('jogador_id'): linha for linha in cursor.fetchall()}
+        cursor.execute(f"SELECT jogador_id, {', '.join(CAMPOS_JOGADOR)} FROM jogador_totais")
+        totais = {linha.pop('jogador_id'): linha for linha in cursor.fetchall()}
+
+        cursor.execute(f"SELECT id, {', '.join(CAMPOS_PLACAR)} FROM jogo")
+        placares = {linha.pop('id'): linha for linha in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+    divergencias = {
+        "classificacao": _divergencias(
+            classificacao, _deltas({}, jogos, _contribuicao, CAMPOS_CLASSIFICACAO), CAMPOS_CLASSIFICACAO
+        ),
+        "jogador_totais": _divergencias(totais, totais_esperados, CAMPOS_JOGADOR),
+        "jogo": _divergencias(
+            placares,
+            {jogo_id: dict(zip(CAMPOS_PLACAR, _placar_gravado(jogo))) for jogo_id, jogo in jogos.items()},
+            CAMPOS_PLACAR
+        ),
+    }
+    return {tabela: linhas for tabela, linhas in divergencias.items() if linhas}
+
+
+if __name__ == "__main__":
+    import sys
+    from database.connection import get_db
+
+    conn = get_db()
+    try:
+        if "--verificar" in sys.argv:
+            divergencias = verificar_agregados(conn)
+            for tabela, linhas in divergencias.items():
+                for chave, campos in linhas.items():
+                    diferencas = ", ".join(f"{campo}: {gravado} ≠ {esperado}" for campo, (gravado, esperado) in campos.items() if gravado != esperado)
+                    print(f"❌ {tabela}[{chave}] {diferencas}")
+            if divergencias:
+                print("Execute sem --verificar para reconstruir os agregados.")
+                sys.exit(1)
+            print("✅ Agregados conferem com as estatísticas.")
+        else:
+            recalcular_agregados(conn)
+            print("Agregados recalculados com sucesso!")
+    finally:
+        conn.close()
@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import tempfile
 
 load_dotenv()
 
@@ -18,4 +19,44 @@ if host and ":" in host:
     if not port:
         port = host_port
 
-HOST_WITH_PORT = f"{host}:{port}" if port else host
\ No newline at end of file
+HOST_WITH_PORT = f"{host}:{port}" if port else host
+
+# Pool de conexões (database/connection.py); o driver aceita no máximo 32 conexões por pool
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 5))
+MYSQL_POOL_RESET_SESSION = os.getenv("MYSQL_POOL_RESET_SESSION", "true").lower() in ("1", "true", "sim")
+# Conexões paradas no pool há mais tempo que isso recebem um ping antes de serem entregues
+MYSQL_POOL_VALIDAR_APOS_SEGUNDOS = float(os.getenv("MYSQL_POOL_VALIDAR_APOS_SEGUNDOS", 30))
+# Quanto um checkout espera na fila por uma conexão livre antes de desistir
+MYSQL_POOL_ESPERA_SEGUNDOS = float(os.getenv("MYSQL_POOL_ESPERA_SEGUNDOS", 5))
+# Disjuntor: falhas seguidas de conexão que o abrem e por quanto tempo os checkouts são recusados
+MYSQL_DISJUNTOR_FALHAS = int(os.getenv("MYSQL_DISJUNTOR_FALHAS", 3))
+MYSQL_DISJUNTOR_PAUSA_SEGUNDOS = float(os.getenv("MYSQL_DISJUNTOR_PAUSA_SEGUNDOS", 15))
+
+# Cache de consultas (database/cache.py)
+CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", 256))
+CACHE_TTL_SEGUNDOS = float(os.getenv("CACHE_TTL_SEGUNDOS", 300))
+# Por quanto tempo a última cópia de cada consulta fica guardada para servir se o banco cair
+CACHE_RESERVA_SEGUNDOS = float(os.getenv("CACHE_RESERVA_SEGUNDOS", 86400))
+
+# memoria: cache só do processo; sqlite/redis: compartilhado entre os workers do Streamlit
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria").lower()
+CACHE_SQLITE_CAMINHO = os.getenv(
+    "CACHE_SQLITE_CAMINHO", os.path.join(tempfile.gettempdir(), "cbfmanager_mysql_cache.sqlite3")
+)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Perfil de consultas (database/perfil.py): o mesmo comando com parâmetros diferentes repetido
+# mais vezes que isso numa renderização é apontado como N+1
+PERFIL_LIMITE_N_MAIS_1 = int(os.getenv("PERFIL_LIMITE_N_MAIS_1", 5))
+
+# Suspensão automática (database/suspensoes.py): cartões acumulados que suspendem o jogador,
+# cartões num único jogo que suspendem direto e quantos jogos da equipe ele fica de fora; 0 desliga
+# um limite. Depois de mudar, rode python -m database.agregados para refazer o histórico
+SUSPENSAO_CARTOES_ACUMULADOS = int(os.getenv("SUSPENSAO_CARTOES_ACUMULADOS", 3))
+SUSPENSAO_CARTOES_JOGO = int(os.getenv("SUSPENSAO_CARTOES_JOGO", 2))
+SUSPENSAO_JOGOS = int(os.getenv("SUSPENSAO_JOGOS", 1))
+
+# Endpoint /metrics no formato do Prometheus (database/metricas.py); 0 desliga as métricas.
+# Com vários workers na mesma máquina, cada um precisa da sua porta
+METRICAS_PORTA = int(os.getenv("METRICAS_PORTA", 0))
+METRICAS_ENDERECO = os.getenv("METRICAS_ENDERECO", "127.0.0.1")
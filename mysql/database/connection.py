@@ -1,9 +1,220 @@
 import mysql.connector
 from mysql.connector import Error, pooling
-from database.config import MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_DB, MYSQL_PORT
+from mysql.connector.errors import PoolError
+from database.config import (
+    MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_DB, MYSQL_PORT,
+    MYSQL_POOL_SIZE, MYSQL_POOL_RESET_SESSION, MYSQL_POOL_VALIDAR_APOS_SEGUNDOS, MYSQL_POOL_ESPERA_SEGUNDOS,
+    MYSQL_DISJUNTOR_FALHAS, MYSQL_DISJUNTOR_PAUSA_SEGUNDOS
+)
+from database import perfil, metricas
+from database.cache import estatisticas_cache
+import bisect
 import threading
+import time
 
 
+# Limites superiores (ms) das faixas do histograma de latência de checkout; a última é aberta
+FAIXAS_LATENCIA_MS = (1, 5, 10, 50, 100, 500, 1000)
+# Checkouts que passaram mais que isso na fila ou no get_connection do driver contam como espera
+ESPERA_MINIMA_SEGUNDOS = 0.001
+
+
+class BancoIndisponivel(Error):
+    """Checkout recusado sem tentar o servidor porque o disjuntor está aberto"""
+
+
+class Disjuntor:
+    """Circuit breaker: depois de `limite` falhas seguidas de conexão, recusa checkouts por `pausa` segundos.
+
+    Vencida a pausa, deixa passar uma única tentativa (meio-aberto): se ela funcionar o
+    disjuntor fecha, se falhar abre de novo por mais uma pausa.
+    """
+
+    def __init__(self, limite, pausa):
+        self.limite = limite
+        self.pausa = pausa
+        self._lock = threading.Lock()
+        self.falhas_seguidas = 0
+        self.aberto_ate = None
+        self.testando = False
+        self.aberturas = 0
+        self.recusas = 0
+
+    def permitir(self):
+        with self._lock:
+            if self.aberto_ate is None:
+                return
+            restante = self.aberto_ate - time.monotonic()
+            if restante <= 0 and not self.testando:
+                self.testando = True
+                return
+            self.recusas += 1
+        raise BancoIndisponivel(
+            f"Banco de dados indisponível após {self.limite} falhas seguidas; "
+            f"nova tentativa em {max(restante, 0):.0f}s"
+        )
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas_seguidas = 0
+            self.aberto_ate = None
+            self.testando = False
+
+    def desistir(self):
+        """Encerra a tentativa sem concluir nada sobre o servidor (ex.: pool esgotado)"""
+        with self._lock:
+            self.testando = False
+
+    def falha(self):
+        with self._lock:
+            self.falhas_seguidas += 1
+            if self.testando or self.falhas_seguidas >= self.limite:
+                if self.aberto_ate is None:
+                    self.aberturas += 1
+                self.aberto_ate = time.monotonic() + self.pausa
+            self.testando = False
+
+    def estado(self):
+        with self._lock:
+            if self.aberto_ate is None:
+                return "fechado"
+            return "meio-aberto" if self.testando or self.aberto_ate <= time.monotonic() else "aberto"
+
+
+class MonitorPool:
+    """Contadores do pool de conexões, alimentados a cada empréstimo e devolução"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id da conexão física -> instante (monotonic) em que voltou ao pool
+        self._devolvidas_em = {}
+        self.em_uso = 0
+        self.na_fila = 0
+        self.checkouts = 0
+        self.esgotamentos = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.validacoes = 0
+        self.reconexoes = 0
+        self.falhas = 0
+        self.histograma = [0] * (len(FAIXAS_LATENCIA_MS) + 1)
+
+    def ociosidade(self, conexao):
+        """Segundos desde que a conexão física voltou ao pool; None se nunca foi emprestada"""
+        with self._lock:
+            devolvida_em = self._devolvidas_em.get(id(conexao._cnx))
+        return None if devolvida_em is None else time.monotonic() - devolvida_em
+
+    def emprestada(self, espera, latencia, validou, reconectou):
+        with self._lock:
+            self.checkouts += 1
+            self.em_uso += 1
+            # Tempo na fila de espera mais o tempo dentro do get_connection do driver
+            if espera >= ESPERA_MINIMA_SEGUNDOS:
+                self.esperas += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+            self.validacoes += validou
+            self.reconexoes += reconectou
+            self.histograma[bisect.bisect_left(FAIXAS_LATENCIA_MS, latencia * 1000)] += 1
+        if metricas.HABILITADAS:
+            latencia_checkout.observar(segundos=latencia)
+
+    def devolvida(self, conexao):
+        with self._lock:
+            self.em_uso -= 1
+            self._devolvidas_em[id(conexao._cnx)] = time.monotonic()
+
+    def falhou(self):
+        with self._lock:
+            self.falhas += 1
+
+    def esgotado(self):
+        with self._lock:
+            self.esgotamentos += 1
+
+    def entrou_na_fila(self):
+        with self._lock:
+            self.na_fila += 1
+
+    def saiu_da_fila(self):
+        with self._lock:
+            self.na_fila -= 1
+
+    def snapshot(self):
+        with self._lock:
+            rotulos = [f"≤ {limite} ms" for limite in FAIXAS_LATENCIA_MS] + [f"> {FAIXAS_LATENCIA_MS[-1]} ms"]
+            return {
+                "pool_size": MYSQL_POOL_SIZE,
+                "conexoes_em_uso": self.em_uso,
+                "na_fila": self.na_fila,
+                "checkouts": self.checkouts,
+                "esgotamentos": self.esgotamentos,
+                "esperas": self.esperas,
+                "espera_media_ms": (self.espera_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "espera_maxima_ms": self.espera_maxima * 1000,
+                "validacoes": self.validacoes,
+                "reconexoes": self.reconexoes,
+                "falhas": self.falhas,
+                "latencia_checkout": dict(zip(rotulos, self.histograma)),
+                "disjuntor": disjuntor.estado(),
+                "disjuntor_aberturas": disjuntor.aberturas,
+                "disjuntor_recusas": disjuntor.recusas,
+            }
+
+
+class ConexaoMonitorada:
+    """Conexão emprestada do pool; repassa tudo à conexão do driver e avisa o monitor ao ser fechada"""
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+        self._fechada = False
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conexao.cursor(*args, **kwargs)
+        return perfil.CursorPerfilado(cursor) if perfil.ativo() else cursor
+
+    def close(self):
+        if self._fechada:
+            return
+        self._fechada = True
+        monitor_pool.devolvida(self._conexao)
+        try:
+            self._conexao.close()
+        finally:
+            _vagas.release()
+
+
+class ConexaoSobDemanda:
+    """Só pega uma conexão do pool no primeiro uso.
+
+    Páginas inteiramente servidas pelo cache não ocupam o pool, e uma falha de checkout
+    aparece na consulta que precisou do banco, onde o cache pode servir a última cópia.
+    """
+
+    def __init__(self):
+        self._conexao = None
+
+    def __getattr__(self, nome):
+        if self._conexao is None:
+            self._conexao = get_db_connection()
+        return getattr(self._conexao, nome)
+
+    def close(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+
+monitor_pool = MonitorPool()
+disjuntor = Disjuntor(MYSQL_DISJUNTOR_FALHAS, MYSQL_DISJUNTOR_PAUSA_SEGUNDOS)
+# Fila de espera limitada: no máximo MYSQL_POOL_SIZE checkouts ao mesmo tempo, os demais aguardam
+# até MYSQL_POOL_ESPERA_SEGUNDOS por uma devolução em vez de receber PoolError na hora
+_vagas = threading.BoundedSemaphore(MYSQL_POOL_SIZE)
 _connection_pool = None
 _lock = threading.Lock()
 
@@ -13,14 +224,14 @@ def _initialize_pool():
         try:
             _connection_pool = pooling.MySQLConnectionPool(
                 pool_name="streamlit_pool",
-                pool_size=5,
+                pool_size=MYSQL_POOL_SIZE,
                 host=MYSQL_HOST,
                 user=MYSQL_USER,
                 password=MYSQL_PASSWORD,
                 database=MYSQL_DB,
                 port=MYSQL_PORT,
                 autocommit=True,
-                pool_reset_session=True,
+                pool_reset_session=MYSQL_POOL_RESET_SESSION,
                 connect_timeout=30
             )
             print("✅ Pool de conexões inicializado com sucesso")
@@ -33,18 +244,99 @@ def get_db():
     return get_db_connection()
 
 def get_db_connection():
-    """Obtém uma conexão do pool de forma thread-safe"""
-    global _connection_pool
-    
-    with _lock:
-        if _connection_pool is None:
-            _initialize_pool()
-    
+    """Obtém uma conexão do pool de forma thread-safe, esperando na fila se todas estiverem em uso"""
+    inicio = time.perf_counter()
+    monitor_pool.entrou_na_fila()
     try:
-        conn = _connection_pool.get_connection()
-        if not conn.is_connected():
-            conn.reconnect(attempts=3, delay=1)
-        return conn
+        conseguiu_vaga = _vagas.acquire(timeout=MYSQL_POOL_ESPERA_SEGUNDOS)
+    finally:
+        monitor_pool.saiu_da_fila()
+    if not conseguiu_vaga:
+        monitor_pool.esgotado()
+        raise PoolError(f"Nenhuma conexão livre após {MYSQL_POOL_ESPERA_SEGUNDOS:g}s de espera")
+
+    try:
+        disjuntor.permitir()
+        try:
+            # Double-checked locking: depois de criado o pool, os checkouts não disputam _lock
+            if _connection_pool is None:
+                with _lock:
+                    if _connection_pool is None:
+                        _initialize_pool()
+            conn = _connection_pool.get_connection()
+        except PoolError:
+            monitor_pool.esgotado()
+            disjuntor.desistir()
+            raise
+        except Error:
+            disjuntor.falha()
+            raise
+        espera = time.perf_counter() - inicio
+
+        try:
+            # Só vale o ping (uma ida ao servidor) para conexões paradas há mais tempo que o limite
+            ociosidade = monitor_pool.ociosidade(conn)
+            validou = ociosidade is not None and ociosidade > MYSQL_POOL_VALIDAR_APOS_SEGUNDOS
+            reconectou = validou and not conn.is_connected()
+            if reconectou:
+                # Uma tentativa só: com o servidor instável, quem segura as novas tentativas é o disjuntor
+                conn.reconnect(attempts=1, delay=0)
+        except Error:
+            disjuntor.falha()
+            conn.close()
+            raise
     except Error as e:
-        print(f"❌ Erro ao obter conexão: {e}")
-        raise
\ No newline at end of file
+        _vagas.release()
+        if not isinstance(e, BancoIndisponivel):
+            monitor_pool.falhou()
+            print(f"❌ Erro ao obter conexão: {e}")
+        raise
+
+    disjuntor.sucesso()
+    monitor_pool.emprestada(espera, time.perf_counter() - inicio, validou, reconectou)
+    return ConexaoMonitorada(conn)
+
+def estatisticas_pool():
+    """Métricas do pool de conexões deste processo"""
+    return monitor_pool.snapshot()
+
+
+def _metricas_pool():
+    pool = monitor_pool.snapshot()
+    return [
+        ("cbf_mysql_pool_tamanho", "gauge", "Conexões do pool", [({}, pool["pool_size"])]),
+        ("cbf_mysql_pool_conexoes_em_uso", "gauge", "Conexões emprestadas agora", [({}, pool["conexoes_em_uso"])]),
+        ("cbf_mysql_pool_na_fila", "gauge", "Checkouts aguardando uma conexão livre", [({}, pool["na_fila"])]),
+        ("cbf_mysql_pool_checkouts_total", "counter", "Conexões entregues pelo pool", [({}, pool["checkouts"])]),
+        ("cbf_mysql_pool_espera_segundos_total", "counter", "Tempo total de espera dos checkouts",
+         [({}, monitor_pool.espera_total)]),
+        ("cbf_mysql_pool_reconexoes_total", "counter", "Conexões ociosas refeitas antes da entrega",
+         [({}, pool["reconexoes"])]),
+        ("cbf_mysql_pool_erros_total", "counter", "Checkouts que terminaram em erro, por motivo", [
+            ({"motivo": "esgotado"}, pool["esgotamentos"]),
+            ({"motivo": "falha"}, pool["falhas"]),
+            ({"motivo": "disjuntor"}, pool["disjuntor_recusas"]),
+        ]),
+        ("cbf_mysql_disjuntor_aberto", "gauge", "1 enquanto o disjuntor recusa checkouts",
+         [({}, int(pool["disjuntor"] != "fechado"))]),
+    ]
+
+
+def _metricas_cache():
+    cache = estatisticas_cache()
+    return [
+        ("cbf_cache_consultas_total", "counter", "Consultas ao cache deste processo, por resultado", [
+            ({"resultado": resultado}, cache[resultado])
+            for resultado in ("acertos", "falhas", "invalidadas", "desatualizadas")
+        ]),
+        ("cbf_cache_taxa_acerto", "gauge", "Fração das consultas atendidas pelo cache", [({}, cache["taxa_acerto"])]),
+        ("cbf_cache_entradas", "gauge", "Entradas guardadas no backend do cache", [({}, cache["entradas"])]),
+    ]
+
+
+latencia_checkout = metricas.registrar(metricas.Histograma(
+    "cbf_mysql_pool_checkout_segundos", "Latência de cada checkout do pool, incluindo a fila"
+))
+if metricas.HABILITADAS:
+    metricas.registrar_coletor(_metricas_pool)
+    metricas.registrar_coletor(_metricas_cache)
@@ -0,0 +1,18 @@
+def somar_estatistica(conn, jogo_id, jogador_id, gols, cartoes):
+    """Soma gols e cartões do jogador no jogo com um único upsert na chave única (jogo_id, jogador_id).
+
+    Sem o SELECT antes da escrita, dois administradores salvando ao mesmo tempo não
+    disputam quem insere primeiro. Retorna True se a linha foi criada e False se já existia.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO estatistica (jogo_id, jogador_id, gols, cartoes)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE gols = gols + VALUES(gols), cartoes = cartoes + VALUES(cartoes)
+        """, (jogo_id, jogador_id, gols, cartoes))
+        # 1 linha afetada: inserida; 2: atualizada; 0: já existia e a soma foi zero
+        return cursor.rowcount == 1
+    finally:
+        cursor.close()
+
@@ -0,0 +1,168 @@
+import csv
+import datetime
+import decimal
+import io
+import json
+import time
+from contextlib import contextmanager
+from database.init_db import TABELAS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+TAMANHO_LOTE = 5000
+FORMATOS = ("csv", "jsonl", "parquet")
+# Colunas que nunca saem do banco em uma exportação
+COLUNAS_OCULTAS = {
+    "pessoas": ("senha",),
+    "jogo": ("equipe_menor", "equipe_maior"),
+    "estatistica": ("cartoes_acumulados", "suspensao_jogo_id"),
+}
+
+
+def _valor(valor):
+    """Converte os tipos do conector (date, TIME como timedelta, Decimal) para tipos serializáveis"""
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    if isinstance(valor, datetime.timedelta):
+        return str(valor)
+    if isinstance(valor, decimal.Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    return valor
+
+
+@contextmanager
+def ler_tabela(conn, tabela, tamanho_lote=TAMANHO_LOTE):
+    """Abre a tabela com um cursor não bufferizado e entrega (colunas, gerador de lotes de tuplas).
+
+    As linhas são lidas do servidor com fetchmany à medida que os lotes são consumidos,
+    então a memória usada depende de tamanho_lote e não do tamanho da tabela. A conexão
+    fica ocupada até o fim do bloco.
+    """
+    if tabela not in TABELAS:
+        raise ValueError(f"Tabela '{tabela}' desconhecida; use uma de: {', '.join(TABELAS)}")
+
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(f"SELECT * FROM `{tabela}`")
+        colunas = [c[0] for c in cursor.description]
+        manter = [i for i, coluna in enumerate(colunas) if coluna not in COLUNAS_OCULTAS.get(tabela, ())]
+
+        def lotes():
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                yield [tuple(_valor(linha[i]) for i in manter) for linha in linhas]
+
+        yield [colunas[i] for i in manter], lotes()
+    finally:
+        # Descarta o que sobrou no servidor caso a leitura pare no meio, liberando a conexão
+        conn.consume_results()
+        cursor.close()
+
+
+def _escrever_csv(destino, colunas, lotes):
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="")
+    escritor = csv.writer(texto)
+    escritor.writerow(colunas)
+    total = 0
+    for lote in lotes:
+        escritor.writerows(lote)
+        total += len(lote)
+    texto.flush()
+    texto.detach()
+    return total
+
+
+def _escrever_jsonl(destino, colunas, lotes):
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="\n")
+    total = 0
+    for lote in lotes:
+        texto.writelines(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False) + "\n" for linha in lote)
+        total += len(lote)
+    texto.flush()
+    texto.detach()
+    return total
+
+
+def _tipo_arrow(valores):
+    """Tipo Arrow de uma coluna, pelo primeiro valor não nulo do primeiro lote"""
+    exemplo = next((v for v in valores if v is not None), None)
+    if isinstance(exemplo, bool):
+        return pa.bool_()
+    if isinstance(exemplo, int):
+        return pa.int64()
+    if isinstance(exemplo, float):
+        return pa.float64()
+    return pa.string()
+
+
+def _escrever_parquet(destino, colunas, lotes):
+    """Escreve cada lote como um row group, mantendo o mesmo schema do primeiro lote"""
+    escritor = None
+    total = 0
+    try:
+        for lote in lotes:
+            valores = list(zip(*lote))
+            if escritor is None:
+                schema = pa.schema([(c, _tipo_arrow(v)) for c, v in zip(colunas, valores)])
+                escritor = pq.ParquetWriter(destino, schema)
+            arrays = [
+                pa.array([None if v is None else str(v) for v in coluna] if campo.type == pa.string() else coluna,
+                         type=campo.type)
+                for campo, coluna in zip(schema, valores)
+            ]
+            escritor.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            total += len(lote)
+        if escritor is None:
+            pq.write_table(pa.table({c: pa.array([], type=pa.string()) for c in colunas}), destino)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return total
+
+
+ESCRITORES = {
+    "csv": _escrever_csv,
+    "jsonl": _escrever_jsonl,
+    "parquet": _escrever_parquet,
+}
+
+
+def exportar_tabela(conn, tabela, destino, formato="csv", tamanho_lote=TAMANHO_LOTE):
+    """Exporta uma tabela para o arquivo binário `destino` no formato escolhido; retorna o número de linhas"""
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato '{formato}' não suportado; use {', '.join(FORMATOS)}")
+    if formato == "parquet" and pa is None:
+        raise RuntimeError("A exportação em Parquet requer o pacote pyarrow (pip install pyarrow).")
+    with ler_tabela(conn, tabela, tamanho_lote) as (colunas, lotes):
+        return ESCRITORES[formato](destino, colunas, lotes)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from database.connection import get_db
+
+    parser = argparse.ArgumentParser(description="Exporta tabelas do banco para CSV, JSONL ou Parquet.")
+    parser.add_argument("tabelas", nargs="*", default=TABELAS, help="padrão: todas")
+    parser.add_argument("--formato", choices=FORMATOS, default="csv")
+    parser.add_argument("--saida", default="exportacao", help="diretório de destino")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas lidas por fetchmany")
+    args = parser.parse_args()
+
+    os.makedirs(args.saida, exist_ok=True)
+    conn = get_db()
+    try:
+        for tabela in args.tabelas:
+            caminho = os.path.join(args.saida, f"{tabela}.{args.formato}")
+            inicio = time.perf_counter()
+            with open(caminho, "wb") as destino:
+                linhas = exportar_tabela(conn, tabela, destino, args.formato, args.lote)
+            print(f"✅ {tabela}: {linhas} linhas em {time.perf_counter() - inicio:.2f}s -> {caminho}")
+    finally:
+        conn.close()
@@ -0,0 +1,255 @@
+import csv
+import json
+import time
+from mysql.connector import Error
+from database.agregados import atualizar_agregados, TABELAS_AGREGADAS
+from database.cache import invalidar
+
+TAMANHO_LOTE = 1000
+FORMATOS = ("csv", "jsonl")
+
+
+def ler_linhas(arquivo, formato="csv"):
+    """Lê um arquivo CSV (com cabeçalho) ou JSONL linha a linha, gerando (número da linha, dicionário)"""
+    if formato == "csv":
+        for numero, linha in enumerate(csv.DictReader(arquivo), start=2):
+            yield numero, linha
+    elif formato == "jsonl":
+        for numero, texto in enumerate(arquivo, start=1):
+            if not texto.strip():
+                continue
+            try:
+                linha = json.loads(texto)
+            except json.JSONDecodeError as e:
+                linha = {"_erro": f"JSON inválido: {e.msg}"}
+            yield numero, linha if isinstance(linha, dict) else {"_erro": "a linha não é um objeto JSON"}
+    else:
+        raise ValueError(f"Formato '{formato}' não suportado; use {' ou '.join(FORMATOS)}")
+
+
+def _texto(linha, campo):
+    valor = linha.get(campo)
+    return str(valor).strip() if valor not in (None, "") else ""
+
+
+def _inteiro(linha, campo, padrao=None):
+    texto = _texto(linha, campo)
+    if not texto:
+        if padrao is None:
+            raise ValueError(f"coluna '{campo}' vazia")
+        return padrao
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise ValueError(f"'{campo}' não é um número inteiro: {texto}")
+    if valor < 0:
+        raise ValueError(f"'{campo}' não pode ser negativo")
+    return valor
+
+def _hora(valor):
+    """Normaliza a hora para HH:MM:SS ("16:00", "16:00:00" e o TIME do banco caem na mesma chave)"""
+    partes = str(valor).strip().split(".")[0].split(":")
+    try:
+        numeros = [int(parte) for parte in partes] + [0] * (3 - len(partes))
+    except ValueError:
+        raise ValueError(f"'hora' inválida: {valor}")
+    if len(partes) > 3:
+        raise ValueError(f"'hora' inválida: {valor}")
+    return "{:02d}:{:02d}:{:02d}".format(*numeros)
+
+
+def _indexar_jogo(referencias, jogo_id, data, hora, equipes):
+    """Registra o jogo pela data e pela dupla de equipes em qualquer ordem de mando, como uq_jogo_confronto.
+
+    Mais de um jogo da mesma dupla na mesma data fica ambíguo (None) sem a hora.
+    """
+    dupla = tuple(sorted(equipes))
+    chave = (str(data), dupla)
+    por_data = referencias["jogos_por_confronto"]
+    por_data[chave] = None if chave in por_data else jogo_id
+    if hora is not None:
+        referencias["jogos_por_horario"][(str(data), _hora(hora), dupla)] = jogo_id
+
+
+def carregar_referencias(conn):
+    """Carrega em memória os jogos e jogadores usados para resolver as linhas do arquivo"""
+    referencias = {"jogos": {}, "jogos_por_confronto": {}, "jogos_por_horario": {}}
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id, data, hora, equipe1_id, equipe2_id FROM jogo")
+        for jogo in cursor.fetchall():
+            equipes = (jogo["equipe1_id"].upper(), jogo["equipe2_id"].upper())
+            referencias["jogos"][jogo["id"]] = equipes
+            _indexar_jogo(referencias, jogo["id"], jogo["data"], jogo["hora"], equipes)
+
+        cursor.execute("SELECT id, nome, numero, nome_equipe FROM jogador")
+        jogadores = {}
+        jogadores_por_numero = {}
+        jogadores_por_nome = {}
+        for jogador in cursor.fetchall():
+            equipe = (jogador["nome_equipe"] or "").upper()
+            jogadores[jogador["id"]] = equipe
+            jogadores_por_numero[(equipe, jogador["numero"])] = jogador["id"]
+            # Nomes repetidos na mesma equipe ficam ambíguos (None) e exigem o número
+            chave = (equipe, jogador["nome"].strip().upper())
+            jogadores_por_nome[chave] = None if chave in jogadores_por_nome else jogador["id"]
+    finally:
+        cursor.close()
+
+    return {
+        **referencias,
+        "jogadores": jogadores,
+        "jogadores_por_numero": jogadores_por_numero,
+        "jogadores_por_nome": jogadores_por_nome,
+    }
+
+
+def resolver_linha(linha, referencias):
+    """Converte uma linha do arquivo em (jogo_id, jogador_id, gols, cartoes) ou levanta ValueError.
+
+    O jogo é identificado por jogo_id ou por data + equipe1 + equipe2 (em qualquer ordem),
+    com hora opcional para separar jogos da mesma dupla no mesmo dia; o jogador por
+    jogador_id, por equipe + numero ou por equipe + jogador (nome).
+    """
+    if "_erro" in linha:
+        raise ValueError(linha["_erro"])
+
+    if _texto(linha, "jogo_id"):
+        jogo_id = _inteiro(linha, "jogo_id")
+        if jogo_id not in referencias["jogos"]:
+            raise ValueError(f"jogo {jogo_id} não encontrado")
+    else:
+        data, equipe1, equipe2 = _texto(linha, "data"), _texto(linha, "equipe1").upper(), _texto(linha, "equipe2").upper()
+        if not (data and equipe1 and equipe2):
+            raise ValueError("informe jogo_id ou data, equipe1 e equipe2")
+        dupla = tuple(sorted((equipe1, equipe2)))
+        if _texto(linha, "hora"):
+            hora = _hora(_texto(linha, "hora"))
+            jogo_id = referencias["jogos_por_horario"].get((data, hora, dupla))
+            if jogo_id is None:
+                raise ValueError(f"jogo {equipe1} x {equipe2} em {data} às {hora} não encontrado")
+        else:
+            if (data, dupla) not in referencias["jogos_por_confronto"]:
+                raise ValueError(f"jogo {equipe1} x {equipe2} em {data} não encontrado")
+            jogo_id = referencias["jogos_por_confronto"][(data, dupla)]
+            if jogo_id is None:
+                raise ValueError(f"há mais de um jogo {equipe1} x {equipe2} em {data}; informe a hora")
+
+    if _texto(linha, "jogador_id"):
+        jogador_id = _inteiro(linha, "jogador_id")
+        if jogador_id not in referencias["jogadores"]:
+            raise ValueError(f"jogador {jogador_id} não encontrado")
+    else:
+        equipe = _texto(linha, "equipe").upper()
+        if not equipe:
+            raise ValueError("informe jogador_id ou a equipe do jogador")
+        if _texto(linha, "numero"):
+            numero = _inteiro(linha, "numero")
+            jogador_id = referencias["jogadores_por_numero"].get((equipe, numero))
+            if jogador_id is None:
+                raise ValueError(f"nenhum jogador com o número {numero} em {equipe}")
+        else:
+            nome = _texto(linha, "jogador").upper()
+            if not nome:
+                raise ValueError("informe o número ou o nome do jogador")
+            if (equipe, nome) not in referencias["jogadores_por_nome"]:
+                raise ValueError(f"jogador '{_texto(linha, 'jogador')}' não encontrado em {equipe}")
+            jogador_id = referencias["jogadores_por_nome"][(equipe, nome)]
+            if jogador_id is None:
+                raise ValueError(f"há mais de um '{_texto(linha, 'jogador')}' em {equipe}; informe o número")
+
+    if referencias["jogadores"][jogador_id] not in referencias["jogos"][jogo_id]:
+        raise ValueError("o jogador não pertence a nenhuma das equipes deste jogo")
+
+    return jogo_id, jogador_id, _inteiro(linha, "gols", 0), _inteiro(linha, "cartoes", 0)
+
+
+def _gravar_lote(conn, lote):
+    """Grava um lote com um único INSERT ... ON DUPLICATE KEY UPDATE e atualiza os agregados na mesma transação"""
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        with atualizar_agregados(conn, {jogo_id for jogo_id, _ in lote}):
+            cursor.executemany("""
+                INSERT INTO estatistica (jogo_id, jogador_id, gols, cartoes)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE gols = VALUES(gols), cartoes = VALUES(cartoes)
+            """, [(jogo_id, jogador_id, gols, cartoes) for (jogo_id, jogador_id), (gols, cartoes) in lote.items()])
+        conn.commit()
+        invalidar("estatistica", *TABELAS_AGREGADAS)
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def importar_estatisticas(conn, arquivo, formato="csv", tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Importa as estatísticas de um arquivo em lotes de tamanho fixo, sem carregá-lo inteiro na memória.
+
+    Linhas repetidas de (jogo, jogador) substituem os valores anteriores, então reimportar
+    o mesmo arquivo não duplica gols nem cartões. `progresso` é chamado após cada lote
+    com o resumo parcial. Retorna {"lidas", "gravadas", "erros": [(linha, mensagem)], "segundos"}.
+    """
+    inicio = time.perf_counter()
+    referencias = carregar_referencias(conn)
+    resumo = {"lidas": 0, "gravadas": 0, "erros": [], "segundos": 0.0}
+    lote = {}
+    linhas_lote = []
+
+    def descarregar():
+        try:
+            _gravar_lote(conn, lote)
+            resumo["gravadas"] += len(lote)
+        except Error as e:
+            resumo["erros"].extend((numero, f"erro ao gravar o lote: {e}") for numero in linhas_lote)
+        lote.clear()
+        linhas_lote.clear()
+        resumo["segundos"] = time.perf_counter() - inicio
+        if progresso:
+            progresso(resumo)
+
+    for numero, linha in ler_linhas(arquivo, formato):
+        resumo["lidas"] += 1
+        try:
+            jogo_id, jogador_id, gols, cartoes = resolver_linha(linha, referencias)
+        except ValueError as e:
+            resumo["erros"].append((numero, str(e)))
+            continue
+
+        lote[(jogo_id, jogador_id)] = (gols, cartoes)
+        linhas_lote.append(numero)
+        if len(lote) >= tamanho_lote:
+            descarregar()
+
+    if lote:
+        descarregar()
+    resumo["segundos"] = time.perf_counter() - inicio
+    return resumo
+
+
+if __name__ == "__main__":
+    import argparse
+    from database.connection import get_db
+
+    parser = argparse.ArgumentParser(description="Importa estatísticas de jogos de um arquivo CSV ou JSONL.")
+    parser.add_argument("arquivo")
+    parser.add_argument("--formato", choices=FORMATOS, help="padrão: pela extensão do arquivo")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas por INSERT")
+    args = parser.parse_args()
+
+    formato = args.formato or ("jsonl" if args.arquivo.lower().endswith((".jsonl", ".json")) else "csv")
+    conn = get_db()
+    try:
+        with open(args.arquivo, encoding="utf-8-sig", newline="") as arquivo:
+            resumo = importar_estatisticas(
+                conn, arquivo, formato, args.lote,
+                progresso=lambda r: print(f"  {r['lidas']} linhas lidas, {r['gravadas']} gravadas, {len(r['erros'])} erros")
+            )
+    finally:
+        conn.close()
+
+    for numero, mensagem in resumo["erros"]:
+        print(f"❌ linha {numero}: {mensagem}")
+    taxa = resumo["gravadas"] / resumo["segundos"] if resumo["segundos"] else 0
+    print(f"✅ {resumo['gravadas']} estatísticas importadas em {resumo['segundos']:.2f}s ({taxa:,.0f} linhas/s)")
@@ -4,23 +4,254 @@ import os
 import mysql.connector
 from mysql.connector import Error
 from database.config import MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_DB, MYSQL_PORT
+from database.agregados import recalcular_classificacao, recalcular_jogador_totais, recalcular_placares
+from database.suspensoes import recalcular_suspensoes
+
+CHARSET = "utf8mb4"
+# Collation case-insensitive: comparações como nome = 'FLAMENGO' usam o índice sem UPPER()
+COLLATION = "utf8mb4_unicode_ci"
+
+TABELAS = ["pessoas", "equipe", "jogador", "jogo", "estatistica", "classificacao", "jogador_totais"]
+
+# (tabela, nome, colunas, único) — cada índice atende a uma consulta de modules/
+INDICES = [
+    # cadastrar_estatisticas / atualizar_agregados: WHERE jogo_id = ? [AND jogador_id = ?]
+    ("estatistica", "uq_estatistica_jogo_jogador", "(jogo_id, jogador_id)", True),
+    # totais por jogador: WHERE jogador_id = ? com SUM(gols), SUM(cartoes) sem ler a tabela
+    ("estatistica", "idx_estatistica_jogador", "(jogador_id, gols, cartoes)", False),
+    # número de camisa único na equipe (cadastrar_jogador, editar_jogador)
+    ("jogador", "uq_jogador_equipe_numero", "(nome_equipe, numero)", True),
+    # listas de jogadores: ORDER BY nome
+    ("jogador", "idx_jogador_nome", "(nome, id)", False),
+    # um único jogo entre as mesmas equipes na mesma data e hora, em qualquer ordem de mando
+    # (cadastrar_jogo, editar_jogo); o prefixo (data, hora) atende visualizar_jogo
+    ("jogo", "uq_jogo_confronto", "(data, hora, equipe_menor, equipe_maior)", True),
+    # jogos de uma equipe: WHERE equipe1_id = ? OR equipe2_id = ? ORDER BY data (index merge)
+    ("jogo", "idx_jogo_equipe1_data", "(equipe1_id, data)", False),
+    ("jogo", "idx_jogo_equipe2_data", "(equipe2_id, data)", False),
+    # rankings de artilharia e cartões: ORDER BY gols|cartoes DESC, jogador_id LIMIT k
+    ("jogador_totais", "idx_jogador_totais_gols", "(gols DESC, jogador_id)", False),
+    ("jogador_totais", "idx_jogador_totais_cartoes", "(cartoes DESC, jogador_id)", False),
+    # jogadores_suspensos: WHERE suspenso, poucas linhas
+    ("jogador_totais", "idx_jogador_totais_suspenso", "(suspenso)", False),
+]
+
+# (tabela, índice antigo, índice que o substitui): o antigo é removido depois que o novo existir
+INDICES_SUBSTITUIDOS = [
+    ("jogo", "idx_jogo_data_hora", "uq_jogo_confronto"),
+]
+
+# (tabela, coluna, definição) acrescentadas depois da criação das tabelas, para os bancos já existentes
+COLUNAS_ADICIONADAS = [
+    ("jogo", "equipe_menor", "VARCHAR(40) AS (LEAST(equipe1_id, equipe2_id)) STORED"),
+    ("jogo", "equipe_maior", "VARCHAR(40) AS (GREATEST(equipe1_id, equipe2_id)) STORED"),
+    ("jogo", "gols_equipe1", "INT NULL"),
+    ("jogo", "gols_equipe2", "INT NULL"),
+    ("jogo", "cartoes_equipe1", "INT NULL"),
+    ("jogo", "cartoes_equipe2", "INT NULL"),
+    ("estatistica", "cartoes_acumulados", "INT NULL"),
+    ("estatistica", "suspensao_jogo_id", "INT NULL"),
+    ("jogador_totais", "cartoes_acumulados", "INT NOT NULL DEFAULT 0"),
+    ("jogador_totais", "suspensao_jogo_id", "INT NULL"),
+    ("jogador_totais", "suspenso", "BOOLEAN NOT NULL DEFAULT FALSE"),
+]
+
+# (descrição, consulta, índice esperado) conferidos com EXPLAIN ao final do setup. As consultas são
+# faixas ou ORDER BY ... LIMIT cobertas pelo índice: buscas pontuais por chave única com valores
+# literais viram "const" e, com a tabela vazia (antes do preencher_BD), o EXPLAIN sai com key=NULL
+CONSULTAS_VERIFICADAS = [
+    ("estatísticas de um jogador em um jogo",
+     "SELECT jogo_id, jogador_id FROM estatistica WHERE jogo_id = 1 AND jogador_id BETWEEN 1 AND 100",
+     "uq_estatistica_jogo_jogador"),
+    ("estatísticas de um jogo",
+     "SELECT jogo_id, jogador_id FROM estatistica WHERE jogo_id BETWEEN 1 AND 10 ORDER BY jogo_id LIMIT 50",
+     "uq_estatistica_jogo_jogador"),
+    ("totais de um jogador",
+     "SELECT SUM(gols), SUM(cartoes) FROM estatistica WHERE jogador_id = 1", "idx_estatistica_jogador"),
+    ("números de camisa na equipe",
+     "SELECT id, numero FROM jogador WHERE nome_equipe = 'FLAMENGO' AND numero BETWEEN 1 AND 99",
+     "uq_jogador_equipe_numero"),
+    ("jogadores por nome",
+     "SELECT id, nome FROM jogador ORDER BY nome, id LIMIT 50", "idx_jogador_nome"),
+    ("página seguinte de jogadores (keyset)",
+     "SELECT id, nome FROM jogador WHERE (nome, id) > ('M', 0) ORDER BY nome, id LIMIT 51", "idx_jogador_nome"),
+    ("jogos por data",
+     "SELECT id FROM jogo WHERE data BETWEEN '2023-04-01' AND '2023-04-30' ORDER BY data, hora LIMIT 50",
+     "uq_jogo_confronto"),
+    # Os dois lados do OR de jogos de uma equipe, cada um pelo seu índice
+    ("jogos de uma equipe como mandante",
+     "SELECT id FROM jogo WHERE equipe1_id = 'FLAMENGO' ORDER BY data LIMIT 50", "idx_jogo_equipe1_data"),
+    ("jogos de uma equipe como visitante",
+     "SELECT id FROM jogo WHERE equipe2_id = 'FLAMENGO' ORDER BY data LIMIT 50", "idx_jogo_equipe2_data"),
+    ("equipes pelo nome",
+     "SELECT nome FROM equipe WHERE nome >= 'F' ORDER BY nome LIMIT 50", "PRIMARY"),
+    ("artilharia",
+     "SELECT jogador_id FROM jogador_totais WHERE gols > 0 ORDER BY gols DESC, jogador_id LIMIT 10",
+     "idx_jogador_totais_gols"),
+    ("ranking de cartões",
+     "SELECT jogador_id FROM jogador_totais WHERE cartoes > 0 ORDER BY cartoes DESC, jogador_id LIMIT 10",
+     "idx_jogador_totais_cartoes"),
+    ("jogadores suspensos",
+     "SELECT jogador_id FROM jogador_totais WHERE suspenso = TRUE", "idx_jogador_totais_suspenso"),
+    ("tabela de classificação",
+     "SELECT nome_equipe FROM classificacao "
+     "ORDER BY pontos DESC, vitorias DESC, saldo DESC, gols_pro DESC, cartoes, nome_equipe LIMIT 50",
+     "idx_classificacao_ordem"),
+]
+
+# Extra do EXPLAIN quando o otimizador resolve a consulta por chave única antes de executá-la
+PLANOS_CONSTANTES = ("no matching row in const table", "const row not found", "Impossible WHERE noticed after reading const tables")
+
+def _indice_existe(cursor, tabela, nome):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+    """, (tabela, nome))
+    return cursor.fetchone() is not None
+
+def garantir_collation(cursor):
+    """Converte para a collation case-insensitive as tabelas criadas antes dela (bancos já existentes)"""
+    cursor.execute("""
+        SELECT TABLE_NAME FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_COLLATION <> %s
+    """, (COLLATION,))
+    pendentes = [linha[0] for linha in cursor.fetchall() if linha[0] in TABELAS]
+    if not pendentes:
+        return
+
+    # As chaves estrangeiras exigem a mesma collation dos dois lados, então todas mudam juntas
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for tabela in pendentes:
+            cursor.execute(f"ALTER TABLE `{tabela}` CONVERT TO CHARACTER SET {CHARSET} COLLATE {COLLATION}")
+            print(f"Table '{tabela}' converted to {COLLATION}.")
+    finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+def garantir_colunas(cursor):
+    """Acrescenta as colunas de COLUNAS_ADICIONADAS que faltam nos bancos criados antes delas.
+
+    Retorna os nomes das colunas criadas.
+    """
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    existentes = set(cursor.fetchall())
+    adicionadas = []
+    for tabela, coluna, definicao in COLUNAS_ADICIONADAS:
+        if (tabela, coluna) in existentes:
+            continue
+        cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+        print(f"Column '{coluna}' added to {tabela}.")
+        adicionadas.append(coluna)
+    return adicionadas
+
+def consolidar_estatisticas_duplicadas(cursor):
+    """Soma as linhas repetidas de (jogo_id, jogador_id) antes de criar o índice único"""
+    if _indice_existe(cursor, "estatistica", "uq_estatistica_jogo_jogador"):
+        return
+
+    cursor.execute("""
+        UPDATE estatistica e
+        JOIN (
+            SELECT MIN(id) AS id, SUM(gols) AS gols, SUM(cartoes) AS cartoes
+            FROM estatistica
+            GROUP BY jogo_id, jogador_id
+            HAVING COUNT(*) > 1
+        ) d ON d.id = e.id
+        SET e.gols = d.gols, e.cartoes = d.cartoes
+    """)
+    cursor.execute("""
+        DELETE e FROM estatistica e
+        JOIN (
+            SELECT MIN(id) AS id, jogo_id, jogador_id
+            FROM estatistica
+            GROUP BY jogo_id, jogador_id
+            HAVING COUNT(*) > 1
+        ) d ON d.jogo_id = e.jogo_id AND d.jogador_id = e.jogador_id AND e.id <> d.id
+    """)
+    if cursor.rowcount:
+        print(f"{cursor.rowcount} duplicated statistics merged.")
+
+def criar_indices(cursor):
+    """Cria os índices que ainda não existem; pode ser executado várias vezes"""
+    print("Creating indexes...")
+    for tabela, nome, colunas, unico in INDICES:
+        if _indice_existe(cursor, tabela, nome):
+            continue
+        try:
+            cursor.execute(f"CREATE {'UNIQUE ' if unico else ''}INDEX {nome} ON {tabela} {colunas}")
+            print(f"Index '{nome}' created on {tabela}{colunas}.")
+        except Error as e:
+            print(f"Could not create index '{nome}' on {tabela}: {e}")
+
+    for tabela, nome, substituto in INDICES_SUBSTITUIDOS:
+        if _indice_existe(cursor, tabela, nome) and _indice_existe(cursor, tabela, substituto):
+            cursor.execute(f"DROP INDEX {nome} ON {tabela}")
+            print(f"Index '{nome}' dropped (replaced by '{substituto}').")
+
+def indices_do_plano(cursor, consulta):
+    """Roda EXPLAIN na consulta e retorna (índices escolhidos, índices possíveis, resolvida como const).
+
+    O último item indica que o otimizador achou a linha (ou a falta dela) por uma chave única
+    já na otimização, caso em que o EXPLAIN não mostra índice nenhum.
+    """
+    cursor.execute(f"EXPLAIN {consulta}")
+    colunas = [c[0] for c in cursor.description]
+    planos = [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+    usados = [chave for p in planos for chave in str(p.get("key") or "").split(",") if chave]
+    possiveis = [chave for p in planos for chave in str(p.get("possible_keys") or "").split(",") if chave]
+    constante = any(mensagem in str(p.get("Extra") or "") for p in planos for mensagem in PLANOS_CONSTANTES)
+    return usados, possiveis, constante
+
+def _unicos():
+    """Nomes dos índices únicos (e a PRIMARY), os únicos que resolvem uma consulta como const"""
+    return {"PRIMARY"} | {nome for _, nome, _, unico in INDICES if unico}
+
+def verificar_indices(cursor):
+    """Executa EXPLAIN em cada consulta crítica e confere se o otimizador escolheu o índice esperado.
+
+    Retorna False se alguma consulta não usa o seu índice.
+    """
+    print("Checking query plans...")
+    ok = True
+    for descricao, consulta, esperado in CONSULTAS_VERIFICADAS:
+        usados, possiveis, constante = indices_do_plano(cursor, consulta)
+        if esperado in usados:
+            print(f"  ✅ {descricao}: {','.join(usados)}")
+            continue
+        if constante and not usados and esperado in _unicos():
+            print(f"  ✅ {descricao}: resolved as const through '{esperado}'")
+            continue
+        ok = False
+        if esperado in possiveis:
+            print(f"  ❌ {descricao}: '{esperado}' available but not chosen (key={','.join(usados) or 'NULL'})")
+        else:
+            print(f"  ❌ {descricao}: '{esperado}' not usable (key={','.join(usados) or 'NULL'})")
+    return ok
 
 def main():
     print("--- Database Setup Initialized ---")
+    conn = None
     
     try:
         
+        # Autocommit: as leituras do setup não deixam transação aberta, e os recalcular_*
+        # abrem a sua com start_transaction()
         conn = mysql.connector.connect(
             host=MYSQL_HOST,
             port=MYSQL_PORT,
             user=MYSQL_USER,
-            password=MYSQL_PASSWORD
+            password=MYSQL_PASSWORD,
+            autocommit=True
         )
         
         cursor = conn.cursor()
         
         
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{MYSQL_DB}`")
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{MYSQL_DB}` CHARACTER SET {CHARSET} COLLATE {COLLATION}")
         print(f"Database '{MYSQL_DB}' is ready.")
         
         
@@ -29,31 +260,31 @@ def main():
         
         print("Creating tables...")
         
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS pessoas (
                 login VARCHAR(50) PRIMARY KEY,
                 senha VARCHAR(100) NOT NULL,
                 tipo VARCHAR(20)
-            )
+            ) DEFAULT CHARSET={CHARSET} COLLATE={COLLATION}
         """)
         
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS equipe (
                 nome VARCHAR(40) PRIMARY KEY
-            )
+            ) DEFAULT CHARSET={CHARSET} COLLATE={COLLATION}
         """)
         
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS jogador (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 nome VARCHAR(100),
                 numero INT,
                 nome_equipe VARCHAR(40),
                 FOREIGN KEY (nome_equipe) REFERENCES equipe(nome)
-            )
+            ) DEFAULT CHARSET={CHARSET} COLLATE={COLLATION}
         """)
         
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS jogo (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 data DATE NOT NULL,
@@ -61,31 +292,117 @@ def main():
                 local VARCHAR(100),
                 equipe1_id VARCHAR(40) NOT NULL,
                 equipe2_id VARCHAR(40) NOT NULL,
+                -- A dupla em ordem alfabética: A x B e B x A caem na mesma chave de uq_jogo_confronto
+                equipe_menor VARCHAR(40) AS (LEAST(equipe1_id, equipe2_id)) STORED,
+                equipe_maior VARCHAR(40) AS (GREATEST(equipe1_id, equipe2_id)) STORED,
+                -- Placar mantido por atualizar_agregados; NULL enquanto o jogo não tem estatísticas
+                gols_equipe1 INT NULL,
+                gols_equipe2 INT NULL,
+                cartoes_equipe1 INT NULL,
+                cartoes_equipe2 INT NULL,
                 FOREIGN KEY (equipe1_id) REFERENCES equipe(nome),
                 FOREIGN KEY (equipe2_id) REFERENCES equipe(nome)
-            )
+            ) DEFAULT CHARSET={CHARSET} COLLATE={COLLATION}
         """)
         
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS estatistica (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 gols INT,
                 cartoes INT,
                 jogo_id INT,
                 jogador_id INT,
+                -- Estado de suspensão do jogador depois deste jogo (database/suspensoes.py)
+                cartoes_acumulados INT NULL,
+                suspensao_jogo_id INT NULL,
                 FOREIGN KEY (jogo_id) REFERENCES jogo(id),
                 FOREIGN KEY (jogador_id) REFERENCES jogador(id)
-            )
+            ) DEFAULT CHARSET={CHARSET} COLLATE={COLLATION}
         """)
-        
+
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS classificacao (
+                nome_equipe VARCHAR(40) PRIMARY KEY,
+                jogos INT NOT NULL DEFAULT 0,
+                vitorias INT NOT NULL DEFAULT 0,
+                empates INT NOT NULL DEFAULT 0,
+                derrotas INT NOT NULL DEFAULT 0,
+                gols_pro INT NOT NULL DEFAULT 0,
+                gols_contra INT NOT NULL DEFAULT 0,
+                saldo INT AS (gols_pro - gols_contra) STORED,
+                pontos INT NOT NULL DEFAULT 0,
+                cartoes INT NOT NULL DEFAULT 0,
+                INDEX idx_classificacao_ordem (pontos DESC, vitorias DESC, saldo DESC, gols_pro DESC, cartoes, nome_equipe),
+                FOREIGN KEY (nome_equipe) REFERENCES equipe(nome) ON DELETE CASCADE
+            ) DEFAULT CHARSET={CHARSET} COLLATE={COLLATION}
+        """)
+
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS jogador_totais (
+                jogador_id INT PRIMARY KEY,
+                jogos INT NOT NULL DEFAULT 0,
+                gols INT NOT NULL DEFAULT 0,
+                cartoes INT NOT NULL DEFAULT 0,
+                -- Estado de suspensão depois do último jogo: cartões pendentes, o jogo da última
+                -- suspensão e se ela ainda não foi cumprida (database/suspensoes.py)
+                cartoes_acumulados INT NOT NULL DEFAULT 0,
+                suspensao_jogo_id INT NULL,
+                suspenso BOOLEAN NOT NULL DEFAULT FALSE,
+                FOREIGN KEY (jogador_id) REFERENCES jogador(id) ON DELETE CASCADE
+            ) DEFAULT CHARSET={CHARSET} COLLATE={COLLATION}
+        """)
+
         conn.commit()
         print("Tables created successfully!")
+
+        garantir_collation(cursor)
+        colunas_adicionadas = garantir_colunas(cursor)
+        consolidar_estatisticas_duplicadas(cursor)
+        criar_indices(cursor)
+        conn.commit()
+
+        # Bancos anteriores ao placar em jogo: calcula o placar dos jogos já disputados
+        if "gols_equipe1" in colunas_adicionadas:
+            recalcular_placares(conn)
+            print("Match scores rebuilt from statistics.")
+
+        # Bancos anteriores a classificacao (ou com equipes sem linha nela): reconstrói a tabela
+        # inteira, já que cada escrita só soma a diferença do seu jogo
+        cursor.execute("""
+            SELECT EXISTS(
+                SELECT 1 FROM equipe e
+                LEFT JOIN classificacao c ON c.nome_equipe = e.nome
+                WHERE c.nome_equipe IS NULL
+            )
+        """)
+        if cursor.fetchone()[0]:
+            recalcular_classificacao(conn)
+            print("Standings rebuilt from statistics.")
+
+        # Bancos anteriores às suspensões (ou com os totais recém-reconstruídos): percorre o histórico de cartões
+        refazer_suspensoes = "suspensao_jogo_id" in colunas_adicionadas
+
+        # Bancos anteriores a jogador_totais: preenche a tabela a partir das estatísticas existentes
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM jogador_totais)")
+        if not cursor.fetchone()[0]:
+            recalcular_jogador_totais(conn)
+            print("Player totals rebuilt from statistics.")
+            refazer_suspensoes = True
+
+        if refazer_suspensoes:
+            recalcular_suspensoes(conn)
+            print("Suspensions rebuilt from statistics.")
+
+        if not verificar_indices(cursor):
+            print("Error: some queries do not use their expected index.")
+            sys.exit(1)
         print("--- Database Setup Complete ---")
         
     except Error as e:
         print(f"Error: {e}")
+        sys.exit(1)
     finally:
-        if conn.is_connected():
+        if conn is not None and conn.is_connected():
             cursor.close()
             conn.close()
 
@@ -0,0 +1,178 @@
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from database.config import METRICAS_PORTA, METRICAS_ENDERECO
+
+# Com METRICAS_PORTA=0 nada é medido: operacao() devolve a própria função e o servidor não sobe
+HABILITADAS = METRICAS_PORTA > 0
+FAIXAS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _rotulos(nomes, valores):
+    if not nomes:
+        return ""
+    pares = []
+    for nome, valor in zip(nomes, valores):
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pares.append(f'{nome}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+class Contador:
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores, quantidade=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def exposicao(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            for valores, total in sorted(self._valores.items()):
+                linhas.append(f"{self.nome}{_rotulos(self.rotulos, valores)} {total}")
+        return linhas
+
+
+class Histograma:
+    def __init__(self, nome, ajuda, rotulos=(), faixas=FAIXAS_SEGUNDOS):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.faixas = faixas
+        # valores dos rótulos -> [contagem por faixa (não cumulativa) + a aberta, soma, total]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, *valores, segundos):
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.faixas) + 1), 0.0, 0]
+            indice = next((i for i, limite in enumerate(self.faixas) if segundos <= limite), len(self.faixas))
+            serie[0][indice] += 1
+            serie[1] += segundos
+            serie[2] += 1
+
+    def exposicao(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            for valores, (contagens, soma, total) in sorted(self._series.items()):
+                acumulado = 0
+                for limite, contagem in zip(self.faixas + ("+Inf",), contagens):
+                    acumulado += contagem
+                    rotulos = _rotulos(self.rotulos + ("le",), valores + (limite,))
+                    linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+                linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, valores)} {soma}")
+                linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, valores)} {total}")
+        return linhas
+
+
+duracao_operacoes = Histograma(
+    "cbf_operacao_segundos", "Duração de cada operação (função de página) em segundos", ("operacao",)
+)
+erros_operacoes = Contador(
+    "cbf_operacao_erros_total", "Exceções que escaparam de cada operação", ("operacao", "tipo")
+)
+duracao_renders = Histograma(
+    "cbf_render_segundos", "Duração de cada execução do script do Streamlit em segundos", ("pagina",)
+)
+_metricas = [duracao_operacoes, erros_operacoes, duracao_renders]
+_coletores = []
+
+
+def operacao(funcao):
+    """Decorador: mede a duração e conta os erros da função com o nome modulo.funcao"""
+    if not HABILITADAS:
+        return funcao
+    nome = f"{funcao.__module__.rsplit('.', 1)[-1]}.{funcao.__name__}"
+
+    @functools.wraps(funcao)
+    def medida(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        except Exception as e:
+            erros_operacoes.incrementar(nome, type(e).__name__)
+            raise
+        finally:
+            duracao_operacoes.observar(nome, segundos=time.perf_counter() - inicio)
+    return medida
+
+
+def observar_render(pagina, segundos):
+    if HABILITADAS:
+        duracao_renders.observar(pagina, segundos=segundos)
+
+
+def registrar(metrica):
+    """Inclui um Contador ou Histograma criado em outro módulo na exposição"""
+    _metricas.append(metrica)
+    return metrica
+
+
+def registrar_coletor(coletor):
+    """Registra uma função chamada a cada coleta.
+
+    Ela retorna [(nome, tipo, ajuda, [(rótulos, valor)])], para valores que já são mantidos
+    em outro lugar (pool, cache) e só precisam ser lidos na hora da coleta.
+    """
+    _coletores.append(coletor)
+
+
+def exposicao():
+    """Todas as métricas no formato texto de exposição do Prometheus"""
+    linhas = []
+    for metrica in _metricas:
+        linhas.extend(metrica.exposicao())
+    for coletor in _coletores:
+        for nome, tipo, ajuda, amostras in coletor():
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for rotulos, valor in amostras:
+                linhas.append(f"{nome}{_rotulos(tuple(rotulos), tuple(rotulos.values()))} {valor}")
+    return "\n".join(linhas) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        corpo = exposicao().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+_servidor = None
+_lock = threading.Lock()
+
+
+def iniciar_servidor():
+    """Sobe o endpoint /metrics numa thread daemon, uma vez por processo"""
+    global _servidor
+    if not HABILITADAS or _servidor is not None:
+        return
+    with _lock:
+        if _servidor is not None:
+            return
+        try:
+            _servidor = ThreadingHTTPServer((METRICAS_ENDERECO, METRICAS_PORTA), _Handler)
+        except OSError as e:
+            # Vários workers na mesma máquina precisam de portas diferentes (METRICAS_PORTA)
+            print(f"❌ Métricas não expostas em {METRICAS_ENDERECO}:{METRICAS_PORTA}: {e}")
+            return
+        _servidor.daemon_threads = True
+        threading.Thread(target=_servidor.serve_forever, name="metricas", daemon=True).start()
+        print(f"✅ Métricas em http://{METRICAS_ENDERECO}:{METRICAS_PORTA}/metrics")
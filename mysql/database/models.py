@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Time, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship 
 
@@ -21,6 +21,10 @@ class Equipe(Base):
 
 class Jogador(Base):
     __tablename__ = "jogador"
+    __table_args__ = (
+        UniqueConstraint("nome_equipe", "numero", name="uq_jogador_equipe_numero"),
+        Index("idx_jogador_nome", "nome", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String(100))
@@ -33,6 +37,11 @@ class Jogador(Base):
 
 class Jogo(Base):
     __tablename__ = "jogo"
+    __table_args__ = (
+        Index("idx_jogo_data_hora", "data", "hora"),
+        Index("idx_jogo_equipe1_data", "equipe1_id", "data"),
+        Index("idx_jogo_equipe2_data", "equipe2_id", "data"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     data = Column(Date, nullable=False)
@@ -47,9 +56,37 @@ class Jogo(Base):
 
 class Estatistica(Base):
     __tablename__ = "estatistica"
+    __table_args__ = (
+        UniqueConstraint("jogo_id", "jogador_id", name="uq_estatistica_jogo_jogador"),
+        Index("idx_estatistica_jogador", "jogador_id", "gols", "cartoes"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     gols = Column(Integer)
     cartoes = Column(Integer)
 
     jogo_id = Column(Integer, ForeignKey('jogo.id'))
-    jogador_id = Column(Integer, ForeignKey('jogador.id'))
\ No newline at end of file
+    jogador_id = Column(Integer, ForeignKey('jogador.id'))
+
+
+class Classificacao(Base):
+    __tablename__ = "classificacao"
+
+    nome_equipe = Column(String(40), ForeignKey('equipe.nome', ondelete="CASCADE"), primary_key=True)
+    jogos = Column(Integer, nullable=False, default=0)
+    vitorias = Column(Integer, nullable=False, default=0)
+    empates = Column(Integer, nullable=False, default=0)
+    derrotas = Column(Integer, nullable=False, default=0)
+    gols_pro = Column(Integer, nullable=False, default=0)
+    gols_contra = Column(Integer, nullable=False, default=0)
+    saldo = Column(Integer)
+    pontos = Column(Integer, nullable=False, default=0)
+    cartoes = Column(Integer, nullable=False, default=0)
+
+
+class JogadorTotais(Base):
+    __tablename__ = "jogador_totais"
+
+    jogador_id = Column(Integer, ForeignKey('jogador.id', ondelete="CASCADE"), primary_key=True)
+    jogos = Column(Integer, nullable=False, default=0)
+    gols = Column(Integer, nullable=False, default=0)
+    cartoes = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,156 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+from collections import defaultdict
+from database.config import PERFIL_LIMITE_N_MAIS_1
+
+# Consultas da renderização atual; cada sessão do Streamlit roda o script na sua própria thread
+_render = threading.local()
+
+
+def iniciar():
+    """Passa a registrar as consultas feitas por esta thread até encerrar()"""
+    _render.registros = []
+
+
+def encerrar():
+    """Para de registrar e retorna as consultas registradas desde iniciar()"""
+    registros = getattr(_render, "registros", None) or []
+    _render.registros = None
+    return registros
+
+
+def ativo():
+    return getattr(_render, "registros", None) is not None
+
+
+def _formato(valor):
+    """Forma dos parâmetros sem os valores: (int, str), {chave: tipo}..."""
+    if isinstance(valor, dict):
+        return "{" + ", ".join(f"{chave}: {_formato(v)}" for chave, v in valor.items()) + "}"
+    if isinstance(valor, (list, tuple)):
+        return "(" + ", ".join(_formato(v) for v in valor) + ")"
+    return type(valor).__name__
+
+
+def registrar(comando, parametros, valores, duracao, linhas=None):
+    """Anota uma consulta; retorna o registro para quem ainda for completar linhas e duração"""
+    registros = getattr(_render, "registros", None)
+    if registros is None:
+        return None
+    registro = {
+        "comando": comando,
+        "parametros": parametros,
+        "valores": valores,
+        "ms": duracao * 1000,
+        "linhas": linhas,
+    }
+    registros.append(registro)
+    return registro
+
+
+class CursorPerfilado:
+    """Cursor do driver que anota cada execute no perfil da renderização, com linhas e duração"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._registro = None
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def _executar(self, metodo, sql, parametros, formato, valores):
+        inicio = time.perf_counter()
+        try:
+            return metodo(sql, parametros)
+        finally:
+            self._registro = registrar(" ".join(sql.split()), formato, valores, time.perf_counter() - inicio)
+            if self._registro is not None:
+                self._registro["linhas"] = 0 if self._cursor.with_rows else self._cursor.rowcount
+
+    def execute(self, sql, parametros=()):
+        return self._executar(self._cursor.execute, sql, parametros, _formato(parametros), repr(parametros))
+
+    def executemany(self, sql, parametros):
+        parametros = list(parametros)
+        formato = f"{len(parametros)} × {_formato(parametros[0])}" if parametros else "0 × ()"
+        return self._executar(self._cursor.executemany, sql, parametros, formato, formato)
+
+    def _buscar(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        if self._registro is not None:
+            self._registro["ms"] += (time.perf_counter() - inicio) * 1000
+            if isinstance(resultado, list):
+                self._registro["linhas"] += len(resultado)
+            elif resultado is not None:
+                self._registro["linhas"] += 1
+        return resultado
+
+    def fetchone(self):
+        return self._buscar(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._buscar(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._buscar(self._cursor.fetchall)
+
+
+def suspeitas_n_mais_1(registros, limite=PERFIL_LIMITE_N_MAIS_1):
+    """Comandos repetidos com parâmetros diferentes mais de `limite` vezes na mesma renderização"""
+    grupos = defaultdict(list)
+    for registro in registros:
+        grupos[(registro["comando"], registro["parametros"])].append(registro)
+    return sorted((
+        {
+            "comando": comando,
+            "parametros": parametros,
+            "execucoes": len(grupo),
+            "parametros_distintos": len({registro["valores"] for registro in grupo}),
+            "ms": sum(registro["ms"] for registro in grupo),
+        }
+        for (comando, parametros), grupo in grupos.items()
+        if len({registro["valores"] for registro in grupo}) > limite
+    ), key=lambda suspeita: -suspeita["execucoes"])
+
+
+def iniciar_cpu(motor="cprofile"):
+    """Liga o profiler da renderização: pyinstrument se pedido e instalado, senão cProfile.
+
+    Retorna None quando outro profiler já está ativo no processo (outra sessão perfilando).
+    """
+    if motor == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            pass
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return ("pyinstrument", profiler)
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return ("cprofile", profiler)
+
+
+def parar_cpu(perfil, linhas=30):
+    """Desliga o profiler e retorna o relatório em texto"""
+    motor, profiler = perfil
+    if motor == "pyinstrument":
+        profiler.stop()
+        return profiler.output_text(unicode=True, color=False)
+
+    profiler.disable()
+    saida = io.StringIO()
+    pstats.Stats(profiler, stream=saida).sort_stats("cumulative").print_stats(linhas)
+    return saida.getvalue()
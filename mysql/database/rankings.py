@@ -0,0 +1,24 @@
+from database.cache import consultar
+
+# Ranking -> coluna de jogador_totais; cada uma tem um índice (coluna DESC, jogador_id) em init_db
+RANKINGS = {
+    "⚽ Artilharia": "gols",
+    "🟨 Cartões": "cartoes",
+}
+
+def buscar_ranking(conn, coluna, limite, equipe=None):
+    """Os `limite` primeiros jogadores pela coluna de jogador_totais, no geral ou de uma equipe.
+
+    jogador_totais é mantida a cada escrita de estatística (atualizar_agregados), então o
+    ranking geral é a leitura dos primeiros itens do índice, sem agregar a tabela estatistica;
+    o de uma equipe parte do elenco (uq_jogador_equipe_numero) e ordena só os jogadores dela.
+    """
+    filtro_equipe = "AND j.nome_equipe = %s" if equipe else ""
+    return consultar(conn, f"""
+        SELECT j.id, j.nome, j.numero, j.nome_equipe, t.jogos, t.gols, t.cartoes
+        FROM jogador_totais t
+        JOIN jogador j ON j.id = t.jogador_id
+        WHERE t.{coluna} > 0 {filtro_equipe}
+        ORDER BY t.{coluna} DESC, t.jogador_id
+        LIMIT %s
+    """, [equipe, limite] if equipe else [limite], tabelas=("jogador", "jogador_totais"))
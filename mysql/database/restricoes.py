@@ -0,0 +1,18 @@
+import re
+from mysql.connector import errorcode
+
+
+def restricao_violada(erro):
+    """Nome da chave única (entrada duplicada) ou coluna da chave estrangeira violada pelo erro.
+
+    Retorna None para os demais erros. Os formulários gravam direto e traduzem a violação
+    numa mensagem, em vez de consultar antes se o valor já existe.
+    """
+    if erro.errno == errorcode.ER_DUP_ENTRY:
+        # "Duplicate entry 'x' for key 'tabela.chave'" no MySQL 8, "... for key 'chave'" antes e no MariaDB
+        encontrado = re.search(r"for key '(?:[^'.]*\.)?([^']*)'", erro.msg)
+    elif erro.errno in (errorcode.ER_NO_REFERENCED_ROW_2, errorcode.ER_ROW_IS_REFERENCED_2):
+        encontrado = re.search(r"FOREIGN KEY \(`([^`]*)`\)", erro.msg)
+    else:
+        return None
+    return encontrado.group(1) if encontrado else None
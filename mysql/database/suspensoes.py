@@ -0,0 +1,147 @@
+from database.cache import consultar
+from database.config import SUSPENSAO_CARTOES_ACUMULADOS, SUSPENSAO_CARTOES_JOGO, SUSPENSAO_JOGOS
+
+# Os jogos de cada jogador são percorridos na ordem (data, id) do jogo
+
+
+def _marcadores(valores):
+    return ", ".join(["%s"] * len(valores))
+
+
+def proximo_estado(acumulados, suspensao_jogo_id, jogo_id, cartoes):
+    """Aplica os cartões de um jogo ao estado (cartões acumulados, último jogo que gerou suspensão).
+
+    O acúmulo zera a cada suspensão, seja por atingir o limite de cartões acumulados
+    ou o limite de cartões num único jogo; um limite 0 fica desligado.
+    """
+    acumulados += cartoes
+    if (SUSPENSAO_CARTOES_ACUMULADOS and acumulados >= SUSPENSAO_CARTOES_ACUMULADOS) or \
+            (SUSPENSAO_CARTOES_JOGO and cartoes >= SUSPENSAO_CARTOES_JOGO):
+        return 0, jogo_id
+    return acumulados, suspensao_jogo_id
+
+
+def atualizar_suspensoes(cursor, jogador_ids=None, inicio=None):
+    """Refaz o estado de suspensão dos jogadores a partir do jogo `inicio` = (data, id).
+
+    Cada estatística guarda o estado do jogador depois daquele jogo; o percurso parte do
+    estado gravado na última estatística anterior a `inicio` e reescreve só as seguintes,
+    sem reler a temporada inteira. Sem `inicio`, percorre todos os jogos; sem `jogador_ids`,
+    todos os jogadores. Deve ser usado dentro da mesma transação da escrita.
+    """
+    filtros = []
+    params = []
+    estados = {}
+    if jogador_ids is not None:
+        jogador_ids = list(jogador_ids)
+        if not jogador_ids:
+            return
+        estados = {jogador_id: (0, None) for jogador_id in jogador_ids}
+        filtros.append(f"e.jogador_id IN ({_marcadores(jogador_ids)})")
+        params += jogador_ids
+    else:
+        filtros.append("e.jogador_id IS NOT NULL")
+
+    if inicio:
+        data, jogo_id = inicio
+        cursor.execute(f"""
+            SELECT jogador_id, cartoes_acumulados, suspensao_jogo_id
+            FROM (
+                SELECT e.jogador_id, e.cartoes_acumulados, e.suspensao_jogo_id,
+                       ROW_NUMBER() OVER (PARTITION BY e.jogador_id ORDER BY g.data DESC, g.id DESC) AS ordem
+                FROM estatistica e
+                JOIN jogo g ON g.id = e.jogo_id
+                WHERE {filtros[0]} AND (g.data < %s OR (g.data = %s AND g.id < %s))
+            ) anteriores
+            WHERE ordem = 1
+        """, params + [data, data, jogo_id])
+        for linha in cursor.fetchall():
+            estados[linha['jogador_id']] = (linha['cartoes_acumulados'] or 0, linha['suspensao_jogo_id'])
+        filtros.append("(g.data > %s OR (g.data = %s AND g.id >= %s))")
+        params += [data, data, jogo_id]
+
+    cursor.execute(f"""
+        SELECT e.id, e.jogador_id, e.jogo_id, e.cartoes, e.cartoes_acumulados, e.suspensao_jogo_id
+        FROM estatistica e
+        JOIN jogo g ON g.id = e.jogo_id
+        WHERE {' AND '.join(filtros)}
+        ORDER BY e.jogador_id, g.data, g.id
+    """, params)
+
+    alteradas = []
+    for linha in cursor.fetchall():
+        anterior = estados.get(linha['jogador_id'], (0, None))
+        estado = proximo_estado(*anterior, linha['jogo_id'], linha['cartoes'] or 0)
+        estados[linha['jogador_id']] = estado
+        if estado != (linha['cartoes_acumulados'], linha['suspensao_jogo_id']):
+            alteradas.append((*estado, linha['id']))
+
+    if alteradas:
+        cursor.executemany(
+            "UPDATE estatistica SET cartoes_acumulados = %s, suspensao_jogo_id = %s WHERE id = %s", alteradas
+        )
+    if estados:
+        cursor.executemany(
+            "UPDATE jogador_totais SET cartoes_acumulados = %s, suspensao_jogo_id = %s WHERE jogador_id = %s",
+            [(*estado, jogador_id) for jogador_id, estado in estados.items()]
+        )
+
+
+def atualizar_situacao(cursor, jogador_ids=None, equipes=None):
+    """Marca como suspensos os jogadores que ainda não cumpriram a última suspensão.
+
+    A suspensão é cumprida quando a equipe atual do jogador disputa SUSPENSAO_JOGOS jogos
+    depois do que a gerou; um jogo conta como disputado quando já tem placar. Só mudam de
+    situação os jogadores com estatísticas alteradas e os das equipes dos jogos alterados,
+    então basta refazer esses; sem filtros, refaz todos.
+    """
+    filtros = []
+    params = [SUSPENSAO_JOGOS]
+    if jogador_ids:
+        filtros.append(f"t.jogador_id IN ({_marcadores(jogador_ids)})")
+        params += list(jogador_ids)
+    if equipes:
+        filtros.append(f"j.nome_equipe IN ({_marcadores(equipes)})")
+        params += list(equipes)
+    if (jogador_ids is not None or equipes is not None) and not filtros:
+        return
+
+    cursor.execute(f"""
+        UPDATE jogador_totais t
+        JOIN jogador j ON j.id = t.jogador_id
+        LEFT JOIN jogo s ON s.id = t.suspensao_jogo_id
+        SET t.suspenso = s.id IS NOT NULL AND (
+            SELECT COUNT(*) FROM jogo g
+            WHERE (g.equipe1_id = j.nome_equipe OR g.equipe2_id = j.nome_equipe)
+              AND g.gols_equipe1 IS NOT NULL
+              AND (g.data > s.data OR (g.data = s.data AND g.id > s.id))
+        ) < %s
+        {f"WHERE {' OR '.join(filtros)}" if filtros else ""}
+    """, params)
+
+
+def recalcular_suspensoes(conn):
+    """Refaz do zero o estado de suspensão de todos os jogadores com estatísticas"""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        conn.start_transaction()
+        cursor.execute("UPDATE jogador_totais SET cartoes_acumulados = 0, suspensao_jogo_id = NULL")
+        atualizar_suspensoes(cursor)
+        atualizar_situacao(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def jogadores_suspensos(conn):
+    """{jogador_id: data do jogo que gerou a suspensão} dos jogadores suspensos para o próximo jogo"""
+    linhas = consultar(conn, """
+        SELECT t.jogador_id, s.data
+        FROM jogador_totais t
+        JOIN jogo s ON s.id = t.suspensao_jogo_id
+        WHERE t.suspenso = TRUE
+    """, tabelas=("jogador_totais", "jogo"))
+    return {linha['jogador_id']: linha['data'] for linha in linhas}
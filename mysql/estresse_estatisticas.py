@@ -0,0 +1,150 @@
+import argparse
+import random
+import sys
+import threading
+import time
+from mysql.connector import Error
+from database.agregados import atualizar_agregados, verificar_agregados, TABELAS_AGREGADAS
+from database.cache import invalidar
+from database.config import MYSQL_POOL_SIZE
+from database.connection import get_db_connection
+from database.estatisticas import somar_estatistica
+
+# Teste de estresse da gravação de estatísticas: várias threads somando gols nos mesmos
+# (jogo, jogador) pelo mesmo caminho do cadastrar_estatisticas, e no final a conferência
+# de que nenhum gol se perdeu, não há linhas repetidas e os agregados batem com as estatísticas.
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(
+        description="Várias threads somando estatísticas nos mesmos (jogo, jogador) com somar_estatistica "
+                    "dentro de atualizar_agregados. Usa o primeiro jogo do banco e restaura as linhas "
+                    "originais ao final; sai com código 1 se encontrar alguma inconsistência."
+    )
+    parser.add_argument(
+        "--threads", type=int, default=max(1, MYSQL_POOL_SIZE - 1),
+        help="uma conexão do pool por thread, além da usada para preparar e conferir"
+    )
+    parser.add_argument("--gravacoes", type=int, default=200, help="gravações por thread")
+    parser.add_argument("--jogadores", type=int, default=4, help="jogadores disputados (menos = mais concorrência)")
+    return parser.parse_args()
+
+
+def _regravar(conn, jogo_id, jogadores, linhas):
+    """Troca as estatísticas dos pares pelas linhas dadas, mantendo os agregados em dia"""
+    marcadores = ", ".join(["%s"] * len(jogadores))
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        with atualizar_agregados(conn, [jogo_id]):
+            cursor.execute(
+                f"DELETE FROM estatistica WHERE jogo_id = %s AND jogador_id IN ({marcadores})", [jogo_id] + jogadores
+            )
+            if linhas:
+                cursor.executemany(
+                    "INSERT INTO estatistica (id, jogo_id, jogador_id, gols, cartoes) VALUES (%s, %s, %s, %s, %s)",
+                    [(linha['id'], linha['jogo_id'], linha['jogador_id'], linha['gols'], linha['cartoes']) for linha in linhas]
+                )
+        conn.commit()
+        invalidar("estatistica", *TABELAS_AGREGADAS)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _trabalhador(jogo_id, jogadores, gravacoes, semente, duracoes, resultado):
+    rng = random.Random(semente)
+    conexao = get_db_connection()
+    try:
+        for _ in range(gravacoes):
+            inicio = time.perf_counter()
+            try:
+                conexao.start_transaction()
+                with atualizar_agregados(conexao, [jogo_id]):
+                    somar_estatistica(conexao, jogo_id, rng.choice(jogadores), 1, 0)
+                conexao.commit()
+                invalidar("estatistica", *TABELAS_AGREGADAS)
+                resultado["gravadas"] += 1
+            except Error:
+                conexao.rollback()
+                resultado["erros"] += 1
+            duracoes.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        conexao.close()
+
+
+def main():
+    args = _argumentos()
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id, equipe1_id FROM jogo ORDER BY id LIMIT 1")
+        jogo = cursor.fetchone()
+        if jogo is None:
+            raise SystemExit("❌ Nenhum jogo cadastrado: rode o preencher_BD.py antes")
+        cursor.execute(
+            "SELECT id FROM jogador WHERE nome_equipe = %s ORDER BY id LIMIT %s", (jogo['equipe1_id'], args.jogadores)
+        )
+        jogadores = [linha['id'] for linha in cursor.fetchall()]
+        marcadores = ", ".join(["%s"] * len(jogadores))
+        cursor.execute(
+            f"SELECT id, jogo_id, jogador_id, gols, cartoes FROM estatistica WHERE jogo_id = %s AND jogador_id IN ({marcadores})",
+            [jogo['id']] + jogadores
+        )
+        originais = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    problemas = []
+    try:
+        _regravar(conn, jogo['id'], jogadores, [])
+        duracoes = []
+        resultados = [{"gravadas": 0, "erros": 0} for _ in range(args.threads)]
+        threads = [
+            threading.Thread(
+                target=_trabalhador, args=(jogo['id'], jogadores, args.gravacoes, semente, duracoes, resultados[semente])
+            )
+            for semente in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(f"""
+                SELECT COUNT(*) AS linhas, COUNT(DISTINCT jogador_id) AS pares, COALESCE(SUM(gols), 0) AS gols
+                FROM estatistica WHERE jogo_id = %s AND jogador_id IN ({marcadores})
+            """, [jogo['id']] + jogadores)
+            contagem = cursor.fetchone()
+        finally:
+            cursor.close()
+        gravadas = sum(r["gravadas"] for r in resultados)
+        erros = sum(r["erros"] for r in resultados)
+        duplicatas = contagem['linhas'] - contagem['pares']
+        perdidos = gravadas - int(contagem['gols'])
+        duracoes.sort()
+        print(
+            f"p50 {duracoes[len(duracoes) // 2]:7.2f} ms  p95 {duracoes[int(len(duracoes) * 0.95)]:7.2f} ms  "
+            f"{gravadas} gravadas, {erros} erros, {duplicatas} duplicatas, {perdidos} gols perdidos"
+        )
+        if duplicatas or perdidos:
+            problemas.append("estatísticas")
+        divergencias = verificar_agregados(conn)
+        for tabela, linhas in divergencias.items():
+            print(f"❌ {tabela}: {len(linhas)} linhas divergentes das estatísticas")
+            problemas.append(tabela)
+    finally:
+        _regravar(conn, jogo['id'], jogadores, originais)
+        conn.close()
+
+    if problemas:
+        sys.exit(1)
+    print("✅ Nenhum gol perdido, nenhuma duplicata e agregados em dia.")
+
+
+if __name__ == "__main__":
+    main()
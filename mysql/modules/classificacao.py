@@ -0,0 +1,43 @@
+import streamlit as st
+import pandas as pd
+from database.cache import consultar
+from database.metricas import operacao
+
+@operacao
+def visualizar_classificacao(conn):
+    st.subheader("🥇 Classificação")
+
+    tabela = consultar(conn, """
+        SELECT nome_equipe, pontos, jogos, vitorias, empates, derrotas,
+               gols_pro, gols_contra, saldo, cartoes
+        FROM classificacao
+        ORDER BY pontos DESC, vitorias DESC, saldo DESC, gols_pro DESC, cartoes, nome_equipe
+    """, tabelas=("classificacao",))
+
+    if not tabela:
+        st.info("Nenhuma equipe cadastrada ainda.")
+        return
+
+    dados = [{
+        "Posição": posicao,
+        "Equipe": linha['nome_equipe'],
+        "Pontos": linha['pontos'],
+        "Jogos": linha['jogos'],
+        "Vitórias": linha['vitorias'],
+        "Empates": linha['empates'],
+        "Derrotas": linha['derrotas'],
+        "Gols Pró": linha['gols_pro'],
+        "Gols Contra": linha['gols_contra'],
+        "Saldo": linha['saldo'],
+        "Cartões": linha['cartoes']
+    } for posicao, linha in enumerate(tabela, start=1)]
+
+    st.dataframe(
+        pd.DataFrame(dados),
+        use_container_width=True,
+        column_config={
+            "Pontos": st.column_config.NumberColumn(format="%d 🏆"),
+            "Cartões": st.column_config.NumberColumn(format="%d 🟨")
+        },
+        hide_index=True
+    )
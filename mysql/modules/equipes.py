@@ -1,7 +1,11 @@
 import streamlit as st
 import mysql.connector
 import pandas as pd
+from database.cache import consultar, invalidar
+from database.restricoes import restricao_violada
+from database.metricas import operacao
 
+@operacao
 def cadastrar_equipe(conn):
     st.header("Cadastrar Equipe")
     with st.form("team_form"):
@@ -15,27 +19,28 @@ def cadastrar_equipe(conn):
                     st.error("O nome da equipe não pode estar vazio.")
                     return
                     
-                cursor.execute("SELECT nome FROM equipe WHERE UPPER(nome) = %s", (nome_equipe,))
-                if cursor.fetchone():
-                    st.error(f"Já existe uma equipe com o nome {nome_equipe}.")
-                    return
-                    
+                conn.start_transaction()
                 cursor.execute("INSERT INTO equipe (nome) VALUES (%s)", (nome_equipe,))
+                cursor.execute("INSERT INTO classificacao (nome_equipe) VALUES (%s)", (nome_equipe,))
                 conn.commit()
+                invalidar("equipe", "classificacao")
                 st.success(f"Equipe '{nome_equipe}' cadastrada com sucesso!")
                 st.rerun()
             except mysql.connector.Error as e:
                 conn.rollback()
-                st.error(f"Erro ao cadastrar equipe: {str(e)}")
+                if restricao_violada(e) == "PRIMARY":
+                    st.error(f"Já existe uma equipe com o nome {nome_equipe}.")
+                else:
+                    st.error(f"Erro ao cadastrar equipe: {str(e)}")
             finally:
                 cursor.close()
 
+@operacao
 def deletar_equipe(conn):
     st.header("Deletar Equipe")
     
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT nome FROM equipe ORDER BY nome")
-    equipes = cursor.fetchall()
+    equipes = consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))
     
     if not equipes:
         st.info("Nenhuma equipe disponível para deletar.")
@@ -68,6 +73,7 @@ def deletar_equipe(conn):
                     
                 cursor.execute("DELETE FROM equipe WHERE nome = %s", (equipe_selecionada,))
                 conn.commit()
+                invalidar("equipe", "classificacao")
                 st.success("Equipe deletada com sucesso!")
                 st.rerun()
             except mysql.connector.Error as e:
@@ -76,16 +82,14 @@ def deletar_equipe(conn):
             finally:
                 cursor.close()
 
+@operacao
 def visualizar_equipe(conn):
     st.subheader("🏆 Equipes Cadastradas")
     
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT nome FROM equipe ORDER BY nome")
-    equipes = cursor.fetchall()
+    equipes = consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))
 
     if equipes:
-        cursor.execute("SELECT COUNT(*) as total FROM jogador")
-        total_jogadores = cursor.fetchone()['total']
+        total_jogadores = consultar(conn, "SELECT COUNT(*) as total FROM jogador", tabelas=("jogador",))[0]['total']
         
         col1, col2, col3 = st.columns(3)
         col1.metric("Total de Equipes", len(equipes))
@@ -102,11 +106,10 @@ def visualizar_equipe(conn):
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("📋 Ver Jogadores"):
-                    cursor.execute(
-                        "SELECT nome, numero FROM jogador WHERE nome_equipe = %s",
-                        (equipe_selecionada,)
+                    jogadores = consultar(
+                        conn, "SELECT nome, numero FROM jogador WHERE nome_equipe = %s",
+                        (equipe_selecionada,), tabelas=("jogador",)
                     )
-                    jogadores = cursor.fetchall()
                     if jogadores:
                         st.write(f"**Jogadores de {equipe_selecionada}:**")
                         for j in jogadores:
@@ -116,13 +119,12 @@ def visualizar_equipe(conn):
             
             with col2:
                 if st.button("📊 Ver Estatísticas"):
-                    cursor.execute("""
-                        SELECT SUM(e.gols) as total_gols 
-                        FROM estatistica e
-                        JOIN jogador j ON e.jogador_id = j.id
+                    total_gols = consultar(conn, """
+                        SELECT SUM(t.gols) as total_gols 
+                        FROM jogador_totais t
+                        JOIN jogador j ON t.jogador_id = j.id
                         WHERE j.nome_equipe = %s
-                    """, (equipe_selecionada,))
-                    total_gols = cursor.fetchone()['total_gols'] or 0
+                    """, (equipe_selecionada,), tabelas=("jogador", "jogador_totais"))[0]['total_gols'] or 0
                     st.metric("Total de Gols", int(total_gols))
 
         st.dataframe(
@@ -131,5 +133,4 @@ def visualizar_equipe(conn):
             hide_index=True
         )
     else:
-        st.info("Nenhuma equipe cadastrada ainda.")
-    cursor.close()
\ No newline at end of file
+        st.info("Nenhuma equipe cadastrada ainda.")
\ No newline at end of file
@@ -1,13 +1,77 @@
 import streamlit as st
 import mysql.connector
 import pandas as pd
+from database.agregados import atualizar_agregados, TABELAS_AGREGADAS
+from database.cache import consultar, invalidar
+from database.estatisticas import somar_estatistica
+from database.metricas import operacao
+from database.rankings import buscar_ranking
+from database.suspensoes import jogadores_suspensos
 
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+# Barras do gráfico de gols sem filtros
+LIMITE_GRAFICO = 20
+
+def _filtros_estatisticas(jogo_id=None, jogador_id=None, nome_jogador=None):
+    filtros = []
+    params = []
+    if jogo_id:
+        filtros.append("e.jogo_id = %s")
+        params.append(jogo_id)
+    if jogador_id:
+        filtros.append("e.jogador_id = %s")
+        params.append(jogador_id)
+    if nome_jogador:
+        filtros.append("j.nome LIKE %s")
+        params.append(f"%{nome_jogador}%")
+    return (f"WHERE {' AND '.join(filtros)}" if filtros else ""), params
+
+def contar_estatisticas(conn, **filtros):
+    where, params = _filtros_estatisticas(**filtros)
+    return consultar(conn, f"""
+        SELECT COUNT(*) AS total
+        FROM estatistica e
+        LEFT JOIN jogador j ON j.id = e.jogador_id
+        {where}
+    """, params, tabelas=("estatistica", "jogador"))[0]['total']
+
+def buscar_estatisticas(conn, limite, offset=0, **filtros):
+    """Retorna uma página de estatísticas já com os dados do jogador e do jogo em uma única consulta"""
+    where, params = _filtros_estatisticas(**filtros)
+    return consultar(conn, f"""
+        SELECT e.id, e.gols, e.cartoes, e.jogo_id, e.jogador_id,
+               j.nome AS jogador_nome, j.nome_equipe,
+               g.data, g.local, g.equipe1_id, g.equipe2_id
+        FROM estatistica e
+        LEFT JOIN jogador j ON j.id = e.jogador_id
+        LEFT JOIN jogo g ON g.id = e.jogo_id
+        {where}
+        ORDER BY e.id DESC
+        LIMIT %s OFFSET %s
+    """, params + [limite, offset], tabelas=("estatistica", "jogador", "jogo"))
+
+def paginacao(total, chave):
+    """Controles de paginação; retorna (limite, offset) da página escolhida"""
+    col1, col2 = st.columns(2)
+    with col1:
+        limite = st.selectbox("Itens por página:", TAMANHOS_PAGINA, index=1, key=f"{chave}_limite")
+    total_paginas = max(1, -(-total // limite))
+    with col2:
+        pagina = st.number_input(
+            f"Página (de {total_paginas}):",
+            min_value=1, max_value=total_paginas, value=1, step=1,
+            key=f"{chave}_pagina"
+        )
+    return limite, (pagina - 1) * limite
+
+@operacao
 def cadastrar_estatisticas(conn):
     st.header("Cadastrar Estatística de Jogador")
     
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, nome, numero, nome_equipe FROM jogador ORDER BY nome")
-    jogadores = cursor.fetchall()
+    jogadores = consultar(
+        conn, "SELECT id, nome, numero, nome_equipe FROM jogador ORDER BY nome, id", tabelas=("jogador",)
+    )
     
     if not jogadores:
         st.error("Cadastre jogadores primeiro.")
@@ -28,9 +92,13 @@ def cadastrar_estatisticas(conn):
             else:
                 st.session_state.jogos_disponiveis = []
     
+    suspensos = jogadores_suspensos(conn)
     jogador_selecionado = st.selectbox(
         "Jogador:",
-        [f"{j['nome']} (#{j['numero']}) - {j['nome_equipe']}" for j in jogadores],
+        [
+            f"{j['nome']} (#{j['numero']}) - {j['nome_equipe']}{' 🟥 Suspenso' if j['id'] in suspensos else ''}"
+            for j in jogadores
+        ],
         key="jogador_selected",
         on_change=update_jogos
     )
@@ -40,6 +108,12 @@ def cadastrar_estatisticas(conn):
     
     jogador_nome = jogador_selecionado.split(" - ")[0].split(" (")[0]
     jogador = next(j for j in jogadores if j['nome'] == jogador_nome)
+
+    if jogador['id'] in suspensos:
+        st.warning(
+            f"{jogador['nome']} está suspenso pelos cartões do jogo de "
+            f"{suspensos[jogador['id']].strftime('%d/%m/%Y')} e não deveria atuar no próximo jogo da equipe."
+        )
     
     if not jogador['nome_equipe']:
         st.error("Este jogador não está vinculado a nenhuma equipe. Atualize o cadastro do jogador primeiro.")
@@ -75,28 +149,15 @@ def cadastrar_estatisticas(conn):
                     st.error("Erro: Este jogador não pertence a nenhuma das equipes deste jogo!")
                     return
                 
-                cursor.execute("""
-                    SELECT * FROM estatistica 
-                    WHERE jogador_id = %s AND jogo_id = %s
-                    LIMIT 1
-                """, (jogador['id'], jogo['id']))
-                existing = cursor.fetchone()
-                
-                if existing:
-                    cursor.execute("""
-                        UPDATE estatistica 
-                        SET gols = gols + %s, cartoes = cartoes + %s
-                        WHERE id = %s
-                    """, (gols, cartoes, existing['id']))
-                    msg = "Estatísticas atualizadas"
-                else:
-                    cursor.execute("""
-                        INSERT INTO estatistica (jogador_id, jogo_id, gols, cartoes)
-                        VALUES (%s, %s, %s, %s)
-                    """, (jogador['id'], jogo['id'], gols, cartoes))
-                    msg = "Estatísticas cadastradas"
+                conn.start_transaction()
+                with atualizar_agregados(conn, [jogo['id']]):
+                    if somar_estatistica(conn, jogo['id'], jogador['id'], gols, cartoes):
+                        msg = "Estatísticas cadastradas"
+                    else:
+                        msg = "Estatísticas atualizadas"
                 
                 conn.commit()
+                invalidar("estatistica", *TABELAS_AGREGADAS)
                 st.success(f"{msg} com sucesso para {jogador['nome']} no jogo {jogo['equipe1_id']} vs {jogo['equipe2_id']}!")
                 st.rerun()
             except mysql.connector.Error as e:
@@ -105,32 +166,32 @@ def cadastrar_estatisticas(conn):
             finally:
                 cursor.close()
                 
+@operacao
 def deletar_estatisticas(conn):
     st.header("Deletar Estatística de Jogador")
 
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM estatistica")
-    estatisticas = cursor.fetchall()
+    nome_filtro = st.text_input("Filtrar por jogador:", key="delete_stats_nome").strip()
 
-    if not estatisticas:
-        st.info("Nenhuma estatística registrada ainda.")
+    total = contar_estatisticas(conn, nome_jogador=nome_filtro)
+    if not total:
+        st.info("Nenhuma estatística registrada ainda." if not nome_filtro else "Nenhuma estatística encontrada para este jogador.")
+        cursor.close()
         return
 
+    limite, offset = paginacao(total, "delete_stats")
+    estatisticas = buscar_estatisticas(conn, limite, offset, nome_jogador=nome_filtro)
+
     opcoes = []
     for estat in estatisticas:
-        cursor.execute("SELECT nome FROM jogador WHERE id = %s", (estat['jogador_id'],))
-        jogador = cursor.fetchone()
-        
-        cursor.execute("SELECT data, local FROM jogo WHERE id = %s", (estat['jogo_id'],))
-        jogo = cursor.fetchone()
-
-        jogador_nome = jogador['nome'] if jogador else "Desconhecido"
-        jogo_data = jogo['data'] if jogo else "Data?"
-        jogo_local = jogo['local'] if jogo else "Local?"
+        jogador_nome = estat['jogador_nome'] or "Desconhecido"
+        jogo_data = estat['data'] or "Data?"
+        jogo_local = estat['local'] or "Local?"
 
         opcoes.append({
-            "label": f"{jogador_nome} - {jogo_data} em {jogo_local} (Gols: {estat['gols']}, Cartões: {estat['cartoes']})",
+            "label": f"{jogador_nome} - {jogo_data} em {jogo_local} (Gols: {estat['gols']}, Cartões: {estat['cartoes']}) - ID: {estat['id']}",
             "id": estat['id'],
+            "jogo_id": estat['jogo_id'],
         })
 
     opcoes_labels = [op["label"] for op in opcoes]
@@ -139,8 +200,11 @@ def deletar_estatisticas(conn):
     if st.button("Deletar"):
         try:
             selecionado = next(op for op in opcoes if op["label"] == escolha)
-            cursor.execute("DELETE FROM estatistica WHERE id = %s", (selecionado["id"],))
+            conn.start_transaction()
+            with atualizar_agregados(conn, [selecionado["jogo_id"]]):
+                cursor.execute("DELETE FROM estatistica WHERE id = %s", (selecionado["id"],))
             conn.commit()
+            invalidar("estatistica", *TABELAS_AGREGADAS)
             st.success("Estatística deletada com sucesso!")
             st.rerun()
         except mysql.connector.Error as e:
@@ -149,6 +213,7 @@ def deletar_estatisticas(conn):
         finally:
             cursor.close()
 
+@operacao
 def visualizar_estatisticas(conn):
     st.subheader("📊 Estatísticas Registradas")
 
@@ -158,20 +223,19 @@ def visualizar_estatisticas(conn):
         col1, col2 = st.columns(2)
         with col1:
             if jogo_filtro:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT * FROM jogo WHERE id = %s", (jogo_filtro,))
-                jogo = cursor.fetchone()
-                cursor.close()
+                jogo = consultar(
+                    conn, "SELECT id, data, hora, local, equipe1_id, equipe2_id FROM jogo WHERE id = %s",
+                    (jogo_filtro,), tabelas=("jogo",)
+                )[0]
                 
                 st.write(f"**Jogo selecionado:** {jogo['equipe1_id']} vs {jogo['equipe2_id']} ({jogo['data']})")
                 if st.button("Mostrar todas as estatísticas"):
                     del st.session_state.jogo_selecionado
                     st.rerun()
             else:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute("SELECT * FROM jogo ORDER BY data DESC")
-                jogos = cursor.fetchall()
-                cursor.close()
+                jogos = consultar(
+                    conn, "SELECT id, data, hora, local, equipe1_id, equipe2_id FROM jogo ORDER BY data DESC, hora DESC", tabelas=("jogo",)
+                )
                 
                 jogo_selecionado = st.selectbox(
                     "Filtrar por jogo:",
@@ -179,56 +243,41 @@ def visualizar_estatisticas(conn):
                 )
     
         with col2:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT id, nome FROM jogador ORDER BY nome")
-            jogadores = cursor.fetchall()
-            cursor.close()
+            jogadores = consultar(
+                conn, "SELECT id, nome, numero, nome_equipe FROM jogador ORDER BY nome, id", tabelas=("jogador",)
+            )
             
             jogador_selecionado = st.selectbox(
                 "Filtrar por jogador:",
                 ["Todos"] + [f"{j['nome']} (ID: {j['id']})" for j in jogadores]
             )
 
-    query = "SELECT * FROM estatistica"
-    params = []
-    
+    filtros = {}
     if jogo_filtro:
-        query += " WHERE jogo_id = %s"
-        params.append(jogo_filtro)
+        filtros["jogo_id"] = jogo_filtro
     elif jogo_selecionado != "Todos":
-        jogo_id = int(jogo_selecionado.split("ID: ")[1].strip(")"))
-        query += " WHERE jogo_id = %s"
-        params.append(jogo_id)
+        filtros["jogo_id"] = int(jogo_selecionado.split("ID: ")[1].strip(")"))
     
     if jogador_selecionado != "Todos":
-        jogador_id = int(jogador_selecionado.split("ID: ")[1].strip(")"))
-        if "WHERE" in query:
-            query += " AND jogador_id = %s"
-        else:
-            query += " WHERE jogador_id = %s"
-        params.append(jogador_id)
+        filtros["jogador_id"] = int(jogador_selecionado.split("ID: ")[1].strip(")"))
 
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(query, params)
-    estatisticas = cursor.fetchall()
+    total = contar_estatisticas(conn, **filtros)
+
+    if total:
+        limite, offset = paginacao(total, "view_stats")
+        estatisticas = buscar_estatisticas(conn, limite, offset, **filtros)
 
-    if estatisticas:
         dados = []
         for estat in estatisticas:
-            cursor.execute("SELECT nome, nome_equipe FROM jogador WHERE id = %s", (estat['jogador_id'],))
-            jogador = cursor.fetchone()
-            
-            cursor.execute("SELECT data, equipe1_id, equipe2_id FROM jogo WHERE id = %s", (estat['jogo_id'],))
-            jogo = cursor.fetchone()
-            
             dados.append({
-                "Jogador": jogador['nome'] if jogador else "Desconhecido",
-                "Equipe": jogador['nome_equipe'] if jogador else "Nenhuma",
-                "Jogo": f"{jogo['data']} - {jogo['equipe1_id']} vs {jogo['equipe2_id']}" if jogo else "Desconhecido",
+                "Jogador": estat['jogador_nome'] or "Desconhecido",
+                "Equipe": estat['nome_equipe'] or "Nenhuma",
+                "Jogo": f"{estat['data']} - {estat['equipe1_id']} vs {estat['equipe2_id']}" if estat['data'] else "Desconhecido",
                 "Gols": estat['gols'],
                 "Cartões": estat['cartoes']
             })
 
+        st.markdown(f"**Total de estatísticas encontradas:** {total}")
         st.dataframe(
             pd.DataFrame(dados),
             use_container_width=True,
@@ -240,34 +289,57 @@ def visualizar_estatisticas(conn):
         )
         
         st.subheader("📈 Gols por Jogador")
-        df_gols = pd.DataFrame(dados).groupby("Jogador")["Gols"].sum().reset_index()
+        if filtros.get("jogo_id"):
+            where, params = _filtros_estatisticas(**filtros)
+            gols = consultar(conn, f"""
+                SELECT COALESCE(j.nome, 'Desconhecido') AS Jogador, CAST(SUM(e.gols) AS SIGNED) AS Gols
+                FROM estatistica e
+                LEFT JOIN jogador j ON j.id = e.jogador_id
+                {where}
+                GROUP BY e.jogador_id, j.nome
+            """, params, tabelas=("estatistica", "jogador"))
+        elif filtros.get("jogador_id"):
+            # Sem filtro de jogo, os totais de cada jogador já estão em jogador_totais
+            gols = consultar(conn, """
+                SELECT j.nome AS Jogador, t.gols AS Gols
+                FROM jogador_totais t
+                JOIN jogador j ON j.id = t.jogador_id
+                WHERE t.jogos > 0 AND t.jogador_id = %s
+            """, (filtros["jogador_id"],), tabelas=("jogador", "jogador_totais"))
+        else:
+            # Sem filtros, só os artilheiros: os primeiros do índice de jogador_totais
+            st.caption(f"Os {LIMITE_GRAFICO} maiores artilheiros; o ranking completo fica em Rankings.")
+            gols = [
+                {"Jogador": linha['nome'], "Gols": linha['gols']}
+                for linha in buscar_ranking(conn, "gols", LIMITE_GRAFICO)
+            ]
+        df_gols = pd.DataFrame(gols, columns=["Jogador", "Gols"])
+        df_gols = df_gols.groupby("Jogador")["Gols"].sum().reset_index()
         st.bar_chart(df_gols.set_index("Jogador"))
         
     else:
         st.info("Nenhuma estatística encontrada com os filtros selecionados.")
-    cursor.close()
         
+@operacao
 def editar_estatisticas(conn):
     st.header("Editar Estatística de Jogador")
 
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM estatistica")
-    estatisticas = cursor.fetchall()
+    nome_filtro = st.text_input("Filtrar por jogador:", key="edit_stats_nome").strip()
 
-    if not estatisticas:
-        st.info("Nenhuma estatística registrada ainda.")
+    total = contar_estatisticas(conn, nome_jogador=nome_filtro)
+    if not total:
+        st.info("Nenhuma estatística registrada ainda." if not nome_filtro else "Nenhuma estatística encontrada para este jogador.")
+        cursor.close()
         return
 
-    opcoes = []
-    for estat in estatisticas:
-        cursor.execute("SELECT nome FROM jogador WHERE id = %s", (estat['jogador_id'],))
-        jogador = cursor.fetchone()
-        
-        cursor.execute("SELECT data, local FROM jogo WHERE id = %s", (estat['jogo_id'],))
-        jogo = cursor.fetchone()
+    limite, offset = paginacao(total, "edit_stats")
+    estatisticas = {estat['id']: estat for estat in buscar_estatisticas(conn, limite, offset, nome_jogador=nome_filtro)}
 
-        jogador_nome = jogador['nome'] if jogador else "Jogador Desconhecido"
-        jogo_info = f"{jogo['data']} - {jogo['local']}" if jogo else "Jogo Desconhecido"
+    opcoes = []
+    for estat in estatisticas.values():
+        jogador_nome = estat['jogador_nome'] or "Jogador Desconhecido"
+        jogo_info = f"{estat['data']} - {estat['local']}" if estat['data'] else "Jogo Desconhecido"
 
         opcao_label = f"{jogador_nome} - {jogo_info} (Gols: {estat['gols']}, Cartões: {estat['cartoes']}) - ID: {estat['id']}"
         opcoes.append(opcao_label)
@@ -276,25 +348,22 @@ def editar_estatisticas(conn):
     
     estat_id_str = estatistica_selecionada.split("ID: ")[1].strip()
     estat_id = int(estat_id_str)
-    
-    cursor.execute("SELECT * FROM estatistica WHERE id = %s", (estat_id,))
-    estatistica = cursor.fetchone()
-
-    if not estatistica:
-        st.error("Estatística não encontrada.")
-        return
+    estatistica = estatisticas[estat_id]
 
     gols = st.number_input("Gols Marcados:", min_value=0, value=estatistica['gols'] or 0, step=1)
     cartoes = st.number_input("Cartões Recebidos:", min_value=0, value=estatistica['cartoes'] or 0, step=1)
 
     if st.button("Salvar Alterações"):
         try:
-            cursor.execute("""
-                UPDATE estatistica 
-                SET gols = %s, cartoes = %s
-                WHERE id = %s
-            """, (gols, cartoes, estat_id))
+            conn.start_transaction()
+            with atualizar_agregados(conn, [estatistica['jogo_id']]):
+                cursor.execute("""
+                    UPDATE estatistica 
+                    SET gols = %s, cartoes = %s
+                    WHERE id = %s
+                """, (gols, cartoes, estat_id))
             conn.commit()
+            invalidar("estatistica", *TABELAS_AGREGADAS)
             
             st.success("Estatística atualizada com sucesso!")
             st.rerun()
@@ -302,4 +371,4 @@ def editar_estatisticas(conn):
             conn.rollback()
             st.error(f"Erro ao atualizar estatística: {str(e)}")
         finally:
-            cursor.close()
\ No newline at end of file
+            cursor.close()
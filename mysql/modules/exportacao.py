@@ -0,0 +1,52 @@
+import os
+import tempfile
+import streamlit as st
+from mysql.connector import Error
+from database.exportacao import exportar_tabela, TABELAS, FORMATOS
+from database.metricas import operacao
+
+TIPOS_MIME = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+@operacao
+def exportar_dados(conn):
+    st.header("Exportar Dados")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        tabela = st.selectbox("Tabela:", TABELAS)
+    with col2:
+        formato = st.selectbox("Formato:", FORMATOS)
+
+    if st.button("Gerar arquivo", type="primary"):
+        # O arquivo é gerado em disco, lote a lote, e só então oferecido para download
+        anterior = st.session_state.pop("exportacao", None)
+        if anterior and os.path.exists(anterior["caminho"]):
+            os.remove(anterior["caminho"])
+        try:
+            with st.spinner(f"Exportando {tabela}..."):
+                with tempfile.NamedTemporaryFile(suffix=f".{formato}", delete=False) as destino:
+                    linhas = exportar_tabela(conn, tabela, destino, formato)
+            st.session_state.exportacao = {
+                "caminho": destino.name,
+                "nome": f"{tabela}.{formato}",
+                "formato": formato,
+                "linhas": linhas
+            }
+        except (Error, RuntimeError) as e:
+            os.remove(destino.name)
+            st.error(f"Erro ao exportar dados: {str(e)}")
+
+    exportacao = st.session_state.get("exportacao")
+    if exportacao and os.path.exists(exportacao["caminho"]):
+        st.success(f"{exportacao['linhas']} registros exportados para {exportacao['nome']}.")
+        with open(exportacao["caminho"], "rb") as arquivo:
+            st.download_button(
+                "Baixar arquivo",
+                arquivo,
+                file_name=exportacao["nome"],
+                mime=TIPOS_MIME[exportacao["formato"]]
+            )
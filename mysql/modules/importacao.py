@@ -0,0 +1,52 @@
+import io
+import streamlit as st
+import pandas as pd
+from mysql.connector import Error
+from database.importacao import importar_estatisticas, TAMANHO_LOTE
+from database.metricas import operacao
+
+@operacao
+def importar_arquivo(conn):
+    st.header("Importar Estatísticas")
+    st.caption(
+        "CSV com cabeçalho ou JSONL (um objeto por linha). Jogo: `jogo_id` ou `data`, `equipe1`, `equipe2` (e `hora`, se a dupla jogar mais de uma vez no dia). "
+        "Jogador: `jogador_id` ou `equipe` com `numero` ou `jogador` (nome). Valores: `gols`, `cartoes`. "
+        "Linhas repetidas substituem os valores já cadastrados."
+    )
+
+    arquivo = st.file_uploader("Arquivo:", type=["csv", "jsonl"])
+    tamanho_lote = st.number_input("Linhas por lote:", min_value=100, max_value=20000, value=TAMANHO_LOTE, step=100)
+
+    if arquivo and st.button("Importar", type="primary"):
+        formato = "jsonl" if arquivo.name.lower().endswith(".jsonl") else "csv"
+        barra = st.progress(0.0, text="Importando...")
+
+        def progresso(resumo):
+            lido = min(arquivo.tell() / arquivo.size, 1.0) if arquivo.size else 1.0
+            barra.progress(
+                lido,
+                text=f"{resumo['lidas']} linhas lidas • {resumo['gravadas']} gravadas • {len(resumo['erros'])} erros"
+            )
+
+        try:
+            texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+            resumo = importar_estatisticas(conn, texto, formato, int(tamanho_lote), progresso)
+        except (Error, UnicodeDecodeError) as e:
+            st.error(f"Erro ao importar arquivo: {str(e)}")
+            return
+        barra.progress(1.0, text="Importação concluída")
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Linhas lidas", resumo["lidas"])
+        col2.metric("Estatísticas gravadas", resumo["gravadas"])
+        col3.metric("Tempo (s)", round(resumo["segundos"], 2))
+
+        if resumo["erros"]:
+            st.warning(f"{len(resumo['erros'])} linha(s) não foram importadas.")
+            st.dataframe(
+                pd.DataFrame(resumo["erros"], columns=["Linha", "Erro"]),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.success("Todas as linhas foram importadas com sucesso!")
@@ -1,15 +1,24 @@
 import streamlit as st
 import mysql.connector
 import pandas as pd
+from database.agregados import atualizar_agregados, jogos_do_jogador, TABELAS_AGREGADAS
+from database.cache import consultar, invalidar
+from database.restricoes import restricao_violada
+from database.suspensoes import jogadores_suspensos
+from database.metricas import operacao
 
-def validate_player_number(conn, numero, nome_equipe):
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id FROM jogador WHERE numero = %s AND nome_equipe = %s",
-        (numero, nome_equipe)
-    )
-    return not cursor.fetchone()
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+
+def mensagem_restricao(erro, numero):
+    """Mensagem para as violações do índice único (equipe, número) e da chave estrangeira da equipe"""
+    restricao = restricao_violada(erro)
+    if restricao == "uq_jogador_equipe_numero":
+        return f"O número {numero} já está em uso nesta equipe."
+    if restricao == "nome_equipe":
+        return "A equipe selecionada não existe mais no banco de dados."
+    return None
 
+@operacao
 def cadastrar_jogador(conn):
     st.header("Cadastrar Jogador")
     
@@ -17,8 +26,7 @@ def cadastrar_jogador(conn):
         nome = st.text_input("Nome:").strip()
         
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT nome FROM equipe ORDER BY nome")
-        equipes = cursor.fetchall()
+        equipes = consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))
         equipe = st.selectbox(
             "Equipe:",
             ["Nenhuma"] + [e['nome'] for e in equipes]
@@ -34,29 +42,28 @@ def cadastrar_jogador(conn):
                     st.error("Nome é obrigatório")
                     return
                     
-                if equipe != "Nenhuma" and not validate_player_number(conn, numero, equipe):
-                    st.error(f"O número {numero} já está em uso nesta equipe.")
-                    return
-                    
                 cursor.execute(
                     "INSERT INTO jogador (nome, numero, nome_equipe) VALUES (%s, %s, %s)",
                     (nome, numero, equipe if equipe != "Nenhuma" else None)
                 )
                 conn.commit()
+                invalidar("jogador")
                 st.success("Jogador cadastrado com sucesso!")
                 st.rerun()
             except mysql.connector.Error as e:
                 conn.rollback()
-                st.error(f"Erro ao cadastrar jogador: {str(e)}")
+                st.error(mensagem_restricao(e, numero) or f"Erro ao cadastrar jogador: {str(e)}")
             finally:
                 cursor.close()
             
+@operacao
 def deletar_jogador(conn):
     st.header("Deletar Jogador")
 
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, nome, numero, nome_equipe FROM jogador")
-    jogadores = cursor.fetchall()
+    jogadores = consultar(
+        conn, "SELECT id, nome, numero, nome_equipe FROM jogador ORDER BY nome, id", tabelas=("jogador",)
+    )
 
     if not jogadores:
         st.info("Nenhum jogador cadastrado ainda.")
@@ -76,8 +83,11 @@ def deletar_jogador(conn):
             jogador_id_str = jogador_selecionado.split("(ID: ")[1].strip(")")
             jogador_id = int(jogador_id_str) 
 
-            cursor.execute("DELETE FROM jogador WHERE id = %s", (jogador_id,))
+            conn.start_transaction()
+            with atualizar_agregados(conn, jogos_do_jogador(conn, jogador_id)):
+                cursor.execute("DELETE FROM jogador WHERE id = %s", (jogador_id,))
             conn.commit()
+            invalidar("jogador", "estatistica", *TABELAS_AGREGADAS)
             st.success("Jogador e estatísticas relacionadas deletados com sucesso!")
             st.rerun()
         except mysql.connector.Error as e:
@@ -86,69 +96,126 @@ def deletar_jogador(conn):
         finally:
             cursor.close()
 
+def buscar_pagina_jogadores(conn, limite, apos=None, equipe=None, nome=None):
+    """Busca uma página de jogadores ordenada por (nome, id) a partir da chave `apos` (keyset).
+
+    Lê limite + 1 linhas pelo índice idx_jogador_nome para saber se existe próxima página,
+    sem OFFSET: o custo é o mesmo na primeira e na última página. Os totais vêm prontos
+    de jogador_totais.
+    """
+    filtros = []
+    params = []
+    if equipe:
+        filtros.append("j.nome_equipe = %s")
+        params.append(equipe)
+    if nome:
+        filtros.append("j.nome LIKE %s")
+        params.append(f"%{nome}%")
+    if apos:
+        filtros.append("(j.nome, j.id) > (%s, %s)")
+        params.extend(apos)
+
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    jogadores = consultar(conn, f"""
+        SELECT j.id, j.nome, j.numero, j.nome_equipe,
+               COALESCE(t.jogos, 0) AS total_jogos,
+               COALESCE(t.gols, 0) AS total_gols,
+               COALESCE(t.cartoes, 0) AS total_cartoes,
+               COALESCE(t.cartoes_acumulados, 0) AS cartoes_acumulados
+        FROM jogador j
+        LEFT JOIN jogador_totais t ON t.jogador_id = j.id
+        {where}
+        ORDER BY j.nome, j.id
+        LIMIT %s
+    """, params + [limite + 1], tabelas=("jogador", "jogador_totais"))
+    return jogadores[:limite], len(jogadores) > limite
+
+@operacao
 def visualizar_jogador(conn):
     st.subheader("👟 Jogadores Cadastrados")
     
-    cursor = conn.cursor(dictionary=True)
-    
     col1, col2 = st.columns(2)
     with col1:
-        cursor.execute("SELECT nome FROM equipe ORDER BY nome")
-        equipes = cursor.fetchall()
+        equipes = consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))
         equipe_filtro = st.selectbox(
             "Filtrar por equipe:",
             ["Todas"] + [e['nome'] for e in equipes]
         )
     with col2:
-        nome_filtro = st.text_input("Filtrar por nome:")
+        nome_filtro = st.text_input("Filtrar por nome:").strip()
 
-    query = "SELECT id, nome, numero, nome_equipe FROM jogador"
-    params = []
-    
-    if equipe_filtro != "Todas":
-        query += " WHERE nome_equipe = %s"
-        params.append(equipe_filtro)
-    
-    if nome_filtro:
-        if "WHERE" in query:
-            query += " AND nome LIKE %s"
-        else:
-            query += " WHERE nome LIKE %s"
-        params.append(f"%{nome_filtro}%")
+    col1, col2 = st.columns(2)
+    with col1:
+        limite = st.selectbox("Jogadores por página:", TAMANHOS_PAGINA, index=1, key="view_players_limite")
+    with col2:
+        modo = st.radio("Exibição:", ["Tabela", "Cartões"], horizontal=True, key="view_players_modo")
 
-    query += " ORDER BY nome"
-    cursor.execute(query, params)
-    jogadores = cursor.fetchall()
+    # Cada página começa depois da última chave (nome, id) da anterior; filtros novos voltam ao início
+    estado = (equipe_filtro, nome_filtro, limite)
+    if st.session_state.get("view_players_filtros") != estado:
+        st.session_state.view_players_filtros = estado
+        st.session_state.view_players_chaves = [None]
+    chaves = st.session_state.view_players_chaves
+
+    jogadores, tem_proxima = buscar_pagina_jogadores(
+        conn, limite, chaves[-1],
+        equipe=equipe_filtro if equipe_filtro != "Todas" else None,
+        nome=nome_filtro
+    )
 
     if jogadores:
-        cols = st.columns(3)
-        for i, jogador in enumerate(jogadores):
-            with cols[i % 3]:
-                with st.container(border=True):
-                    st.markdown(f"**{jogador['nome']}**")
-                    st.markdown(f"📌 Número: {jogador['numero']}")
-                    st.markdown(f"🏆 Equipe: {jogador['nome_equipe'] if jogador['nome_equipe'] else 'Nenhuma'}")
-                    
-                    cursor.execute(
-                        "SELECT SUM(gols) as total_gols, SUM(cartoes) as total_cartoes FROM estatistica WHERE jogador_id = %s",
-                        (jogador['id'],)
-                    )
-                    stats = cursor.fetchone()
-                    total_gols = stats['total_gols'] or 0
-                    total_cartoes = stats['total_cartoes'] or 0
-                    
-                    st.markdown(f"⚽ Gols totais: {total_gols}")
-                    st.markdown(f"🟨 Cartões totais: {total_cartoes}")
+        suspensos = jogadores_suspensos(conn)
+        if modo == "Tabela":
+            st.dataframe(
+                pd.DataFrame([{
+                    "Nome": j['nome'],
+                    "Número": j['numero'],
+                    "Equipe": j['nome_equipe'] or "Nenhuma",
+                    "Jogos": j['total_jogos'],
+                    "Gols": j['total_gols'],
+                    "Cartões": j['total_cartoes'],
+                    "Pendentes": j['cartoes_acumulados'],
+                    "Situação": "🟥 Suspenso" if j['id'] in suspensos else "✅ Liberado"
+                } for j in jogadores]),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            cols = st.columns(3)
+            for i, jogador in enumerate(jogadores):
+                with cols[i % 3]:
+                    with st.container(border=True):
+                        st.markdown(f"**{jogador['nome']}**")
+                        if jogador['id'] in suspensos:
+                            st.markdown(f"🟥 **Suspenso** pelos cartões do jogo de {suspensos[jogador['id']].strftime('%d/%m/%Y')}")
+                        st.markdown(f"📌 Número: {jogador['numero']}")
+                        st.markdown(f"🏆 Equipe: {jogador['nome_equipe'] if jogador['nome_equipe'] else 'Nenhuma'}")
+                        st.markdown(f"🏟️ Jogos: {jogador['total_jogos']}")
+                        st.markdown(f"⚽ Gols totais: {jogador['total_gols']}")
+                        st.markdown(f"🟨 Cartões totais: {jogador['total_cartoes']} ({jogador['cartoes_acumulados']} pendentes)")
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("◀ Anterior", disabled=len(chaves) == 1, key="view_players_anterior"):
+                chaves.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Página {len(chaves)}")
+        with col3:
+            if st.button("Próxima ▶", disabled=not tem_proxima, key="view_players_proxima"):
+                chaves.append((jogadores[-1]['nome'], jogadores[-1]['id']))
+                st.rerun()
     else:
         st.info("Nenhum jogador encontrado com os filtros selecionados.")
-    cursor.close()
         
+@operacao
 def editar_jogador(conn):
     st.header("Editar Jogador")
 
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, nome, numero, nome_equipe FROM jogador")
-    jogadores = cursor.fetchall()
+    jogadores = consultar(
+        conn, "SELECT id, nome, numero, nome_equipe FROM jogador ORDER BY nome, id", tabelas=("jogador",)
+    )
 
     if not jogadores:
         st.info("Nenhum jogador cadastrado ainda.")
@@ -172,8 +239,7 @@ def editar_jogador(conn):
     nome = st.text_input("Nome do Jogador:", value=jogador['nome'] or "")
     numero = st.number_input("Número do Jogador:", min_value=1, value=jogador['numero'] or 1, step=1)
 
-    cursor.execute("SELECT nome FROM equipe")
-    equipes = [e['nome'] for e in cursor.fetchall()]
+    equipes = [e['nome'] for e in consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))]
     lista_equipes = ["Nenhuma"] + equipes
     
     equipe_index = lista_equipes.index(jogador['nome_equipe']) if jogador['nome_equipe'] in lista_equipes else 0
@@ -183,21 +249,21 @@ def editar_jogador(conn):
 
     if st.button("Salvar Alterações"):
         try:
-            if nome_equipe:
-                cursor.execute("SELECT 1 FROM equipe WHERE nome = %s LIMIT 1", (nome_equipe,))
-                if not cursor.fetchone():
-                    st.error("A equipe selecionada não existe mais no banco de dados.")
-                    return
+            # Trocar de equipe muda a atribuição dos gols nos jogos já registrados
+            jogos_afetados = jogos_do_jogador(conn, jogador_id) if nome_equipe != jogador['nome_equipe'] else []
 
-            cursor.execute(
-                "UPDATE jogador SET nome = %s, numero = %s, nome_equipe = %s WHERE id = %s",
-                (nome, numero, nome_equipe, jogador_id)
-            )
+            conn.start_transaction()
+            with atualizar_agregados(conn, jogos_afetados):
+                cursor.execute(
+                    "UPDATE jogador SET nome = %s, numero = %s, nome_equipe = %s WHERE id = %s",
+                    (nome, numero, nome_equipe, jogador_id)
+                )
             conn.commit()
+            invalidar("jogador", *TABELAS_AGREGADAS)
             st.success("Jogador atualizado com sucesso!")
             st.rerun()
         except mysql.connector.Error as e:
             conn.rollback()
-            st.error(f"Erro ao atualizar jogador: {str(e)}")
+            st.error(mensagem_restricao(e, numero) or f"Erro ao atualizar jogador: {str(e)}")
         finally:
             cursor.close()
\ No newline at end of file
@@ -2,24 +2,21 @@ import streamlit as st
 import datetime
 import mysql.connector
 import pandas as pd
-
-def validate_game(conn, data, hora, equipe1, equipe2):
-    if equipe1 == equipe2:
-        return False, "As equipes devem ser diferentes"
-        
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id FROM jogo 
-        WHERE ((equipe1_id = %s AND equipe2_id = %s) OR (equipe1_id = %s AND equipe2_id = %s))
-        AND data = %s AND hora = %s
-        LIMIT 1
-    """, (equipe1, equipe2, equipe2, equipe1, data, hora))
-    
-    if cursor.fetchone():
-        return False, "Jogo já cadastrado"
-        
-    return True, ""
-
+from database.agregados import atualizar_agregados, TABELAS_AGREGADAS
+from database.cache import consultar, invalidar
+from database.restricoes import restricao_violada
+from database.metricas import operacao
+
+def mensagem_restricao(erro):
+    """Mensagem para as violações do índice único do confronto e das chaves estrangeiras das equipes"""
+    restricao = restricao_violada(erro)
+    if restricao == "uq_jogo_confronto":
+        return "Jogo já cadastrado"
+    if restricao in ("equipe1_id", "equipe2_id"):
+        return "A equipe selecionada não existe mais no banco de dados."
+    return None
+
+@operacao
 def cadastrar_jogo(conn):
     st.header("Cadastrar Jogo")
     
@@ -32,9 +29,7 @@ def cadastrar_jogo(conn):
             
         local = st.text_input("Local:").strip()
         
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT nome FROM equipe ORDER BY nome")
-        equipes = [e['nome'] for e in cursor.fetchall()]
+        equipes = [e['nome'] for e in consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))]
         equipe1 = st.selectbox("Equipe 1:", equipes)
         equipe2 = st.selectbox("Equipe 2:", equipes)
         
@@ -42,9 +37,8 @@ def cadastrar_jogo(conn):
         if submitted:
             cursor = conn.cursor()
             try:
-                valid, msg = validate_game(conn, data, hora, equipe1, equipe2)
-                if not valid:
-                    st.error(msg)
+                if equipe1 == equipe2:
+                    st.error("As equipes devem ser diferentes")
                     return
                     
                 cursor.execute(
@@ -52,20 +46,23 @@ def cadastrar_jogo(conn):
                     (data, hora, local, equipe1, equipe2)
                 )
                 conn.commit()
+                invalidar("jogo")
                 st.success("Jogo cadastrado com sucesso!")
                 st.rerun()
             except mysql.connector.Error as e:
                 conn.rollback()
-                st.error(f"Erro ao cadastrar jogo: {str(e)}")
+                st.error(mensagem_restricao(e) or f"Erro ao cadastrar jogo: {str(e)}")
             finally:
                 cursor.close()
 
+@operacao
 def deletar_jogo(conn):
     st.header("Deletar Jogo")
 
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, data, hora, local, equipe1_id, equipe2_id FROM jogo")
-    jogos = cursor.fetchall()
+    jogos = consultar(
+        conn, "SELECT id, data, hora, local, equipe1_id, equipe2_id FROM jogo ORDER BY data DESC, hora DESC", tabelas=("jogo",)
+    )
 
     if not jogos:
         st.info("Nenhum jogo cadastrado ainda.")
@@ -83,8 +80,11 @@ def deletar_jogo(conn):
             jogo_id_str = jogo_selecionado.split("(ID: ")[1].strip(")")
             jogo_id = int(jogo_id_str)
 
-            cursor.execute("DELETE FROM jogo WHERE id = %s", (jogo_id,))
+            conn.start_transaction()
+            with atualizar_agregados(conn, [jogo_id]):
+                cursor.execute("DELETE FROM jogo WHERE id = %s", (jogo_id,))
             conn.commit()
+            invalidar("jogo", "estatistica", *TABELAS_AGREGADAS)
             st.success("Jogo e suas estatísticas associadas deletados com sucesso!")
             st.rerun()
         except mysql.connector.Error as e:
@@ -93,31 +93,28 @@ def deletar_jogo(conn):
         finally:
             cursor.close()
 
+@operacao
 def mostrar_estatisticas_jogo(conn, jogo_id):
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM jogo WHERE id = %s", (jogo_id,))
-    jogo = cursor.fetchone()
+    jogos = consultar(conn, """
+        SELECT id, data, hora, local, equipe1_id, equipe2_id,
+               gols_equipe1, gols_equipe2, cartoes_equipe1, cartoes_equipe2
+        FROM jogo WHERE id = %s
+    """, (jogo_id,), tabelas=("jogo",))
     
-    if not jogo:
+    if not jogos:
         st.error("Jogo não encontrado.")
         return
+    jogo = jogos[0]
+    # Placar mantido pelas escritas de estatística (atualizar_agregados); NULL antes da primeira
+    gols_equipe1 = jogo['gols_equipe1'] or 0
+    gols_equipe2 = jogo['gols_equipe2'] or 0
 
-    cursor.execute("""
+    estatisticas = consultar(conn, """
         SELECT e.*, j.nome as jogador_nome, j.nome_equipe, j.numero
         FROM estatistica e
         JOIN jogador j ON e.jogador_id = j.id
         WHERE e.jogo_id = %s
-    """, (jogo_id,))
-    estatisticas = cursor.fetchall()
-    
-    gols_equipe1 = 0
-    gols_equipe2 = 0
-    
-    for estat in estatisticas:
-        if estat['nome_equipe'] == jogo['equipe1_id']:
-            gols_equipe1 += estat['gols']
-        elif estat['nome_equipe'] == jogo['equipe2_id']:
-            gols_equipe2 += estat['gols']
+    """, (jogo_id,), tabelas=("estatistica", "jogador"))
 
     st.markdown(f"""
     <div style="
@@ -167,16 +164,13 @@ def mostrar_estatisticas_jogo(conn, jogo_id):
             
         with col2:
             st.subheader("Cartões por Equipe")
-            cartoes_equipe1 = sum(e['cartoes'] for e in estatisticas if e['nome_equipe'] == jogo['equipe1_id'])
-            cartoes_equipe2 = sum(e['cartoes'] for e in estatisticas if e['nome_equipe'] == jogo['equipe2_id'])
             df_cartoes = pd.DataFrame({
                 "Equipe": [jogo['equipe1_id'], jogo['equipe2_id']],
-                "Cartões": [cartoes_equipe1, cartoes_equipe2]
+                "Cartões": [jogo['cartoes_equipe1'] or 0, jogo['cartoes_equipe2'] or 0]
             })
             st.bar_chart(df_cartoes.set_index("Equipe"))
     else:
         st.info("Nenhuma estatística registrada para este jogo.")
-    cursor.close()
     
 def formatar_hora(hora_db):
     """Formata a hora vinda do banco de dados para exibição"""
@@ -192,6 +186,7 @@ def formatar_hora(hora_db):
         return hora_db.strftime('%H:%M')
     return str(hora_db)
 
+@operacao
 def visualizar_jogo(conn):
     st.subheader("📅 Jogos Cadastrados")
 
@@ -217,15 +212,12 @@ def visualizar_jogo(conn):
             )
 
         with col3:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT nome FROM equipe ORDER BY nome")
-            equipes = [e['nome'] for e in cursor.fetchall()]
+            equipes = [e['nome'] for e in consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))]
             equipe_filtro = st.selectbox(
                 "Filtrar por equipe",
                 ["Todas"] + equipes,
                 key="equipe_filtro"
             )
-            cursor.close()
 
     query = "SELECT * FROM jogo WHERE data BETWEEN %s AND %s"
     params = [data_inicio, data_fim]
@@ -236,9 +228,7 @@ def visualizar_jogo(conn):
 
     query += " ORDER BY data DESC, hora DESC"
     
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(query, params)
-    jogos = cursor.fetchall()
+    jogos = consultar(conn, query, params, tabelas=("jogo",))
 
     st.markdown(f"**Total de jogos encontrados:** {len(jogos)}")
     st.divider()
@@ -262,7 +252,10 @@ def visualizar_jogo(conn):
             info_col, action_col = st.columns([3, 1])
 
             with info_col:
-                st.markdown(f"#### {jogo['equipe1_id']} vs {jogo['equipe2_id']}")
+                if jogo['gols_equipe1'] is None:
+                    st.markdown(f"#### {jogo['equipe1_id']} vs {jogo['equipe2_id']}")
+                else:
+                    st.markdown(f"#### {jogo['equipe1_id']} {jogo['gols_equipe1']} × {jogo['gols_equipe2']} {jogo['equipe2_id']}")
                 st.markdown(f"📅 **Data:** {jogo['data'].strftime('%d/%m/%Y')}")
                 st.markdown(f"🕒 **Hora:** {formatar_hora(jogo['hora'])}")
                 st.markdown(f"📍 **Local:** {jogo['local']}")
@@ -271,15 +264,16 @@ def visualizar_jogo(conn):
                 if st.button("Ver Estatísticas", key=f"stats_{jogo['id']}"):
                     st.session_state.jogo_selecionado = jogo['id']
                     st.rerun()
-    cursor.close()
     
+@operacao
 def editar_jogo(conn):
     st.header("Editar Jogo")
     st.warning("Editar um jogo irá deletar todas as estatísticas relacionadas ao mesmo")
 
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, data, hora, local, equipe1_id, equipe2_id FROM jogo")
-    jogos = cursor.fetchall()
+    jogos = consultar(
+        conn, "SELECT id, data, hora, local, equipe1_id, equipe2_id FROM jogo ORDER BY data DESC, hora DESC", tabelas=("jogo",)
+    )
 
     if not jogos:
         st.info("Nenhum jogo cadastrado ainda.")
@@ -322,8 +316,7 @@ def editar_jogo(conn):
     hora_jogo = st.time_input("Hora do Jogo:", value=hora_value)
     local_jogo = st.text_input("Local do Jogo:", value=jogo['local'])
 
-    cursor.execute("SELECT nome FROM equipe")
-    nomes_equipes = [e['nome'] for e in cursor.fetchall()]
+    nomes_equipes = [e['nome'] for e in consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))]
 
     equipe1_index = nomes_equipes.index(jogo['equipe1_id']) if jogo['equipe1_id'] in nomes_equipes else 0
     equipe2_index = nomes_equipes.index(jogo['equipe2_id']) if jogo['equipe2_id'] in nomes_equipes else 0
@@ -337,19 +330,22 @@ def editar_jogo(conn):
 
     if st.button("Salvar Alterações"):
         try:
-            cursor.execute("DELETE FROM estatistica WHERE jogo_id = %s", (jogo_id,))
-            
-            cursor.execute("""
-                UPDATE jogo 
-                SET data = %s, hora = %s, local = %s, equipe1_id = %s, equipe2_id = %s
-                WHERE id = %s
-            """, (data_jogo, hora_jogo, local_jogo, equipe1, equipe2, jogo_id))
+            conn.start_transaction()
+            with atualizar_agregados(conn, [jogo_id]):
+                cursor.execute("DELETE FROM estatistica WHERE jogo_id = %s", (jogo_id,))
+                
+                cursor.execute("""
+                    UPDATE jogo 
+                    SET data = %s, hora = %s, local = %s, equipe1_id = %s, equipe2_id = %s
+                    WHERE id = %s
+                """, (data_jogo, hora_jogo, local_jogo, equipe1, equipe2, jogo_id))
             
             conn.commit()
+            invalidar("jogo", "estatistica", *TABELAS_AGREGADAS)
             st.success("Jogo atualizado e estatísticas relacionadas deletadas com sucesso!")
             st.rerun()
         except mysql.connector.Error as e:
             conn.rollback()
-            st.error(f"Erro ao atualizar jogo: {str(e)}")
+            st.error(mensagem_restricao(e) or f"Erro ao atualizar jogo: {str(e)}")
         finally:
             cursor.close()
\ No newline at end of file
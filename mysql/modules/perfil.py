@@ -0,0 +1,42 @@
+import streamlit as st
+import pandas as pd
+from database.perfil import suspeitas_n_mais_1
+from database.config import PERFIL_LIMITE_N_MAIS_1
+
+def mostrar_perfil(registros, relatorio_cpu=None):
+    st.divider()
+    st.subheader("🔬 Perfil da renderização")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Consultas ao banco", len(registros))
+    col2.metric("Tempo no banco (ms)", round(sum(r["ms"] for r in registros), 2))
+    col3.metric("Linhas lidas", sum(r["linhas"] or 0 for r in registros))
+
+    for suspeita in suspeitas_n_mais_1(registros):
+        st.warning(
+            f"Possível N+1: executada {suspeita['execucoes']} vezes com {suspeita['parametros_distintos']} "
+            f"parâmetros diferentes ({suspeita['ms']:.1f} ms no total):\n\n`{suspeita['comando']}` `{suspeita['parametros']}`"
+        )
+
+    if registros:
+        st.dataframe(
+            pd.DataFrame([{
+                "#": ordem,
+                "Comando": r["comando"],
+                "Parâmetros": r["parametros"],
+                "ms": round(r["ms"], 2),
+                "Linhas": r["linhas"]
+            } for ordem, r in enumerate(registros, start=1)]),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("Nenhuma consulta foi ao banco nesta renderização.")
+    st.caption(
+        f"Comandos repetidos com mais de {PERFIL_LIMITE_N_MAIS_1} parâmetros diferentes são apontados como N+1. "
+        "Acrescente ?perfil=cprofile (ou ?perfil=pyinstrument) à URL para perfilar também o tempo de CPU."
+    )
+
+    if relatorio_cpu:
+        with st.expander("⏱️ Perfil de CPU da renderização"):
+            st.code(relatorio_cpu, language="text")
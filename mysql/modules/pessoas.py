@@ -1,6 +1,10 @@
 import streamlit as st
 import mysql.connector
+from database.cache import consultar, invalidar
+from database.restricoes import restricao_violada
+from database.metricas import operacao
 
+@operacao
 def cadastrar_pessoa(conn):
     with st.form("user_form"):
         login_pessoa = st.text_input("Login do Usuario:")
@@ -15,31 +19,30 @@ def cadastrar_pessoa(conn):
                     st.error("Login e senha são obrigatórios")
                     return
                     
-                cursor.execute("SELECT login FROM pessoas WHERE login = %s", (login_pessoa,))
-                if cursor.fetchone():
-                    st.error(f"Já existe um usuário com o login {login_pessoa}.")
-                    return
-                    
                 cursor.execute(
                     "INSERT INTO pessoas (login, senha, tipo) VALUES (%s, %s, %s)",
                     (login_pessoa, senha_pessoa, "administrador" if tipo_pessoa == "Administrador" else "usuario")
                 )
                 conn.commit()
+                invalidar("pessoas")
                 st.success(f"Usuário '{login_pessoa}' cadastrado com sucesso!")
                 st.rerun()
             except mysql.connector.Error as e:
                 conn.rollback()
-                st.error(f"Erro ao cadastrar usuário: {str(e)}")
+                if restricao_violada(e) == "PRIMARY":
+                    st.error(f"Já existe um usuário com o login {login_pessoa}.")
+                else:
+                    st.error(f"Erro ao cadastrar usuário: {str(e)}")
             finally:
                 cursor.close()
 
+@operacao
 def deletar_pessoa(conn):
     st.subheader("Deletar Usuario")
     
     with st.form("delete_user_form"):
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT login FROM pessoas")
-        pessoas = cursor.fetchall()
+        pessoas = consultar(conn, "SELECT login FROM pessoas ORDER BY login", tabelas=("pessoas",))
         
         if not pessoas:
             st.info("Não há usuários cadastrados")
@@ -55,6 +58,7 @@ def deletar_pessoa(conn):
                 pessoa_login_to_delete = pessoa_selecionada.split(" (Login: ")[1].strip(")")
                 cursor.execute("DELETE FROM pessoas WHERE login = %s", (pessoa_login_to_delete,))
                 conn.commit()
+                invalidar("pessoas")
                 st.success("Usuário deletado com sucesso!")
                 st.rerun()
             except mysql.connector.Error as e:
@@ -0,0 +1,45 @@
+import streamlit as st
+import pandas as pd
+from database.cache import consultar
+from database.rankings import RANKINGS, buscar_ranking
+from database.metricas import operacao
+
+@operacao
+def visualizar_rankings(conn):
+    st.subheader("🏅 Rankings")
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        ranking = st.radio("Ranking", list(RANKINGS), horizontal=True, key="ranking_tipo")
+    with col2:
+        equipes = [e['nome'] for e in consultar(conn, "SELECT nome FROM equipe ORDER BY nome", tabelas=("equipe",))]
+        equipe = st.selectbox("Equipe", ["Todas"] + equipes, key="ranking_equipe")
+    with col3:
+        limite = st.number_input("Posições", min_value=5, max_value=100, value=10, step=5, key="ranking_limite")
+
+    coluna = RANKINGS[ranking]
+    linhas = buscar_ranking(conn, coluna, int(limite), None if equipe == "Todas" else equipe)
+
+    if not linhas:
+        st.info("Nenhum jogador pontuou neste ranking ainda.")
+        return
+
+    dados = [{
+        "Posição": posicao,
+        "Jogador": linha['nome'],
+        "Equipe": linha['nome_equipe'] or "Nenhuma",
+        "Número": linha['numero'],
+        "Jogos": linha['jogos'],
+        "Gols": linha['gols'],
+        "Cartões": linha['cartoes']
+    } for posicao, linha in enumerate(linhas, start=1)]
+
+    st.dataframe(
+        pd.DataFrame(dados),
+        use_container_width=True,
+        column_config={
+            "Gols": st.column_config.NumberColumn(format="%d ⚽"),
+            "Cartões": st.column_config.NumberColumn(format="%d 🟨")
+        },
+        hide_index=True
+    )
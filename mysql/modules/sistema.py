@@ -0,0 +1,66 @@
+import streamlit as st
+import pandas as pd
+from database.cache import estatisticas_cache, limpar
+from database.connection import estatisticas_pool
+from database.metricas import operacao
+
+@operacao
+def visualizar_sistema():
+    st.header("⚙️ Sistema")
+
+    st.subheader("Pool de conexões do MySQL")
+    pool = estatisticas_pool()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Conexões em uso", f"{pool['conexoes_em_uso']} / {pool['pool_size']}")
+    col2.metric("Na fila", pool["na_fila"])
+    col3.metric("Checkouts", pool["checkouts"])
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Disjuntor", pool["disjuntor"])
+    col2.metric("Checkouts recusados", pool["disjuntor_recusas"])
+    col3.metric("Sem conexão livre", pool["esgotamentos"])
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Esperas", pool["esperas"])
+    col2.metric("Espera média (ms)", round(pool["espera_media_ms"], 2))
+    col3.metric("Espera máxima (ms)", round(pool["espera_maxima_ms"], 2))
+
+    st.caption(
+        f"Validações por ociosidade: {pool['validacoes']} • reconexões: {pool['reconexoes']} • "
+        f"aberturas do disjuntor: {pool['disjuntor_aberturas']} • "
+        "latência de checkout:"
+    )
+    st.dataframe(pd.DataFrame([pool["latencia_checkout"]]), use_container_width=True, hide_index=True)
+
+    st.subheader("Cache de consultas")
+    cache = estatisticas_cache()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Acertos", cache["acertos"])
+    col2.metric("Falhas", cache["falhas"])
+    col3.metric("Taxa de acerto", f"{cache['taxa_acerto']:.1%}")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Entradas", f"{cache['entradas']} / {cache['max_entradas']}")
+    col2.metric("Invalidadas", cache["invalidadas"])
+    col3.metric("Versão global", cache["versao_global"])
+
+    st.metric("Cópias desatualizadas servidas", cache["desatualizadas"])
+
+    st.caption(
+        f"Backend: {cache['backend']} • TTL de {cache['ttl_segundos']:.0f}s • acertos e falhas contados "
+        "neste processo • versão atual de cada tabela alterada:"
+    )
+    if cache["versoes"]:
+        st.dataframe(
+            pd.DataFrame(
+                [{"Tabela": tabela, "Versão": versao} for tabela, versao in sorted(cache["versoes"].items())]
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    if st.button("Limpar cache"):
+        limpar()
+        st.rerun()
@@ -1,6 +1,11 @@
+import argparse
 import datetime
 import random
+import time
 from database.connection import get_db
+from database import agregados
+from database.cache import invalidar
+from database.init_db import TABELAS
 from mysql.connector import Error
 
 NOMES_JOGADORES = [
@@ -34,178 +39,232 @@ SOBRENOMES_JOGADORES = [
     "Andrade", "Tavares", "Caldeira", "Maciel", "Aguiar", "Viana", "Fogaça", "Vasconcelos", "Ximenes", "Zimmermann"
 ]
 
+
+EQUIPES = [
+    "Palmeiras", "Grêmio", "Atlético - MG", "Flamengo", "Botafogo", "Bragantino", "Fluminense",
+    "Athletico - PR", "Internacional", "Fortaleza", "São Paulo", "Cuiabá", "Corinthians", "Cruzeiro",
+    "Vasco", "Bahia", "Santos", "Goiás", "Coritiba", "América - MG"
+]
+
+LOCAIS = ["Maracanã", "Morumbi", "Mineirão", "Beira-Rio", "Fonte Nova", "Arena Corinthians", "Allianz Parque"]
+
+def _relatar(tabela, linhas, inicio):
+    """Imprime a vazão de inserção de uma tabela"""
+    duracao = time.perf_counter() - inicio
+    taxa = linhas / duracao if duracao > 0 else float("inf")
+    print(f"  -> {tabela}: {linhas} linhas em {duracao:.2f}s ({taxa:,.0f} linhas/s)")
+
+def _inserir_em_lotes(conn, sql, linhas, tamanho_lote):
+    """Executa um INSERT multi-linha (executemany) a cada lote; aceita um gerador de linhas"""
+    cursor = conn.cursor()
+    total = 0
+    lote = []
+    try:
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) >= tamanho_lote:
+                cursor.executemany(sql, lote)
+                conn.commit()
+                total += len(lote)
+                lote = []
+        if lote:
+            cursor.executemany(sql, lote)
+            conn.commit()
+            total += len(lote)
+    finally:
+        cursor.close()
+    return total
+
+def nomes_equipes(quantidade):
+    """Nomes dos clubes da Série A; acima de 20 equipes, gera nomes numerados"""
+    return [
+        EQUIPES[i] if i < len(EQUIPES) else f"{EQUIPES[i % len(EQUIPES)]} {i // len(EQUIPES) + 1}"
+        for i in range(quantidade)
+    ]
+
+def gerar_rodadas(equipes):
+    """Tabela de turno e returno pelo método do círculo: cada equipe joga uma vez por rodada"""
+    equipes = list(equipes)
+    if len(equipes) % 2:
+        equipes.append(None)
+    n = len(equipes)
+
+    turno = []
+    for r in range(n - 1):
+        rodada = []
+        for i in range(n // 2):
+            casa, fora = equipes[i], equipes[n - 1 - i]
+            if casa and fora:
+                rodada.append((casa, fora) if r % 2 == 0 else (fora, casa))
+        turno.append(rodada)
+        equipes = [equipes[0], equipes[-1]] + equipes[1:-1]
+
+    returno = [[(fora, casa) for casa, fora in rodada] for rodada in turno]
+    return turno + returno
+
+def gerar_estatisticas(rng, elenco_casa, elenco_fora, titulares):
+    """Gera (jogador_id, gols, cartoes) para os titulares das duas equipes de um jogo"""
+    for elenco in (elenco_casa, elenco_fora):
+        escalados = rng.sample(elenco, min(titulares, len(elenco)))
+        gols_equipe = rng.choices(range(6), weights=[25, 35, 22, 11, 5, 2])[0]
+        gols = dict.fromkeys(escalados, 0)
+        for autor in rng.choices(escalados, k=gols_equipe):
+            gols[autor] += 1
+        for jogador_id in escalados:
+            cartoes = 1 if rng.random() < 0.12 else 0
+            yield jogador_id, gols[jogador_id], cartoes
+
 def apagar_dados(conn):
-    """Apaga todos os dados das tabelas na ordem correta para evitar erros de chave estrangeira."""
+    """Apaga todos os dados das tabelas."""
     print("Iniciando a limpeza do banco de dados...")
+    cursor = conn.cursor()
     try:
-        cursor = conn.cursor()
-        
-        # Ordem importante devido às chaves estrangeiras
-        cursor.execute("DELETE FROM estatistica")
-        cursor.execute("DELETE FROM jogo")
-        cursor.execute("DELETE FROM jogador")
-        cursor.execute("DELETE FROM equipe")
-        cursor.execute("DELETE FROM pessoas")
-        
-        conn.commit()
+        # TRUNCATE é instantâneo mesmo com milhões de linhas, mas exige desligar as chaves estrangeiras
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for tabela in ("jogador_totais", "classificacao", "estatistica", "jogo", "jogador", "equipe", "pessoas"):
+            cursor.execute(f"TRUNCATE TABLE {tabela}")
         print("Todas as tabelas foram limpas com sucesso!")
     except Error as e:
-        conn.rollback()
         print(f"Erro ao limpar dados: {e}")
+        raise
     finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
         cursor.close()
 
-def cadastrar_pessoas(conn):
+def cadastrar_pessoas(conn, tamanho_lote):
     """Cadastra os usuários iniciais do sistema (admin e usuário comum)."""
     lista = [
-        {"login": "admin", "senha": "123", "tipo": "administrador"},
-        {"login": "user",  "senha": "123", "tipo": "usuario"},
+        ("admin", "123", "administrador"),
+        ("user", "123", "usuario"),
     ]
-    
-    try:
-        cursor = conn.cursor()
-        for p in lista:
-            cursor.execute("SELECT login FROM pessoas WHERE login = %s", (p["login"],))
-            if not cursor.fetchone():
-                cursor.execute(
-                    "INSERT INTO pessoas (login, senha, tipo) VALUES (%s, %s, %s)",
-                    (p["login"], p["senha"], p["tipo"])
-                )
-                print(f"Pessoa '{p['login']}' cadastrada!")
-            else:
-                print(f"Pessoa '{p['login']}' já existe!")
-        conn.commit()
-    except Error as e:
-        conn.rollback()
-        print(f"Erro ao cadastrar pessoas: {e}")
-    finally:
-        cursor.close()
+    inicio = time.perf_counter()
+    total = _inserir_em_lotes(conn, "INSERT INTO pessoas (login, senha, tipo) VALUES (%s, %s, %s)", lista, tamanho_lote)
+    _relatar("pessoas", total, inicio)
 
-def cadastrar_equipes(conn):
-    """Cadastra uma lista expandida de times brasileiros."""
-    nomes = [
-        "Flamengo", "Palmeiras", "Atlético - MG", "Cruzeiro"
+def cadastrar_equipes(conn, nomes, tamanho_lote):
+    """Cadastra as equipes do campeonato."""
+    inicio = time.perf_counter()
+    total = _inserir_em_lotes(conn, "INSERT INTO equipe (nome) VALUES (%s)", [(nome,) for nome in nomes], tamanho_lote)
+    _relatar("equipe", total, inicio)
+
+def cadastrar_jogadores(conn, rng, nomes, jogadores_por_equipe, tamanho_lote):
+    """Gera o elenco de cada equipe (números de camisa únicos) e retorna {equipe: [ids]}."""
+    jogadores_por_equipe = min(jogadores_por_equipe, 99)
+    linhas = [
+        (f"{rng.choice(NOMES_JOGADORES)} {rng.choice(SOBRENOMES_JOGADORES)}", numero, equipe)
+        for equipe in nomes
+        for numero in sorted(rng.sample(range(1, 100), jogadores_por_equipe))
     ]
-    
-    try:
-        cursor = conn.cursor()
-        for nome in nomes:
-            cursor.execute("SELECT nome FROM equipe WHERE nome = %s", (nome,))
-            if not cursor.fetchone():
-                cursor.execute("INSERT INTO equipe (nome) VALUES (%s)", (nome,))
-                print(f"Equipe '{nome}' cadastrada!")
-            else:
-                print(f"Equipe '{nome}' já existe!")
-        conn.commit()
-    except Error as e:
-        conn.rollback()
-        print(f"Erro ao cadastrar equipes: {e}")
-    finally:
-        cursor.close()
+    inicio = time.perf_counter()
+    total = _inserir_em_lotes(
+        conn, "INSERT INTO jogador (nome, numero, nome_equipe) VALUES (%s, %s, %s)", linhas, tamanho_lote
+    )
+    _relatar("jogador", total, inicio)
 
-def cadastrar_jogadores(conn):
-    """Para cada equipe cadastrada, gera 11 jogadores com nomes e números aleatórios."""
-    try:
-        cursor = conn.cursor(dictionary=True)
-        
-        # Obter todas as equipes
-        cursor.execute("SELECT nome FROM equipe")
-        equipes = cursor.fetchall()
-        
-        for equipe in equipes:
-            print(f"Cadastrando jogadores para a equipe: {equipe['nome']}")
-            numeros_usados = set()
-            
-            for _ in range(11):
-                # Gera um nome completo aleatório
-                nome_completo = f"{random.choice(NOMES_JOGADORES)} {random.choice(SOBRENOMES_JOGADORES)}"
-                
-                # Garante um número de camisa único para o time
-                while True:
-                    numero = random.randint(1, 99)
-                    if numero not in numeros_usados:
-                        numeros_usados.add(numero)
-                        break
-                
-                # Verifica se já existe um jogador com o mesmo nome na equipe
-                cursor.execute(
-                    "SELECT id FROM jogador WHERE nome = %s AND nome_equipe = %s",
-                    (nome_completo, equipe['nome'])
-                )
-                
-                if not cursor.fetchone():
-                    cursor.execute(
-                        "INSERT INTO jogador (nome, numero, nome_equipe) VALUES (%s, %s, %s)",
-                        (nome_completo, numero, equipe['nome'])
-                    )
-                    print(f"  -> Jogador '{nome_completo}' (camisa {numero}) cadastrado no {equipe['nome']}!")
-                else:
-                    print(f"  -> Jogador '{nome_completo}' já existe no {equipe['nome']}, pulando.")
-        
-        conn.commit()
-    except Error as e:
-        conn.rollback()
-        print(f"Erro ao cadastrar jogadores: {e}")
-    finally:
-        cursor.close()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, nome_equipe FROM jogador ORDER BY id")
+    elencos = {}
+    for jogador_id, equipe in cursor.fetchall():
+        elencos.setdefault(equipe, []).append(jogador_id)
+    cursor.close()
+    return elencos
 
-def cadastrar_jogos(conn):
-    """Cadastra 10 jogos aleatórios entre as equipes existentes."""
-    locais = ["Maracanã", "Morumbi", "Mineirão", "Beira-Rio", "Fonte Nova", "Arena Corinthians", "Allianz Parque"]
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        
-        # Obter todas as equipes
-        cursor.execute("SELECT nome FROM equipe")
-        equipes = cursor.fetchall()
-        
-        if len(equipes) < 2:
-            print("Não há equipes suficientes para cadastrar jogos.")
-            return
-        
-        for i in range(10):
-            e1, e2 = random.sample(equipes, 2)
-            data = datetime.date(datetime.date.today().year, 3, 20) + datetime.timedelta(days=i)
-            hora = datetime.time(random.randint(16, 22), 0)
-            
-            # Verifica se o jogo já existe
-            cursor.execute(
-                "SELECT id FROM jogo WHERE equipe1_id = %s AND equipe2_id = %s AND data = %s",
-                (e1['nome'], e2['nome'], data)
-            )
-            
-            if not cursor.fetchone():
-                cursor.execute(
-                    "INSERT INTO jogo (data, hora, local, equipe1_id, equipe2_id) VALUES (%s, %s, %s, %s, %s)",
-                    (data, hora, random.choice(locais), e1['nome'], e2['nome'])
-                )
-                print(f"Jogo {e1['nome']} x {e2['nome']} cadastrado!")
-            else:
-                print(f"Jogo {e1['nome']} x {e2['nome']} já existe!")
-        
-        conn.commit()
-    except Error as e:
-        conn.rollback()
-        print(f"Erro ao cadastrar jogos: {e}")
-    finally:
-        cursor.close()
+def cadastrar_jogos(conn, rng, nomes, temporadas, rodadas, ano_inicial, tamanho_lote):
+    """Cadastra turno e returno de cada temporada (uma rodada por semana) e retorna os jogos com ids."""
+    tabela = gerar_rodadas(nomes)[:rodadas]
+    linhas = []
+    for temporada in range(temporadas):
+        abertura = datetime.date(ano_inicial + temporada, 4, 15)
+        for numero_rodada, rodada in enumerate(tabela):
+            data = abertura + datetime.timedelta(weeks=numero_rodada)
+            for casa, fora in rodada:
+                hora = datetime.time(rng.choice([16, 18, 19, 21]), 0)
+                linhas.append((data, hora, rng.choice(LOCAIS), casa, fora))
+
+    inicio = time.perf_counter()
+    total = _inserir_em_lotes(
+        conn,
+        "INSERT INTO jogo (data, hora, local, equipe1_id, equipe2_id) VALUES (%s, %s, %s, %s, %s)",
+        linhas, tamanho_lote
+    )
+    _relatar("jogo", total, inicio)
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, equipe1_id, equipe2_id FROM jogo ORDER BY id")
+    jogos = cursor.fetchall()
+    cursor.close()
+    return jogos
 
-def preencher_bd():
+def cadastrar_estatisticas(conn, rng, jogos, elencos, titulares, tamanho_lote):
+    """Gera as estatísticas dos titulares de cada jogo, em lotes, sem manter a temporada em memória."""
+    linhas = (
+        (jogo_id, jogador_id, gols, cartoes)
+        for jogo_id, casa, fora in jogos
+        for jogador_id, gols, cartoes in gerar_estatisticas(rng, elencos[casa], elencos[fora], titulares)
+    )
+    inicio = time.perf_counter()
+    total = _inserir_em_lotes(
+        conn,
+        "INSERT INTO estatistica (jogo_id, jogador_id, gols, cartoes) VALUES (%s, %s, %s, %s)",
+        linhas, tamanho_lote
+    )
+    _relatar("estatistica", total, inicio)
+
+def recalcular_agregados(conn):
+    """Reconstrói as tabelas agregadas depois da carga em massa."""
+    inicio = time.perf_counter()
+    agregados.recalcular_agregados(conn)
+    print(f"  -> agregados recalculados em {time.perf_counter() - inicio:.2f}s")
+
+def preencher_bd(equipes=20, jogadores=30, rodadas=None, temporadas=1, titulares=14,
+                 semente=42, tamanho_lote=5000, ano_inicial=2023):
     """Função principal para limpar e popular o banco de dados."""
+    rng = random.Random(semente)
+    nomes = nomes_equipes(equipes)
+    rodadas = rodadas or 2 * (len(nomes) - 1 + len(nomes) % 2)
+
+    conn = None
     try:
         conn = get_db()
         apagar_dados(conn)
-        cadastrar_pessoas(conn)
-        cadastrar_equipes(conn)
-        cadastrar_jogadores(conn)
-        cadastrar_jogos(conn)
+        print(f"Gerando {temporadas} temporada(s): {equipes} equipes x {jogadores} jogadores x {rodadas} rodadas (semente {semente})")
+        cadastrar_pessoas(conn, tamanho_lote)
+        cadastrar_equipes(conn, nomes, tamanho_lote)
+        elencos = cadastrar_jogadores(conn, rng, nomes, jogadores, tamanho_lote)
+        jogos = cadastrar_jogos(conn, rng, nomes, temporadas, rodadas, ano_inicial, tamanho_lote)
+        cadastrar_estatisticas(conn, rng, jogos, elencos, titulares, tamanho_lote)
+        recalcular_agregados(conn)
         print("\nBanco de dados populado com sucesso!")
     except Error as e:
         print(f"\nErro durante a população do BD: {e}")
+        raise
     finally:
-        if conn.is_connected():
+        # Os workers do Streamlit que compartilham o cache passam a ler o banco novo
+        invalidar(*TABELAS)
+        if conn is not None and conn.is_connected():
             conn.close()
 
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Limpa e popula o banco com uma ou mais temporadas geradas.")
+    parser.add_argument("--equipes", type=int, default=20)
+    parser.add_argument("--jogadores", type=int, default=30, help="jogadores por equipe (máx. 99)")
+    parser.add_argument("--rodadas", type=int, default=None, help="padrão: turno e returno completos")
+    parser.add_argument("--temporadas", type=int, default=1)
+    parser.add_argument("--titulares", type=int, default=14, help="jogadores com estatística por equipe em cada jogo")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=5000, help="linhas por INSERT multi-linha")
+    parser.add_argument("--ano-inicial", type=int, default=2023)
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    preencher_bd()
\ No newline at end of file
+    args = _argumentos()
+    preencher_bd(
+        equipes=args.equipes,
+        jogadores=args.jogadores,
+        rodadas=args.rodadas,
+        temporadas=args.temporadas,
+        titulares=args.titulares,
+        semente=args.semente,
+        tamanho_lote=args.lote,
+        ano_inicial=args.ano_inicial
+    )
@@ -1,10 +1,11 @@
 # test_connection.py
-from database.connection import DatabaseConnection
+from database.connection import get_db_connection
+from mysql.connector import Error
 
 def test_connection():
-    db = DatabaseConnection()
+    conn = None
     try:
-        conn = db.get_connection()
+        conn = get_db_connection()
         if conn.is_connected():
             print("✅ Conexão bem-sucedida!")
             cursor = conn.cursor()
@@ -14,10 +15,11 @@ def test_connection():
             cursor.close()
         else:
             print("❌ Falha na conexão")
-    except Exception as e:
+    except Error as e:
         print(f"Erro: {e}")
     finally:
-        db.close()
+        if conn is not None:
+            conn.close()
 
 if __name__ == "__main__":
-    test_connection()
\ No newline at end of file
+    test_connection()
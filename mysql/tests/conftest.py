@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os testes importam os pacotes do app (database, modules) como o streamlit run faz a partir de mysql/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,110 @@
+import datetime
+import pytest
+import streamlit as st
+from database.cache import limpar
+from modules.estatisticas import deletar_estatisticas, editar_estatisticas, visualizar_estatisticas
+
+TAMANHOS = (10, 2000)
+
+
+class CursorContador:
+    """Cursor falso: registra cada comando enviado e responde com os dados gerados pela conexão"""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self._linhas = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.conexao.comandos.append(sql)
+        self._linhas = self.conexao.responder(sql, list(params or ()))
+        self.rowcount = len(self._linhas)
+
+    def executemany(self, sql, lista):
+        self.conexao.comandos.append(sql)
+        self._linhas = []
+
+    def fetchall(self):
+        return list(self._linhas)
+
+    def fetchone(self):
+        return self._linhas[0] if self._linhas else None
+
+    def close(self):
+        pass
+
+
+class ConexaoContadora:
+    """Conexão falsa com `tamanho` jogos, jogadores e estatísticas"""
+
+    def __init__(self, tamanho):
+        self.comandos = []
+        data = datetime.date(2024, 1, 1)
+        self.jogos = [
+            {"id": i, "data": data + datetime.timedelta(days=i), "hora": None, "local": f"Estádio {i}",
+             "equipe1_id": "A", "equipe2_id": "B"}
+            for i in range(1, tamanho + 1)
+        ]
+        self.jogadores = [
+            {"id": i, "nome": f"Jogador {i}", "numero": i, "nome_equipe": "A"} for i in range(1, tamanho + 1)
+        ]
+        self.estatisticas = [
+            {"id": i, "gols": 1, "cartoes": 0, "jogo_id": i, "jogador_id": i,
+             "jogador_nome": f"Jogador {i}", "nome_equipe": "A", **{
+                 campo: self.jogos[i - 1][campo] for campo in ("data", "local", "equipe1_id", "equipe2_id")
+             }}
+            for i in range(tamanho, 0, -1)
+        ]
+
+    def cursor(self, dictionary=False):
+        return CursorContador(self)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def responder(self, sql, params):
+        if "COUNT(*) AS total" in sql:
+            return [{"total": len(self.estatisticas)}]
+        if "FROM estatistica e" in sql and "LIMIT %s OFFSET %s" in sql:
+            limite, offset = params[-2:]
+            return self.estatisticas[offset:offset + limite]
+        if "FROM jogo ORDER BY" in sql:
+            return self.jogos
+        if "FROM jogador ORDER BY" in sql:
+            return self.jogadores
+        if "FROM jogador_totais t" in sql:
+            return [
+                {**jogador, "jogos": 1, "gols": 1, "cartoes": 0} for jogador in self.jogadores[:params[-1]]
+            ]
+        return []
+
+
+def _comandos(pagina, tamanho, clicar=False, monkeypatch=None):
+    limpar()
+    conn = ConexaoContadora(tamanho)
+    if clicar:
+        monkeypatch.setattr(st, "button", lambda *args, **kwargs: True)
+        monkeypatch.setattr(st, "rerun", lambda: None)
+    pagina(conn)
+    return conn.comandos
+
+
+@pytest.mark.parametrize("pagina", [visualizar_estatisticas, editar_estatisticas, deletar_estatisticas])
+def test_renderizacao_tem_numero_constante_de_comandos(pagina):
+    contagens = [len(_comandos(pagina, tamanho)) for tamanho in TAMANHOS]
+    assert contagens[0] > 0
+    assert len(set(contagens)) == 1, dict(zip(TAMANHOS, contagens))
+
+
+@pytest.mark.parametrize("pagina", [editar_estatisticas, deletar_estatisticas])
+def test_gravacao_tem_numero_constante_de_comandos(pagina, monkeypatch):
+    execucoes = [_comandos(pagina, tamanho, True, monkeypatch) for tamanho in TAMANHOS]
+    assert any("UPDATE estatistica" in c or "DELETE FROM estatistica" in c for c in execucoes[0])
+    contagens = [len(comandos) for comandos in execucoes]
+    assert len(set(contagens)) == 1, dict(zip(TAMANHOS, contagens))
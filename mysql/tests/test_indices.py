@@ -0,0 +1,93 @@
+import pytest
+import mysql.connector
+from mysql.connector import Error
+from database.config import MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_DB, MYSQL_PORT
+from database.init_db import CONSULTAS_VERIFICADAS, indices_do_plano, verificar_indices
+
+
+class CursorExplain:
+    """Cursor falso que responde ao EXPLAIN de cada consulta com o índice configurado"""
+
+    description = [("id",), ("table",), ("possible_keys",), ("key",), ("Extra",)]
+
+    def __init__(self, planos):
+        self.planos = planos
+        self._linhas = []
+
+    def execute(self, sql, params=None):
+        consulta = sql.removeprefix("EXPLAIN ")
+        self._linhas = [(1, "t", *plano, None)[:5] for plano in self.planos[consulta]]
+
+    def fetchall(self):
+        return self._linhas
+
+
+def _planos(chave_escolhida):
+    return {
+        consulta: [(esperado, chave_escolhida(esperado))]
+        for _, consulta, esperado in CONSULTAS_VERIFICADAS
+    }
+
+
+def test_verificar_indices_aceita_planos_com_o_indice_esperado():
+    assert verificar_indices(CursorExplain(_planos(lambda esperado: esperado)))
+
+
+def test_verificar_indices_falha_quando_o_indice_nao_e_escolhido():
+    assert not verificar_indices(CursorExplain(_planos(lambda esperado: None)))
+
+
+def test_verificar_indices_falha_com_uma_unica_consulta_fora_do_indice():
+    planos = _planos(lambda esperado: esperado)
+    _, consulta, esperado = CONSULTAS_VERIFICADAS[0]
+    planos[consulta] = [(esperado, "PRIMARY")]
+    assert not verificar_indices(CursorExplain(planos))
+
+
+def test_indices_do_plano_junta_as_linhas_e_os_index_merge():
+    cursor = CursorExplain({"SELECT 1": [("a,b", "a,b"), (None, None)]})
+    assert indices_do_plano(cursor, "SELECT 1") == (["a", "b"], ["a", "b"], False)
+
+
+def _plano_constante(consulta):
+    # Busca pontual por chave única sem a linha (tabela vazia): key=NULL, resolvida na otimização
+    return {consulta: [(None, None, "no matching row in const table")]}
+
+
+def test_verificar_indices_aceita_consulta_const_por_chave_unica():
+    planos = _planos(lambda esperado: esperado)
+    _, consulta, _ = next(c for c in CONSULTAS_VERIFICADAS if c[2] == "PRIMARY")
+    planos.update(_plano_constante(consulta))
+    assert verificar_indices(CursorExplain(planos))
+
+
+def test_verificar_indices_recusa_const_quando_o_esperado_nao_e_unico():
+    planos = _planos(lambda esperado: esperado)
+    _, consulta, _ = next(c for c in CONSULTAS_VERIFICADAS if c[2] == "idx_jogador_nome")
+    planos.update(_plano_constante(consulta))
+    assert not verificar_indices(CursorExplain(planos))
+
+
+@pytest.fixture(scope="module")
+def cursor_mysql():
+    """Cursor no banco configurado em .env, já preparado pelo init_db; sem servidor, os testes são pulados"""
+    try:
+        conn = mysql.connector.connect(
+            host=MYSQL_HOST, port=MYSQL_PORT, user=MYSQL_USER, password=MYSQL_PASSWORD,
+            database=MYSQL_DB, connect_timeout=3
+        )
+    except Error as e:
+        pytest.skip(f"MySQL indisponível: {e}")
+    cursor = conn.cursor()
+    yield cursor
+    cursor.close()
+    conn.close()
+
+
+@pytest.mark.parametrize(
+    "consulta, esperado", [(consulta, esperado) for _, consulta, esperado in CONSULTAS_VERIFICADAS],
+    ids=[descricao for descricao, _, _ in CONSULTAS_VERIFICADAS]
+)
+def test_consulta_usa_o_indice_esperado(cursor_mysql, consulta, esperado):
+    usados, _, _ = indices_do_plano(cursor_mysql, consulta)
+    assert esperado in usados